@@ -18,4 +18,20 @@ def create_app():
     app.register_blueprint(main)
     app.register_blueprint(auth)
 
+    @app.cli.command('reconcile-bookings')
+    def reconcile_bookings_command():
+        """Sync non-terminal bookings with their providers"""
+        from app.services.booking_reconciliation import reconcile_bookings
+        print(reconcile_bookings())
+
+    if app.config.get('NLP_PREWARM'):
+        from app.services.nlp_runtime import prewarm
+        prewarm()
+
+    if app.config.get('WEBDRIVER_PREWARM'):
+        # Chrome takes seconds per driver; don't hold up startup for it
+        import threading
+        from app.services.driver_pool import driver_pool
+        threading.Thread(target=driver_pool.prewarm, daemon=True).start()
+
     return app
\ No newline at end of file
@@ -26,6 +26,9 @@ class Booking(db.Model):
     booking_type = db.Column(db.String(20), nullable=False)  # hotel/transport
     status = db.Column(db.String(20), nullable=False)
     booking_details = db.Column(db.JSON)
+    # Promoted from booking_details so status lookups and reconciliation use an index
+    booking_reference = db.Column(db.String(64), index=True)
+    provider = db.Column(db.String(32), index=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     payment_status = db.Column(db.String(20))
     payment_id = db.Column(db.String(100))
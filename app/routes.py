@@ -3,6 +3,8 @@ from flask import Blueprint, render_template, request, jsonify
 # from app.services.transport_service import TransportService
 # from app.models.models import db, Booking
 from flask_login import login_required, current_user
+from app.services.search_cache import search_cache
+from app.services.requirements_cache import requirements_cache
 import json
 
 main = Blueprint('main', __name__)
@@ -11,6 +13,88 @@ main = Blueprint('main', __name__)
 def index():
     return render_template('index.html')
 
+@main.route('/search_cache/stats', methods=['GET'])
+@login_required
+def search_cache_stats():
+    return jsonify({
+        'status': 'success',
+        'stats': search_cache.stats()
+    })
+
+@main.route('/requirements_cache/stats', methods=['GET'])
+@login_required
+def requirements_cache_stats():
+    return jsonify({
+        'status': 'success',
+        'stats': requirements_cache.stats()
+    })
+
+@main.route('/cities/autocomplete', methods=['GET'])
+@login_required
+def city_autocomplete():
+    from app.services.city_catalog import city_catalog
+    prefix = request.args.get('q', '')
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    return jsonify({
+        'status': 'success',
+        'cities': city_catalog.autocomplete(prefix, limit)
+    })
+
+@main.route('/scraper/wait_stats', methods=['GET'])
+@login_required
+def scraper_wait_stats():
+    from app.services.page_waits import wait_timings
+    return jsonify({
+        'status': 'success',
+        'stats': wait_timings.stats()
+    })
+
+@main.route('/scraper/page_stats', methods=['GET'])
+@login_required
+def scraper_page_stats():
+    from app.services.page_waits import page_metrics
+    return jsonify({
+        'status': 'success',
+        'stats': page_metrics.stats()
+    })
+
+@main.route('/price_watch/stats', methods=['GET'])
+@login_required
+def price_watch_stats():
+    from app.services.price_watch import price_watch
+    return jsonify({
+        'status': 'success',
+        'stats': price_watch.stats()
+    })
+
+@main.route('/price_history', methods=['GET'])
+@login_required
+def price_history_summary():
+    """
+    Lowest price, percentiles and daily trend for a watched search, given
+    by its watch key (?key=) or by the same search params as the watch
+    """
+    from app.services.price_history import price_history
+    from app.services.price_watch import watch_key
+    params = request.args.to_dict()
+    try:
+        days = float(params.pop('days', 30))
+    except ValueError:
+        days = None
+    if days is None or not 0 < days <= 365:
+        return jsonify({
+            'status': 'error',
+            'message': 'days must be a number between 0 and 365'
+        }), 400
+    provider = params.pop('provider', None)
+    key = params.pop('key', None) or watch_key(params)
+    return jsonify({
+        'status': 'success',
+        'lowest': price_history.lowest(key, days, provider),
+        'percentiles': price_history.percentiles(key, days=days, provider=provider),
+        'trend': price_history.trend(key, days, provider=provider)
+    })
+
 # @main.route('/process_prompt', methods=['POST'])
 # @login_required
 # def process_prompt():
@@ -1,22 +1,31 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from app.services.driver_pool import apply_request_blocking, build_chrome_options, driver_pool
+from app.services.fare_providers import collect_fares, parse_amount
+from app.services.http_scrape import scrape as http_scrape, strategy_for
+from app.services.lazy_imports import LazyAttribute, LazyModule
+from app.services.page_extraction import extract_cards
+from app.services.page_waits import PageWaiter
+from app.services.price_watch import price_watch, watch_site
+from contextlib import contextmanager
+import json
+import threading
 import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 import logging
+from config import Config
+
+# selenium loads when a browser is first configured, not on import
+webdriver = LazyModule('selenium.webdriver')
+By = LazyAttribute('selenium.webdriver.common.by', 'By')
+WebDriverWait = LazyAttribute('selenium.webdriver.support.ui', 'WebDriverWait')
+EC = LazyModule('selenium.webdriver.support.expected_conditions')
 
 class BookingAutomation:
     def __init__(self, headless=False):
-        self.options = webdriver.ChromeOptions()
-        if headless:
-            self.options.add_argument('--headless')
-        self.options.add_argument('--start-maximized')
-        self.options.add_argument('--disable-notifications')
+        self.headless = headless
         self.driver = None
+        # Browser profile of the current driver, for page metrics
+        self.profile = None
         self.setup_logging()
 
     def setup_logging(self):
@@ -30,7 +39,11 @@ class BookingAutomation:
     def start_browser(self):
         """Start browser session"""
         try:
-            self.driver = webdriver.Chrome(options=self.options)
+            lean = self.headless and Config.WEBDRIVER_LEAN
+            self.driver = webdriver.Chrome(options=build_chrome_options(self.headless, lean))
+            if lean:
+                apply_request_blocking(self.driver)
+            self.profile = 'lean' if lean else 'full'
             self.wait = WebDriverWait(self.driver, 20)
             self.logger.info("Browser started successfully")
         except Exception as e:
@@ -43,10 +56,57 @@ class BookingAutomation:
             self.driver.quit()
             self.logger.info("Browser closed")
 
+    @contextmanager
+    def pooled_browser(self, timeout=None):
+        """
+        Borrow a warm headless driver from the shared pool for the block.
+        Raises TimeoutError when the pool stays exhausted.
+        """
+        with driver_pool.lease(timeout) as driver:
+            self.driver = driver
+            self.profile = driver.profile
+            self.wait = WebDriverWait(driver, 20)
+            try:
+                yield self
+            finally:
+                self.driver = None
+                self.profile = None
+
+    @contextmanager
+    def browser(self):
+        """The current driver, or one leased from the pool for the block when there is none"""
+        if self.driver is not None:
+            yield self
+        else:
+            with self.pooled_browser():
+                yield self
+
+    def page_waits(self, site):
+        """Timed condition waits on the current driver, reported under `site`"""
+        return PageWaiter(self.driver, site)
+
     def search_buses(self, source, destination, date):
-        """Search for buses on RedBus"""
+        """
+        Search for buses on RedBus: one GET of the results page when the
+        site's strategy is 'http', the browser when that finds nothing
+        """
+        if strategy_for('redbus') == 'http':
+            buses = http_scrape('redbus', source=source, destination=destination, date=date)
+            if buses:
+                self.logger.info(f"Extracted {len(buses)} bus results over HTTP")
+                return buses
+            self.logger.info("HTTP scrape of redbus found no results; using the browser")
+
+        try:
+            with self.browser():
+                return self._search_buses_in_browser(source, destination, date)
+        except Exception as e:
+            self.logger.error(f"Error searching buses: {str(e)}")
+            return []
+
+    def _search_buses_in_browser(self, source, destination, date):
         try:
-            self.driver.get("https://www.redbus.in")
+            self.driver.get(Config.REDBUS_WEB_URL)
             
             # Fill source
             source_input = self.wait.until(EC.presence_of_element_located((By.ID, "src")))
@@ -67,8 +127,11 @@ class BookingAutomation:
             search_button = self.driver.find_element(By.ID, "search_btn")
             search_button.click()
 
-            # Wait for results and extract data
-            time.sleep(5)  # Wait for dynamic content to load
+            # Results settling is what matters; then a short grace for late requests
+            waits = self.page_waits('redbus')
+            waits.results_stable('.bus-item')
+            waits.network_idle()
+            waits.measure_page(self.profile)
             return self.extract_bus_results()
 
         except Exception as e:
@@ -77,24 +140,12 @@ class BookingAutomation:
 
     def extract_bus_results(self):
         """Extract bus search results"""
-        buses = []
         try:
-            bus_elements = self.wait.until(
+            self.wait.until(
                 EC.presence_of_all_elements_located((By.CLASS_NAME, "bus-item"))
             )
-
-            for bus in bus_elements[:10]:  # Get first 10 results
-                bus_data = {
-                    'operator': bus.find_element(By.CLASS_NAME, "travels").text,
-                    'departure': bus.find_element(By.CLASS_NAME, "dep-time").text,
-                    'arrival': bus.find_element(By.CLASS_NAME, "arr-time").text,
-                    'duration': bus.find_element(By.CLASS_NAME, "dur").text,
-                    'fare': bus.find_element(By.CLASS_NAME, "fare").text,
-                    'available_seats': bus.find_element(By.CLASS_NAME, "seat-available").text,
-                    'rating': self.extract_rating(bus),
-                    'booking_url': bus.get_attribute("data-url")
-                }
-                buses.append(bus_data)
+            # One page_source round trip, then every card is parsed locally
+            buses = extract_cards(self.driver.page_source, 'redbus')
 
             self.logger.info(f"Extracted {len(buses)} bus results")
             return buses
@@ -103,8 +154,11 @@ class BookingAutomation:
             self.logger.error(f"Error extracting bus results: {str(e)}")
             return []
 
-    def book_bus(self, bus_url, passenger_details):
-        """Book a bus ticket"""
+    def book_bus(self, bus_url, passenger_details, seat_numbers=None):
+        """
+        Book a bus ticket. seat_numbers (e.g. from TransportService.pick_seats)
+        selects those seats; without it the first available seat is taken.
+        """
         try:
             self.driver.get(bus_url)
             
@@ -113,18 +167,30 @@ class BookingAutomation:
                 EC.presence_of_element_located((By.CLASS_NAME, "seat-layout"))
             )
             available_seats = seat_layout.find_elements(By.CLASS_NAME, "available")
-            if available_seats:
+            if seat_numbers:
+                wanted = set(seat_numbers)
+                for seat in available_seats:
+                    name = seat.get_attribute('data-seat-name') or seat.text
+                    if name in wanted:
+                        seat.click()
+                        wanted.discard(name)
+                if wanted:
+                    self.logger.warning(f"Seats no longer available: {', '.join(sorted(wanted))}")
+            elif available_seats:
                 available_seats[0].click()  # Select first available seat
 
             # Fill passenger details
             self.fill_passenger_details(passenger_details)
 
             # Proceed to payment
+            booking_page_url = self.driver.current_url
             proceed_button = self.driver.find_element(By.ID, "payment-btn")
             proceed_button.click()
 
-            # Wait for payment page and get URL
-            time.sleep(5)
+            # Wait for the payment page to load, past any redirects, and get its URL
+            waits = self.page_waits('redbus')
+            waits.url_change(booking_page_url)
+            waits.dom_ready()
             payment_url = self.driver.current_url
             
             self.logger.info(f"Successfully initiated bus booking: {payment_url}")
@@ -135,17 +201,37 @@ class BookingAutomation:
             return None
 
     def search_hotels(self, location, check_in, check_out):
-        """Search for hotels on Booking.com"""
+        """
+        Search for hotels on Booking.com: one GET of the results page when
+        the site's strategy is 'http', the browser when that finds nothing
+        """
+        if strategy_for('booking.com') == 'http':
+            hotels = http_scrape('booking.com', location=location, check_in=check_in, check_out=check_out)
+            if hotels:
+                self.logger.info(f"Extracted {len(hotels)} hotel results over HTTP")
+                return hotels
+            self.logger.info("HTTP scrape of booking.com found no results; using the browser")
+
         try:
-            self.driver.get("https://www.booking.com")
+            with self.browser():
+                return self._search_hotels_in_browser(location, check_in, check_out)
+        except Exception as e:
+            self.logger.error(f"Error searching hotels: {str(e)}")
+            return []
+
+    def _search_hotels_in_browser(self, location, check_in, check_out):
+        try:
+            self.driver.get(Config.BOOKING_COM_WEB_URL)
             
             # Fill location
             location_input = self.wait.until(
                 EC.presence_of_element_located((By.NAME, "ss"))
             )
             location_input.send_keys(location)
-            time.sleep(2)
-            self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "search-suggestion"))).click()
+            waits = self.page_waits('booking.com')
+            waits.until(
+                'suggestions', EC.element_to_be_clickable((By.CLASS_NAME, "search-suggestion"))
+            ).click()
 
             # Set dates
             self.set_hotel_dates(check_in, check_out)
@@ -154,8 +240,10 @@ class BookingAutomation:
             search_button = self.driver.find_element(By.CLASS_NAME, "search-button")
             search_button.click()
 
-            # Wait for results and extract
-            time.sleep(5)
+            # Results settling is what matters; then a short grace for late requests
+            waits.results_stable('.hotel-item')
+            waits.network_idle()
+            waits.measure_page(self.profile)
             return self.extract_hotel_results()
 
         except Exception as e:
@@ -164,21 +252,11 @@ class BookingAutomation:
 
     def extract_hotel_results(self):
         """Extract hotel search results"""
-        hotels = []
         try:
-            hotel_elements = self.wait.until(
+            self.wait.until(
                 EC.presence_of_all_elements_located((By.CLASS_NAME, "hotel-item"))
             )
-
-            for hotel in hotel_elements[:10]:
-                hotel_data = {
-                    'name': hotel.find_element(By.CLASS_NAME, "hotel-name").text,
-                    'rating': hotel.find_element(By.CLASS_NAME, "rating").text,
-                    'price': hotel.find_element(By.CLASS_NAME, "price").text,
-                    'location': hotel.find_element(By.CLASS_NAME, "location").text,
-                    'booking_url': hotel.get_attribute("data-url")
-                }
-                hotels.append(hotel_data)
+            hotels = extract_cards(self.driver.page_source, 'booking.com')
 
             self.logger.info(f"Extracted {len(hotels)} hotel results")
             return hotels
@@ -202,11 +280,14 @@ class BookingAutomation:
             self.fill_hotel_booking_details(booking_details)
 
             # Proceed to payment
+            booking_page_url = self.driver.current_url
             book_button = self.driver.find_element(By.CLASS_NAME, "book-button")
             book_button.click()
 
-            # Wait for payment page and get URL
-            time.sleep(5)
+            # Wait for the payment page to load, past any redirects, and get its URL
+            waits = self.page_waits('booking.com')
+            waits.url_change(booking_page_url)
+            waits.dom_ready()
             payment_url = self.driver.current_url
             
             self.logger.info(f"Successfully initiated hotel booking: {payment_url}")
@@ -217,30 +298,66 @@ class BookingAutomation:
             return None
 
     def monitor_price(self, search_params, threshold_price):
-        """Monitor prices and alert if below threshold"""
-        while True:
-            try:
-                current_prices = self.search_prices(search_params)
-                min_price = min(current_prices)
-                
-                if min_price <= threshold_price:
-                    self.send_price_alert(min_price, search_params)
-                    break
-                
-                time.sleep(3600)  # Check every hour
-                
-            except Exception as e:
-                self.logger.error(f"Error monitoring prices: {str(e)}")
-                break
+        """
+        Block until the price is at or below threshold, then alert. Checks
+        run on the shared price-watch scheduler, at intervals adapted to the
+        route's volatility, the gap to the threshold and the travel date.
+        """
+        reached = threading.Event()
+
+        def alert(subscriber, price, params):
+            self.send_price_alert(price, params)
+            reached.set()
+
+        watch_id = object()
+        price_watch.watch(watch_id, search_params, threshold_price, on_alert=alert)
+        try:
+            reached.wait()
+        finally:
+            price_watch.cancel(watch_id)
+
+    def check_price(self, search_params, threshold_price):
+        """One price check; sends the alert and returns True when at or below threshold"""
+        current_prices = self.search_prices(search_params)
+        if not current_prices:
+            return False
+        min_price = min(current_prices)
+        
+        if min_price <= threshold_price:
+            self.send_price_alert(min_price, search_params)
+            return True
+        return False
+
+    def search_prices(self, search_params):
+        """
+        Current prices for a watch: a bus search when search_params has a
+        source and destination, a hotel search on its location otherwise
+        """
+        if watch_site(search_params) == 'redbus':
+            results = self.search_buses(
+                search_params['source'], search_params['destination'], search_params.get('date')
+            )
+            field = 'fare'
+        else:
+            results = self.search_hotels(
+                search_params.get('location'), search_params.get('check_in'), search_params.get('check_out')
+            )
+            field = 'price'
+        prices = (parse_amount(result.get(field)) for result in results)
+        return [price for price in prices if price is not None]
+
+    def send_price_alert(self, min_price, search_params):
+        """Report a price at or below a watch's threshold"""
+        self.logger.info(f"Price alert: {min_price} for {json.dumps(search_params, default=str)}")
 
     def compare_fares(self, source, destination, date):
-        """Compare fares across different providers"""
-        fares = {
-            'redbus': self.get_redbus_fares(source, destination, date),
-            'abhibus': self.get_abhibus_fares(source, destination, date),
-            'others': self.get_other_fares(source, destination, date)
-        }
-        return self.analyze_fares(fares)
+        """
+        Fares per provider, {name: [fare, ...]}, fetched concurrently from
+        every registered FareProvider; providers with no fares are left out
+        """
+        fares, status = collect_fares(source, destination, date)
+        self.logger.info(f"Fare providers for {source} to {destination}: {status}")
+        return fares
 
     def wait_for_payment_completion(self, payment_url):
         """Wait and monitor payment completion"""
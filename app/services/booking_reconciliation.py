@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.models import Booking, db
+from app.services.transport_service import TransportService, booking_details_with_status
+from config import Config
+
+# Provider statuses after which a booking never changes again
+TERMINAL_STATUSES = ('CONFIRMED', 'CANCELLED', 'FAILED', 'REFUNDED', 'EXPIRED')
+
+def _redbus_fetcher():
+    service = TransportService()
+    return service.fetch_booking_status, booking_details_with_status
+
+# provider -> factory for (fetch_status(reference), merge_details(details, status_data))
+STATUS_FETCHERS = {
+    'redbus': _redbus_fetcher
+}
+
+class BookingReconciler:
+    """
+    Bring every non-terminal booking up to date with its provider.
+
+    Bookings are read in id order, `batch_size` at a time, using only the
+    columns the job needs. Each batch's statuses are fetched concurrently,
+    and the changed rows are written with one bulk UPDATE and one commit.
+    Must run inside an app context.
+    """
+
+    def __init__(self, batch_size=None, workers=None):
+        self.batch_size = batch_size or Config.RECONCILE_BATCH_SIZE
+        self.workers = workers or Config.RECONCILE_WORKERS
+        self.fetchers = {provider: factory() for provider, factory in STATUS_FETCHERS.items()}
+
+    def run(self):
+        summary = {'checked': 0, 'updated': 0, 'errors': 0}
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                rows = self._next_batch(last_id)
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                statuses = list(executor.map(self._fetch, rows))
+                mappings = []
+                for row, status_data in zip(rows, statuses):
+                    summary['checked'] += 1
+                    if status_data is None:
+                        summary['errors'] += 1
+                        continue
+                    mapping = self._changes(row, status_data)
+                    if mapping:
+                        mappings.append(mapping)
+                if mappings:
+                    db.session.bulk_update_mappings(Booking, mappings)
+                    db.session.commit()
+                    summary['updated'] += len(mappings)
+        return summary
+
+    def _next_batch(self, last_id):
+        # Keyset pagination: stable while rows are updated, and no OFFSET scans
+        return db.session.query(
+            Booking.id, Booking.provider, Booking.booking_reference,
+            Booking.status, Booking.booking_details
+        ).filter(
+            Booking.id > last_id,
+            Booking.provider.in_(list(self.fetchers)),
+            Booking.booking_reference.isnot(None),
+            Booking.status.notin_(TERMINAL_STATUSES)
+        ).order_by(Booking.id).limit(self.batch_size).all()
+
+    def _fetch(self, row):
+        fetch_status, _ = self.fetchers[row.provider]
+        try:
+            return fetch_status(row.booking_reference)
+        except Exception as e:
+            print(f"Error reconciling booking {row.id}: {str(e)}")
+            return None
+
+    def _changes(self, row, status_data):
+        _, merge_details = self.fetchers[row.provider]
+        status = status_data.get('status')
+        details = merge_details(row.booking_details, status_data)
+        if status == row.status and details == (row.booking_details or {}):
+            return None
+        return {'id': row.id, 'status': status or row.status, 'booking_details': details}
+
+def reconcile_bookings(batch_size=None, workers=None):
+    """Run one reconciliation pass; returns {'checked', 'updated', 'errors'}"""
+    return BookingReconciler(batch_size, workers).run()
@@ -0,0 +1,197 @@
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from difflib import get_close_matches
+from app.services.http_client import provider_http
+from config import Config
+
+# Former and alternate names that users still type; the provider's own
+# 'aliases' field is merged in on load
+CITY_ALIASES = {
+    'bangalore': 'bengaluru',
+    'bombay': 'mumbai',
+    'madras': 'chennai',
+    'calcutta': 'kolkata',
+    'cochin': 'kochi',
+    'mysore': 'mysuru',
+    'trivandrum': 'thiruvananthapuram',
+    'poona': 'pune',
+    'gurgaon': 'gurugram',
+    'vizag': 'visakhapatnam',
+    'pondicherry': 'puducherry',
+    'baroda': 'vadodara',
+    'benares': 'varanasi'
+}
+
+# How long lookups skip the catalog after its first download failed
+LOAD_RETRY_SECONDS = 60
+FUZZY_MEMO_MAX_ENTRIES = 4096
+
+def normalize_city(name):
+    """Lower case, accents and punctuation dropped, whitespace collapsed"""
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(ch if ch.isalnum() else ' ' for ch in name if not unicodedata.combining(ch))
+    return ' '.join(name.lower().split())
+
+class _Index:
+    """Immutable snapshot of the city list; swapped whole on refresh"""
+
+    def __init__(self, cities):
+        names = {}
+        entries = {}
+        for city in cities:
+            key = normalize_city(city.get('name'))
+            if not key or city.get('id') is None:
+                continue
+            names[key] = (city['id'], city['name'])
+            for alias in city.get('aliases') or []:
+                entries.setdefault(normalize_city(alias), (city['id'], city['name']))
+        for alias, target in CITY_ALIASES.items():
+            if target in names:
+                entries.setdefault(alias, names[target])
+        # Canonical names win over aliases that happen to collide with them
+        entries.update(names)
+
+        self.exact = entries
+        self.keys = sorted(entries)
+        self.size = len(names)
+        # Fuzzy outcomes (misses included) for this snapshot
+        self.fuzzy_memo = {}
+
+    def prefix_range(self, prefix):
+        start = bisect_left(self.keys, prefix)
+        # Every key starting with `prefix` sorts before prefix + U+FFFF
+        end = bisect_left(self.keys, prefix + '\uffff', start)
+        return start, end
+
+class CityCatalog:
+    """
+    In-memory RedBus city list with exact, alias, prefix and fuzzy lookup.
+
+    The list is downloaded on first use and refreshed in the background
+    once it is older than `refresh_seconds`; lookups keep using the old
+    snapshot meanwhile, and a failed refresh keeps it too.
+    """
+
+    def __init__(self, loader=None, refresh_seconds=None, fuzzy_cutoff=None):
+        self.loader = loader or self._fetch_cities
+        self.refresh_seconds = refresh_seconds or Config.CITY_CATALOG_REFRESH_SECONDS
+        self.fuzzy_cutoff = fuzzy_cutoff or Config.CITY_CATALOG_FUZZY_CUTOFF
+        self._index = None
+        self._loaded_at = 0.0
+        self._failed_at = float('-inf')
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self.counters = {'hits': 0, 'fuzzy_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+    def resolve(self, name):
+        """RedBus city id for `name`, or None when the catalog has no match"""
+        index = self._current()
+        if index is None:
+            return None
+        key = normalize_city(name)
+        match = index.exact.get(key)
+        if match is None and key:
+            match = self._fuzzy(index, key)
+            counter = 'fuzzy_hits' if match else 'misses'
+        else:
+            counter = 'hits' if match else 'misses'
+        self.counters[counter] += 1
+        return match[0] if match else None
+
+    def autocomplete(self, prefix, limit=10):
+        """Up to `limit` cities whose name or alias starts with `prefix`: [{'id', 'name'}]"""
+        index = self._current()
+        key = normalize_city(prefix)
+        if index is None or not key:
+            return []
+        start, end = index.prefix_range(key)
+        suggestions = []
+        seen = set()
+        for position in range(start, end):
+            city_id, display_name = index.exact[index.keys[position]]
+            if city_id in seen:
+                continue
+            seen.add(city_id)
+            suggestions.append({'id': city_id, 'name': display_name})
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    def refresh(self):
+        """Download the city list now; returns False if it could not be loaded"""
+        try:
+            index = _Index(self.loader())
+        except Exception as e:
+            print(f"City catalog refresh error: {str(e)}")
+            self.counters['refresh_errors'] += 1
+            return False
+        if not index.size:
+            self.counters['refresh_errors'] += 1
+            return False
+        with self._lock:
+            self._index = index
+            self._loaded_at = time.monotonic()
+            self.counters['refreshes'] += 1
+        return True
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats['cities'] = self._index.size if self._index else 0
+        stats['age_seconds'] = time.monotonic() - self._loaded_at if self._index else None
+        return stats
+
+    def _current(self):
+        if self._index is None:
+            # First use loads synchronously; concurrent first callers wait for
+            # it. After a failure, callers fall back to the network lookup
+            # until LOAD_RETRY_SECONDS have passed rather than each retrying.
+            with self._load_lock:
+                if self._index is None and time.monotonic() - self._failed_at > LOAD_RETRY_SECONDS:
+                    if not self.refresh():
+                        self._failed_at = time.monotonic()
+            return self._index
+        if time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._refresh_in_background()
+        return self._index
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _fuzzy(self, index, key):
+        if key in index.fuzzy_memo:
+            return index.fuzzy_memo[key]
+        # Typos rarely hit the first letter; comparing only against keys that
+        # share it keeps difflib to a few hundred candidates
+        start, end = index.prefix_range(key[0])
+        matches = get_close_matches(key, index.keys[start:end], n=1, cutoff=self.fuzzy_cutoff)
+        match = index.exact[matches[0]] if matches else None
+        if len(index.fuzzy_memo) >= FUZZY_MEMO_MAX_ENTRIES:
+            index.fuzzy_memo.clear()
+        index.fuzzy_memo[key] = match
+        return match
+
+    def _fetch_cities(self):
+        response = provider_http.get(
+            f"{Config.REDBUS_BASE_URL}/cities",
+            headers={'apiKey': Config.REDBUS_API_KEY, 'Content-Type': 'application/json'},
+            idempotent=True
+        )
+        if response.status_code != 200:
+            raise Exception(f"RedBus API error: {response.status_code}")
+        return response.json()
+
+city_catalog = CityCatalog()
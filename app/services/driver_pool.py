@@ -0,0 +1,286 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from app.services.lazy_imports import LazyModule
+from config import Config
+
+webdriver = LazyModule('selenium.webdriver')
+
+logger = logging.getLogger(__name__)
+
+def build_chrome_options(headless=True, lean=None):
+    """
+    Chrome options shared by pooled and one-off browsers. `lean` (default:
+    Config.WEBDRIVER_LEAN for headless browsers) returns from get() at
+    DOMContentLoaded, skips images and uses a small fixed viewport;
+    pair it with apply_request_blocking once the driver is up.
+    """
+    if lean is None:
+        lean = headless and Config.WEBDRIVER_LEAN
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless')
+    options.add_argument('--disable-notifications')
+    if lean:
+        # Result waits (PageWaiter) decide when the page is usable, not the load event
+        options.page_load_strategy = 'eager'
+        options.add_argument(f"--window-size={Config.WEBDRIVER_WINDOW_SIZE}")
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--mute-audio')
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    else:
+        options.add_argument('--start-maximized')
+    # DevTools network events, read by PageWaiter.network_idle
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+def blocked_url_patterns():
+    return [pattern.strip() for pattern in Config.WEBDRIVER_BLOCKED_URLS.split(',') if pattern.strip()]
+
+def apply_request_blocking(driver, patterns=None):
+    """
+    Block requests whose URL matches any of `patterns` ('*' wildcards,
+    default WEBDRIVER_BLOCKED_URLS) through DevTools. The block lasts for
+    the driver's tab, across navigations. False when it couldn't be set.
+    """
+    patterns = blocked_url_patterns() if patterns is None else patterns
+    if not patterns:
+        return True
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return True
+    except Exception as e:
+        logger.warning(f"Could not block scrape requests: {str(e)}")
+        return False
+
+def url_origin(url):
+    """'https://www.redbus.in' for 'https://www.redbus.in/search?...'; None for about:, data: and the like"""
+    parts = urlsplit(url or '')
+    if parts.scheme in ('http', 'https') and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return None
+
+def provider_origins():
+    """Origins of the sites pooled browsers scrape, e.g. 'https://www.redbus.in'"""
+    origins = (url_origin(url) for url in (Config.REDBUS_WEB_URL, Config.BOOKING_COM_WEB_URL))
+    return [origin for origin in origins if origin]
+
+class PooledDriver:
+    """
+    A pooled WebDriver that counts page loads and remembers the origins it
+    was sent to, so checkin knows whose storage to clear; everything else
+    is forwarded
+    """
+
+    def __init__(self, driver, profile='full'):
+        self.driver = driver
+        self.profile = profile
+        self.pages = 0
+        self.origins = set()
+        self.created_at = time.monotonic()
+
+    def get(self, url):
+        self.pages += 1
+        origin = url_origin(url)
+        if origin:
+            self.origins.add(origin)
+        return self.driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+class DriverPool:
+    """
+    Bounded pool of headless Chrome drivers.
+
+    checkout() hands out an idle driver, starting one if the pool is below
+    `size`, and raises TimeoutError if none frees up within
+    `checkout_timeout`. checkin() clears cookies and storage so the next
+    user starts clean, and quits drivers that have loaded `max_pages`
+    pages, grown past `max_heap_mb` of JS heap, or fail a health check.
+    """
+
+    def __init__(self, size=None, checkout_timeout=None, max_pages=None, max_heap_mb=None,
+                 options_factory=None, driver_factory=None, lean=None):
+        self.size = size or Config.WEBDRIVER_POOL_SIZE
+        self.checkout_timeout = checkout_timeout or Config.WEBDRIVER_CHECKOUT_TIMEOUT
+        self.max_pages = max_pages or Config.WEBDRIVER_MAX_PAGES
+        self.max_heap_mb = max_heap_mb or Config.WEBDRIVER_MAX_HEAP_MB
+        self.lean = Config.WEBDRIVER_LEAN if lean is None else lean
+        self.options_factory = options_factory or (lambda: build_chrome_options(True, self.lean))
+        self.driver_factory = driver_factory or (lambda options: webdriver.Chrome(options=options))
+        self._slots = threading.BoundedSemaphore(self.size)
+        # LIFO so the most recently used (warmest) driver goes out first
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.counters = {'checkouts': 0, 'started': 0, 'recycled': 0, 'unhealthy': 0, 'timeouts': 0}
+
+    def checkout(self, timeout=None):
+        self._check_fork()
+        timeout = self.checkout_timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            self._count('timeouts')
+            raise TimeoutError(f"No WebDriver available within {timeout}s (pool size {self.size})")
+        try:
+            driver = self._take_idle()
+            if driver is None:
+                driver = self._start()
+            self._count('checkouts')
+            return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, driver):
+        try:
+            if self._should_recycle(driver):
+                self._count('recycled')
+                self._quit(driver)
+            elif self._reset(driver):
+                self._idle.put(driver)
+            else:
+                self._count('unhealthy')
+                self._quit(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self.checkout(timeout)
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def prewarm(self, count=None):
+        """Start drivers ahead of demand so the first checkouts skip Chrome's cold start"""
+        count = min(count or self.size, self.size)
+        drivers = []
+        try:
+            for _ in range(count):
+                drivers.append(self.checkout())
+        except Exception as e:
+            logger.warning(f"WebDriver prewarm stopped after {len(drivers)} drivers: {str(e)}")
+        finally:
+            for driver in drivers:
+                self.checkin(driver)
+
+    def close(self):
+        """Quit idle drivers; drivers checked out now are quit when checked in"""
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['idle'] = self._idle.qsize()
+        stats['size'] = self.size
+        return stats
+
+    def _take_idle(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if self._healthy(driver):
+                return driver
+            self._count('unhealthy')
+            self._quit(driver)
+
+    def _start(self):
+        driver = self.driver_factory(self.options_factory())
+        if self.lean:
+            apply_request_blocking(driver)
+        driver = PooledDriver(driver, 'lean' if self.lean else 'full')
+        self._count('started')
+        logger.info("Started pooled WebDriver")
+        return driver
+
+    def _healthy(self, driver):
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _should_recycle(self, driver):
+        if driver.pages >= self.max_pages:
+            return True
+        try:
+            heap = driver.execute_script(
+                'return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0'
+            )
+        except Exception:
+            return True
+        return (heap or 0) > self.max_heap_mb * 1024 * 1024
+
+    def _reset(self, driver):
+        """Clear everything one user could leak to the next; False if the driver is unusable"""
+        try:
+            # Clicks and redirects navigate without get(); the page the last
+            # user ended on (e.g. a payment gateway) is counted too
+            origins = driver.origins | set(provider_origins())
+            try:
+                origins.add(url_origin(driver.current_url))
+            except Exception:
+                pass
+            origins.discard(None)
+            try:
+                # Local/session storage, IndexedDB, service workers and cache
+                # storage of each of those origins, then the HTTP cache
+                for origin in sorted(origins):
+                    driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+                driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            except Exception:
+                # Without DevTools, only the page the last user ended on; throws on about:blank
+                driver.execute_script(
+                    'try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}'
+                )
+            try:
+                # Every domain's cookies, not just the current page's
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            except Exception:
+                driver.delete_all_cookies()
+            driver.driver.get('about:blank')
+            driver.origins.clear()
+            try:
+                # Drop the last user's buffered network events
+                driver.get_log('performance')
+            except Exception:
+                pass
+            return True
+        except Exception as e:
+            logger.warning(f"Discarding WebDriver after failed reset: {str(e)}")
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting WebDriver: {str(e)}")
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _check_fork(self):
+        # Chrome processes belong to the parent; a forked worker starts its own
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._idle = queue.LifoQueue()
+                    self._slots = threading.BoundedSemaphore(self.size)
+                    self._pid = os.getpid()
+
+driver_pool = DriverPool()
+atexit.register(driver_pool.close)
@@ -0,0 +1,173 @@
+import math
+import re
+from app.services.lazy_imports import LazyModule
+
+np = LazyModule('numpy')
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+_DURATION = re.compile(r'^\s*(?:(\d+(?:\.\d+)?)\s*h[a-z]*)?\s*(?:(\d+)\s*m[a-z]*)?\s*$', re.I)
+_CLOCK = re.compile(r'^\s*(\d+):(\d{2})\s*$')
+
+def duration_hours(value):
+    """Hours in '8h 30m', '45m', '10h' or '08:30' (numbers are taken as hours); nan when unreadable"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str) or not value.strip():
+        return math.nan
+    match = _CLOCK.match(value)
+    if match:
+        return int(match.group(1)) + int(match.group(2)) / 60.0
+    match = _DURATION.match(value)
+    if not match or not (match.group(1) or match.group(2)):
+        return math.nan
+    return float(match.group(1) or 0) + int(match.group(2) or 0) / 60.0
+
+def _rating(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _parsed(values, parse):
+    cache = {}
+    for value in values:
+        try:
+            parsed = cache[value]
+        except KeyError:
+            parsed = cache[value] = parse(value)
+        except TypeError:
+            parsed = parse(value)
+        yield parsed
+
+class FareColumns:
+    """
+    Fares from a {provider: [fare, ...]} dict as columns: provider code,
+    amount, duration in hours and rating (nan where a fare has none).
+    Rows stay grouped by provider in dict order, and `fares` keeps the
+    original dicts for building output rows.
+    """
+
+    def __init__(self, fares):
+        self.providers = list(fares)
+        self.counts = np.fromiter((len(fares[name]) for name in self.providers), dtype=np.int64,
+                                  count=len(self.providers))
+        self.fares = [fare for name in self.providers for fare in fares[name]]
+        n = len(self.fares)
+        self.provider = np.repeat(np.arange(len(self.providers), dtype=np.int32), self.counts)
+        self.amount = np.fromiter((fare['amount'] for fare in self.fares), dtype=np.float64, count=n)
+
+        # Scraped durations and ratings repeat a lot; parse each distinct one once
+        self.hours = np.fromiter(
+            _parsed((fare.get('duration') for fare in self.fares), duration_hours), dtype=np.float64, count=n
+        )
+        self.rating = np.fromiter(
+            _parsed((fare.get('rating') for fare in self.fares), _rating), dtype=np.float64, count=n
+        )
+        self._per_hour = None
+
+    def __len__(self):
+        return len(self.fares)
+
+    def price_per_hour(self):
+        """(amount / hours, mask of fares with a usable duration); nan where there is none"""
+        if self._per_hour is None:
+            timed = np.isfinite(self.hours) & (self.hours > 0)
+            per_hour = np.divide(self.amount, self.hours, out=np.full(len(self), np.nan), where=timed)
+            self._per_hour = (per_hour, timed)
+        return self._per_hour
+
+def best_deals(columns, k=3):
+    """
+    The k cheapest fares, cheapest first, ties in input order (as a stable
+    sort would give), found with argpartition instead of a full sort
+    """
+    n = len(columns)
+    if n == 0 or k <= 0:
+        return []
+    amount = columns.amount
+    if n > k:
+        kth = amount[np.argpartition(amount, k - 1)[k - 1]]
+        candidates = np.flatnonzero(amount <= kth)
+    else:
+        candidates = np.arange(n)
+    chosen = candidates[np.lexsort((candidates, amount[candidates]))][:k]
+
+    deals = []
+    for i in chosen:
+        fare = columns.fares[i]
+        deals.append({
+            'provider': columns.providers[columns.provider[i]],
+            'amount': fare['amount'],
+            'departure': fare['departure'],
+            'duration': fare['duration'],
+            'rating': fare.get('rating', 'N/A')
+        })
+    return deals
+
+def provider_comparison(columns):
+    """Per provider aggregates: reduceat over the provider-grouped rows, medians by partition"""
+    comparison = {}
+    present = columns.counts > 0
+    for name in (name for name, count in zip(columns.providers, columns.counts) if not count):
+        comparison[name] = {
+            'average_fare': None, 'min_fare': None, 'max_fare': None, 'median_fare': None,
+            'average_price_per_hour': None, 'total_options': 0
+        }
+    if not present.any():
+        return comparison
+
+    counts = columns.counts[present]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    amount = columns.amount
+    sums = np.add.reduceat(amount, starts)
+    mins = np.minimum.reduceat(amount, starts)
+    maxes = np.maximum.reduceat(amount, starts)
+    # Rows are grouped by provider, so each median is a partition of one slice
+    medians = [float(np.median(amount[start:start + count])) for start, count in zip(starts, counts)]
+    per_hour, timed = columns.price_per_hour()
+    hour_sums = np.add.reduceat(np.where(timed, per_hour, 0.0), starts)
+    hour_counts = np.add.reduceat(timed.astype(np.int64), starts)
+
+    names = [name for name, count in zip(columns.providers, columns.counts) if count]
+    for j, name in enumerate(names):
+        comparison[name] = {
+            'average_fare': float(sums[j] / counts[j]),
+            'min_fare': float(mins[j]),
+            'max_fare': float(maxes[j]),
+            'median_fare': medians[j],
+            'average_price_per_hour': float(hour_sums[j] / hour_counts[j]) if hour_counts[j] else None,
+            'total_options': int(counts[j])
+        }
+    return {name: comparison[name] for name in columns.providers}
+
+def analyze(fares, k=3):
+    """
+    FareComparison.analyze_fares in one vectorized pass: overall
+    lowest/highest/average and percentiles, price per hour of travel,
+    the k best deals and per-provider aggregates. Raises ValueError
+    when there are no fares.
+    """
+    columns = fares if isinstance(fares, FareColumns) else FareColumns(fares)
+    if len(columns) == 0:
+        raise ValueError("no fares to analyze")
+    amount = columns.amount
+    percentiles = np.percentile(amount, PERCENTILES)
+    per_hour, timed = columns.price_per_hour()
+    timed_rates = per_hour[timed]
+    rated = np.isfinite(columns.rating)
+
+    return {
+        'lowest_fare': float(amount.min()),
+        'highest_fare': float(amount.max()),
+        'average_fare': float(amount.mean()),
+        'fare_percentiles': {f"p{p}": float(value) for p, value in zip(PERCENTILES, percentiles)},
+        'price_per_hour': {
+            'min': float(timed_rates.min()),
+            'median': float(np.median(timed_rates)),
+            'average': float(timed_rates.mean())
+        } if timed_rates.size else None,
+        'average_rating': float(columns.rating[rated].mean()) if rated.any() else None,
+        'best_deals': best_deals(columns, k),
+        'provider_comparison': provider_comparison(columns)
+    }
@@ -0,0 +1,163 @@
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class FareProvider(ABC):
+    """
+    A source of bus fares for compare_fares. Subclasses set `name` and
+    implement fetch(source, destination, date), returning a list of
+    {'amount', 'departure', 'duration', 'rating', ...} dicts; errors
+    propagate so the run can report the provider as failed. `timeout`
+    (seconds) overrides Config.FARE_PROVIDER_TIMEOUT for that provider.
+    """
+    name = None
+    timeout = None
+
+    @abstractmethod
+    def fetch(self, source, destination, date):
+        pass
+
+# name -> FareProvider instance, filled by register_fare_provider
+FARE_PROVIDERS = {}
+
+def register_fare_provider(cls):
+    """Class decorator adding a FareProvider to every comparison run"""
+    FARE_PROVIDERS[cls.name] = cls()
+    return cls
+
+_AMOUNT = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+def parse_amount(value):
+    """Number in a scraped fare such as 'INR 1,765' or '₹ 900.50'; None when there is none"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _AMOUNT.search(value or '')
+    return float(match.group().replace(',', '')) if match else None
+
+@register_fare_provider
+class RedBusFareProvider(FareProvider):
+    """RedBus search results via BookingAutomation (HTTP scrape, browser fallback)"""
+    name = 'redbus'
+
+    def fetch(self, source, destination, date):
+        from app.services.booking_automation import BookingAutomation
+        fares = []
+        for bus in BookingAutomation(headless=True).search_buses(source, destination, date):
+            amount = parse_amount(bus.get('fare'))
+            if amount is None:
+                continue
+            fares.append({
+                'amount': amount,
+                'operator': bus.get('operator'),
+                'departure': bus.get('departure'),
+                'duration': bus.get('duration'),
+                'rating': bus.get('rating') or 'N/A',
+                'booking_url': bus.get('booking_url')
+            })
+        return fares
+
+@register_fare_provider
+class RedBusApiFareProvider(FareProvider):
+    """RedBus partner API inventory, through the search cache TransportService uses"""
+    name = 'redbus_api'
+
+    def fetch(self, source, destination, date):
+        from app.services.search_cache import search_cache
+        from app.services.transport_service import TransportService
+        if not Config.REDBUS_API_KEY:
+            raise RuntimeError('REDBUS_API_KEY is not set')
+        service = TransportService()
+        details = {'source': source, 'destination': destination, 'date': date}
+        fares = []
+        for bus in search_cache.get_or_fetch('redbus', details, lambda: service._search_buses(details)):
+            amount = parse_amount(bus.get('fare'))
+            if amount is None:
+                continue
+            fares.append({
+                'amount': amount,
+                'operator': bus.get('operator_name'),
+                'departure': bus.get('departure_time'),
+                'duration': None,
+                'rating': bus.get('rating') or 'N/A',
+                'booking_url': bus.get('booking_url')
+            })
+        return fares
+
+# Shared by every run. A provider that overruns its deadline keeps its
+# worker (and any browser it leased) until its scrape gives up, but never
+# holds up the comparison.
+_fare_executor = ThreadPoolExecutor(
+    max_workers=Config.FARE_COMPARISON_WORKERS,
+    thread_name_prefix='fare-compare'
+)
+
+def _timed_fetch(provider, source, destination, date):
+    started = time.monotonic()
+    fares = provider.fetch(source, destination, date)
+    return fares, time.monotonic() - started
+
+def collect_fares(source, destination, date, providers=None, quorum=None, deadline=None):
+    """
+    Fetch fares from every provider (default: all registered ones)
+    concurrently, each bounded by its own timeout and all by `deadline`
+    seconds. Returns (fares, status) once `quorum` providers (default: all)
+    have answered with fares, or when the deadline passes. `fares` holds
+    only providers that returned some. `status` has one entry per
+    provider: 'ok', 'empty', 'error', 'timeout', or 'pending' when the
+    quorum was met before it answered.
+    """
+    providers = FARE_PROVIDERS if providers is None else providers
+    providers = list(providers.values() if isinstance(providers, dict) else providers)
+    quorum = min(quorum or Config.FARE_COMPARISON_QUORUM or len(providers), len(providers))
+    deadline = deadline or Config.FARE_COMPARISON_DEADLINE
+
+    started = time.monotonic()
+    futures = {}
+    expires = {}
+    for provider in providers:
+        future = _fare_executor.submit(_timed_fetch, provider, source, destination, date)
+        futures[future] = provider
+        expires[future] = started + min(provider.timeout or Config.FARE_PROVIDER_TIMEOUT, deadline)
+
+    fares = {}
+    status = {}
+    pending = set(futures)
+    while pending and len(fares) < quorum:
+        now = time.monotonic()
+        for future in [future for future in pending if expires[future] <= now]:
+            pending.discard(future)
+            future.cancel()
+            provider = futures[future]
+            logger.warning(f"{provider.name} fares timed out after {expires[future] - started:.1f}s")
+            status[provider.name] = {'status': 'timeout', 'timeout': round(expires[future] - started, 3)}
+        if not pending:
+            break
+
+        done, _ = wait(pending, timeout=min(expires[future] for future in pending) - now,
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.discard(future)
+            provider = futures[future]
+            try:
+                results, elapsed = future.result()
+            except Exception as e:
+                logger.error(f"{provider.name} fares error: {str(e)}")
+                status[provider.name] = {'status': 'error', 'error': str(e)}
+                continue
+            status[provider.name] = {
+                'status': 'ok' if results else 'empty',
+                'count': len(results),
+                'elapsed_ms': round(elapsed * 1000, 1)
+            }
+            if results:
+                fares[provider.name] = results
+
+    for future in pending:
+        future.cancel()
+        status[futures[future].name] = {'status': 'pending'}
+    return fares, status
@@ -0,0 +1,167 @@
+import math
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from app.services.result_pages import _number
+
+# Grid cell edge in degrees (~550m of latitude). Providers round coordinates
+# differently, so a hotel is compared against its own and the 8 neighbouring cells.
+DEFAULT_CELL_SIZE = 0.005
+NAME_SIMILARITY_THRESHOLD = 0.85
+
+# Words providers add or drop freely; they say nothing about which property it is
+NAME_STOPWORDS = frozenset(['the', 'hotel', 'hotels', 'and', 'by', 'a', 'an', 'of', 'at'])
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+def normalize_hotel_name(name):
+    """Lowercase, strip accents and punctuation, drop filler words"""
+    if not name:
+        return ()
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    name = name.lower().replace('&', ' and ')
+    return tuple(token for token in _NON_ALNUM.split(name) if token and token not in NAME_STOPWORDS)
+
+def name_similarity(a, b, threshold=0.0):
+    """
+    Similarity in [0, 1] between two normalized name token tuples.
+    Scores known to fall below `threshold` may be returned as 0 without
+    running the full sequence match.
+    """
+    return _NameKey(a).similarity(_NameKey(b), threshold)
+
+class _NameKey:
+    """Normalized name with the pieces the comparison needs precomputed"""
+    __slots__ = ('tokens', 'token_set', 'digits', 'joined', 'blocking_keys', '_matcher')
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.token_set = frozenset(tokens)
+        self.digits = tuple(token for token in tokens if token.isdigit())
+        self.joined = ' '.join(tokens)
+        # Names only get compared when they share a word or start alike
+        # ("seaview" / "sea view", "sunshine" / "sunshyne")
+        self.blocking_keys = self.token_set | {'^' + ''.join(tokens)[:4]}
+        self._matcher = None
+
+    def similarity(self, other, threshold=0.0):
+        if self.tokens == other.tokens:
+            return 1.0
+        if not self.tokens or not other.tokens:
+            return 0.0
+        if self.digits != other.digits:
+            # "OYO 1021" and "OYO 1022" are different properties
+            return 0.0
+        small, large = sorted((self.token_set, other.token_set), key=len)
+        if len(small) >= 2 and small <= large:
+            # "Grand Palace" vs "Grand Palace Suites"
+            return 1.0
+        length_a, length_b = len(self.joined), len(other.joined)
+        if 2.0 * min(length_a, length_b) / (length_a + length_b) < threshold:
+            return 0.0
+        if self._matcher is None:
+            # SequenceMatcher indexes its second sequence once; reuse it
+            self._matcher = SequenceMatcher(None, '', self.joined, autojunk=False)
+        self._matcher.set_seq1(other.joined)
+        if self._matcher.quick_ratio() < threshold:
+            return 0.0
+        return self._matcher.ratio()
+
+def _grid_cell(hotel, cell_size):
+    location = hotel.get('location') or {}
+    try:
+        lat = float(location.get('latitude'))
+        lon = float(location.get('longitude'))
+    except (TypeError, ValueError):
+        return None
+    return (math.floor(lat / cell_size), math.floor(lon / cell_size))
+
+def _price_key(hotel):
+    # Providers send amounts as numbers or numeric strings; unreadable ones sort last
+    amount = _number((hotel.get('price') or {}).get('amount'))
+    return (amount is None, amount if amount is not None else 0)
+
+class _Cluster:
+    __slots__ = ('name', 'members')
+
+    def __init__(self, name, hotel):
+        self.name = name
+        self.members = [hotel]
+
+    def similarity(self, name, hotel, threshold):
+        # Two listings from the same provider with different ids are different hotels
+        for member in self.members:
+            if member.get('source') == hotel.get('source') and member.get('hotel_id') != hotel.get('hotel_id'):
+                return 0.0
+        return self.name.similarity(name, threshold)
+
+    def merge(self):
+        """Cheapest offer wins; every source's price is kept under 'offers'"""
+        members = sorted(self.members, key=_price_key)
+        merged = dict(members[0])
+        merged['offers'] = [{
+            'source': hotel.get('source'),
+            'hotel_id': hotel.get('hotel_id'),
+            'price': hotel.get('price'),
+            'booking_url': hotel.get('booking_url')
+        } for hotel in members]
+        merged['sources'] = list(dict.fromkeys(hotel.get('source') for hotel in members))
+        return merged
+
+def deduplicate_hotels(hotels, cell_size=DEFAULT_CELL_SIZE, threshold=NAME_SIMILARITY_THRESHOLD):
+    """
+    Merge listings of the same property across providers.
+
+    Hotels are bucketed on a lat/lon grid and names are only compared with
+    names in neighbouring cells that share a blocking key, so the cost stays
+    near-linear in the number of hotels.
+    Hotels without a name or without coordinates are never merged: with
+    either missing there is nothing to tell one property from another.
+    """
+    clusters = []
+    grid = {}        # cell -> blocking key -> clusters whose first member fell in that cell
+    by_name = {}     # (cell, tokens) -> cluster, exact-name fast path
+    for hotel in hotels:
+        name = _NameKey(normalize_hotel_name(hotel.get('name')))
+        cell = _grid_cell(hotel, cell_size)
+        if not name.tokens or cell is None:
+            clusters.append(_Cluster(name, hotel))
+            continue
+
+        match = by_name.get((cell, name.tokens))
+        if match is not None and match.similarity(name, hotel, threshold) < threshold:
+            match = None
+        if match is None:
+            match = _best_neighbour(grid, cell, name, hotel, threshold)
+
+        if match is not None:
+            match.members.append(hotel)
+            continue
+
+        cluster = _Cluster(name, hotel)
+        clusters.append(cluster)
+        by_name.setdefault((cell, name.tokens), cluster)
+        blocks = grid.setdefault(cell, {})
+        for key in name.blocking_keys:
+            blocks.setdefault(key, []).append(cluster)
+
+    return [cluster.merge() for cluster in clusters]
+
+def _best_neighbour(grid, cell, name, hotel, threshold):
+    best, best_score = None, threshold
+    seen = set()
+    row, col = cell
+    for d_row in (-1, 0, 1):
+        for d_col in (-1, 0, 1):
+            blocks = grid.get((row + d_row, col + d_col))
+            if not blocks:
+                continue
+            for key in name.blocking_keys:
+                for cluster in blocks.get(key, ()):
+                    if id(cluster) in seen:
+                        continue
+                    seen.add(id(cluster))
+                    score = cluster.similarity(name, hotel, threshold)
+                    if score >= best_score:
+                        best, best_score = cluster, score
+    return best
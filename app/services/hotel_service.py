@@ -1,43 +1,173 @@
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 # from app.models.models import Booking, db
+from app.services.hotel_dedup import deduplicate_hotels
+from app.services.http_client import provider_http
+from app.services.nlp_runtime import parse
+from app.services.result_pages import decode_cursor, encode_cursor, parse_origin, top_k
+from app.services.search_cache import make_cache_key, search_cache
 from config import Config
 
+# Search params carried in a results cursor; enough to rebuild the result set
+HOTEL_SEARCH_FIELDS = ('location', 'check_in', 'check_out', 'guests', 'rooms', 'min_rating', 'origin')
+
+# Shared by every HotelService instance. A provider that overruns its deadline
+# keeps its worker busy until the HTTP timeout fires, but never holds up the response.
+_provider_executor = ThreadPoolExecutor(
+    max_workers=Config.HOTEL_SEARCH_WORKERS,
+    thread_name_prefix='hotel-search'
+)
+
 class HotelService:
     def __init__(self):
         self.booking_api_key = Config.BOOKING_COM_API_KEY
         self.booking_secret = Config.BOOKING_COM_SECRET
         self.mmt_api_key = Config.MAKEMYTRIP_API_KEY
         self.mmt_secret = Config.MAKEMYTRIP_SECRET
+        self.providers = {
+            'booking.com': self._search_booking_com,
+            'makemytrip': self._search_makemytrip
+        }
+        self.provider_timeouts = {
+            'booking.com': Config.BOOKING_COM_TIMEOUT,
+            'makemytrip': Config.MAKEMYTRIP_TIMEOUT
+        }
         
-    def search_hotels(self, prompt):
+    def search_hotels(self, prompt, sort_by='price', page_size=None, origin=None):
         """
         Search hotels using multiple APIs (Booking.com and MakeMyTrip)
-        Returns combined and deduplicated results
+        Returns the first page of combined and deduplicated results;
+        sorting by distance needs an `origin` (see parse_origin)
         """
-        hotels = []
-        
         # Extract search parameters from prompt
         search_params = self._extract_hotel_requirements(prompt)
-        
-        # Search using Booking.com API
-        booking_results = self._search_booking_com(search_params)
-        hotels.extend(booking_results)
-        
-        # Search using MakeMyTrip API
-        mmt_results = self._search_makemytrip(search_params)
-        hotels.extend(mmt_results)
-        
-        # Deduplicate and sort results
-        return self._process_and_sort_results(hotels)
+        if origin is not None:
+            search_params['origin'] = origin
+        return self.search_hotels_by_params(search_params, sort_by, page_size)
+
+    def search_hotels_by_params(self, search_params, sort_by='price', page_size=None):
+        """
+        Query all providers concurrently and return the first page of results.
+        Providers that timed out or failed are reported under 'providers';
+        further pages are fetched with get_results_page(next_cursor).
+        Raises ValueError for sort_by='distance' without a usable 'origin'.
+        """
+        page_size = page_size or Config.HOTEL_PAGE_SIZE
+        origin = parse_origin(search_params.get('origin'))
+        if sort_by == 'distance' and origin is None:
+            raise ValueError("Sorting by distance needs an origin (latitude, longitude)")
+        search_params = dict(search_params, origin=origin)
+        hotels, provider_status = self._fan_out(search_params)
+
+        # Deduplicate, keep the result set for later pages and rank one page
+        unique_hotels, page = self._process_and_sort_results(hotels, sort_by, page_size, origin)
+        self._store_result_set(search_params, unique_hotels)
+
+        response = self._page_response(unique_hotels, page, search_params, sort_by, 0, page_size)
+        response['providers'] = provider_status
+        return response
+
+    def get_results_page(self, cursor):
+        """
+        Return the page an earlier response's next_cursor points at; raises
+        ValueError on a tampered or malformed cursor
+        """
+        state = decode_cursor(cursor, HOTEL_SEARCH_FIELDS, Config.HOTEL_MAX_PAGE_SIZE)
+        search_params = state['params']
+        unique_hotels, _ = search_cache.get(make_cache_key('hotel_results', search_params))
+        if unique_hotels is None:
+            # First page was served by another worker, or the set expired:
+            # rebuild it from the (shared) provider caches. Only the set is
+            # needed here; the requested page is ranked below.
+            hotels, _ = self._fan_out(search_params)
+            unique_hotels = deduplicate_hotels(hotels)
+            self._store_result_set(search_params, unique_hotels)
+
+        page = top_k(
+            unique_hotels, state['sort_by'], state['offset'], state['page_size'],
+            parse_origin(search_params.get('origin'))
+        )
+        return self._page_response(
+            unique_hotels, page, search_params,
+            state['sort_by'], state['offset'], state['page_size']
+        )
+
+    def _fan_out(self, search_params):
+        """
+        Query all providers concurrently, each bounded by its own deadline.
+        Returns the hotels that arrived in time and a status per provider.
+        """
+        started = time.monotonic()
+        futures = {
+            name: _provider_executor.submit(self._timed_search, name, search, search_params)
+            for name, search in self.providers.items()
+        }
+
+        hotels = []
+        provider_status = {}
+        for name, future in futures.items():
+            timeout = self.provider_timeouts[name]
+            remaining = max(timeout - (time.monotonic() - started), 0)
+            try:
+                results, elapsed = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                print(f"{name} search timed out after {timeout}s")
+                provider_status[name] = {'status': 'timeout', 'timeout': timeout}
+                continue
+            except Exception as e:
+                print(f"{name} API error: {str(e)}")
+                provider_status[name] = {'status': 'error', 'error': str(e)}
+                continue
+
+            hotels.extend(results)
+            provider_status[name] = {
+                'status': 'ok',
+                'count': len(results),
+                'elapsed_ms': round(elapsed * 1000, 1)
+            }
+
+        return hotels, provider_status
+
+    def _store_result_set(self, search_params, unique_hotels):
+        # Memory tier only: the set can be rebuilt from the provider caches
+        search_cache.set(
+            'hotel_results',
+            make_cache_key('hotel_results', search_params),
+            unique_hotels,
+            ttl=Config.HOTEL_RESULT_SET_TTL,
+            persist=False
+        )
+
+    def _page_response(self, unique_hotels, page, search_params, sort_by, offset, page_size):
+        next_offset = offset + len(page)
+        next_cursor = None
+        if next_offset < len(unique_hotels):
+            next_cursor = encode_cursor({
+                'params': {field: search_params.get(field) for field in HOTEL_SEARCH_FIELDS},
+                'sort_by': sort_by,
+                'offset': next_offset,
+                'page_size': page_size
+            })
+        return {
+            'hotels': page,
+            'total': len(unique_hotels),
+            'sort_by': sort_by,
+            'next_cursor': next_cursor
+        }
+
+    def _timed_search(self, name, search, search_params):
+        """Run a cached provider search and return (results, elapsed seconds)"""
+        started = time.monotonic()
+        results = search_cache.get_or_fetch(name, search_params, lambda: search(search_params))
+        return results, time.monotonic() - started
         
     def _extract_hotel_requirements(self, prompt):
         """
         Extract hotel search requirements from prompt using NLP
         """
-        import spacy
-        nlp = spacy.load("en_core_web_sm")
-        doc = nlp(prompt)
+        doc = parse(prompt)
         
         # Extract location, dates, preferences
         # Implement more sophisticated NLP here
@@ -58,73 +188,69 @@ class HotelService:
     def _search_booking_com(self, params):
         """
         Search hotels using Booking.com API
+        Errors propagate so the fan-out can report the provider as failed
         """
-        try:
-            headers = {
-                'Authorization': f'Bearer {self.booking_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            search_params = {
-                'city_id': self._get_booking_city_id(params['location']),
-                'checkin': params['check_in'],
-                'checkout': params['check_out'],
-                'adults_number': params['guests'],
-                'room_number': params['rooms'],
-                'filter': {
-                    'min_review_score': params['min_rating'] * 2  # Booking.com uses 1-10 scale
-                }
+        headers = {
+            'Authorization': f'Bearer {self.booking_api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        search_params = {
+            'city_id': self._get_booking_city_id(params['location']),
+            'checkin': params['check_in'],
+            'checkout': params['check_out'],
+            'adults_number': params['guests'],
+            'room_number': params['rooms'],
+            'filter': {
+                'min_review_score': params['min_rating'] * 2  # Booking.com uses 1-10 scale
             }
-            
-            response = requests.post(
-                'https://distribution-xml.booking.com/json/bookings',
-                headers=headers,
-                json=search_params
-            )
-            
-            if response.status_code == 200:
-                return self._process_booking_response(response.json())
-            return []
-            
-        except Exception as e:
-            print(f"Booking.com API error: {str(e)}")
-            return []
+        }
+        
+        response = provider_http.post(
+            f"{Config.BOOKING_COM_BASE_URL}/bookings",
+            headers=headers,
+            json=search_params,
+            timeout=self.provider_timeouts['booking.com'],
+            idempotent=True
+        )
+        
+        if response.status_code == 200:
+            return self._process_booking_response(response.json())
+        raise Exception(f"Booking.com API error: {response.status_code}")
             
     def _search_makemytrip(self, params):
         """
         Search hotels using MakeMyTrip API
+        Errors propagate so the fan-out can report the provider as failed
         """
-        try:
-            headers = {
-                'api-key': self.mmt_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            search_params = {
-                'city': params['location'],
-                'checkin': params['check_in'],
-                'checkout': params['check_out'],
-                'rooms': [{
-                    'adults': params['guests']
-                }],
-                'filters': {
-                    'rating': params['min_rating']
-                }
+        headers = {
+            'api-key': self.mmt_api_key,
+            'Content-Type': 'application/json'
+        }
+        
+        search_params = {
+            'city': params['location'],
+            'checkin': params['check_in'],
+            'checkout': params['check_out'],
+            'rooms': [{
+                'adults': params['guests']
+            }],
+            'filters': {
+                'rating': params['min_rating']
             }
-            
-            response = requests.post(
-                'https://api.makemytrip.com/hotels/search',
-                headers=headers,
-                json=search_params
-            )
-            
-            if response.status_code == 200:
-                return self._process_mmt_response(response.json())
-            return []
-            
-        except Exception as e:
-            print(f"MakeMyTrip API error: {str(e)}")
-            return []
+        }
+        
+        response = provider_http.post(
+            f"{Config.MAKEMYTRIP_BASE_URL}/hotels/search",
+            headers=headers,
+            json=search_params,
+            timeout=self.provider_timeouts['makemytrip'],
+            idempotent=True
+        )
+        
+        if response.status_code == 200:
+            return self._process_mmt_response(response.json())
+        raise Exception(f"MakeMyTrip API error: {response.status_code}")
             
     def _process_booking_response(self, response_data):
         """Process Booking.com API response"""
@@ -176,6 +302,19 @@ class HotelService:
             })
         return hotels
         
+    def _get_booking_city_id(self, location):
+        """Resolve a city name to a Booking.com city id"""
+        response = provider_http.get(
+            f"{Config.BOOKING_COM_BASE_URL}/cities",
+            headers={'Authorization': f'Bearer {self.booking_api_key}'},
+            params={'name': location},
+            timeout=self.provider_timeouts['booking.com']
+        )
+        if response.status_code == 200:
+            cities = response.json().get('result', [])
+            return cities[0]['city_id'] if cities else None
+        return None
+        
     def _generate_booking_url(self, source, hotel_id):
         """Generate actual booking URL based on source"""
         if source == 'booking':
@@ -184,24 +323,19 @@ class HotelService:
             return f"https://www.makemytrip.com/hotels/hotel-details/?hotelId={hotel_id}"
         return None
         
-    def _process_and_sort_results(self, hotels):
+    def _process_and_sort_results(self, hotels, sort_by='price', page_size=None, origin=None):
         """
         Process and sort hotel results
         - Remove duplicates
-        - Sort by price or rating
-        - Apply any additional filters
+        - Rank the first page by price, rating or distance from `origin`
+        Returns (deduplicated hotels, first page)
         """
-        # Remove duplicates based on hotel name and location
-        seen = set()
-        unique_hotels = []
-        for hotel in hotels:
-            key = f"{hotel['name']}_{hotel['location']['latitude']}_{hotel['location']['longitude']}"
-            if key not in seen:
-                seen.add(key)
-                unique_hotels.append(hotel)
-        
-        # Sort by price (you can modify sorting criteria)
-        return sorted(unique_hotels, key=lambda x: x['price']['amount'])
+        # Merge listings of the same property across providers
+        unique_hotels = deduplicate_hotels(hotels)
+
+        # Heap-based top-k: only the first page is ordered
+        page = top_k(unique_hotels, sort_by, 0, page_size or Config.HOTEL_PAGE_SIZE, origin)
+        return unique_hotels, page
         
     def initiate_booking(self, source, hotel_id, booking_details):
         """
@@ -234,8 +368,8 @@ class HotelService:
             'rooms': booking_details['rooms']
         }
         
-        response = requests.post(
-            'https://distribution-xml.booking.com/json/bookings',
+        response = provider_http.post(
+            f"{Config.BOOKING_COM_BASE_URL}/bookings",
             headers=headers,
             json=booking_data
         )
@@ -247,6 +381,8 @@ class HotelService:
             #     user_id=booking_details['user_id'],
             #     booking_type='hotel',
             #     status='initiated',
+            #     booking_reference=booking_response.get('booking_reference'),
+            #     provider='booking.com',
             #     booking_details={
             #         'hotel_id': hotel_id,
             #         'source': 'booking.com',
@@ -0,0 +1,132 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+def parse_pool_sizes(value):
+    """Parse 'host=size,host=size' into a dict"""
+    sizes = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            host, size = item.split('=', 1)
+            sizes[host.strip()] = int(size)
+    return sizes
+
+class ProviderSession(requests.Session):
+    """
+    requests.Session with default connect/read timeouts and retries with
+    jittered exponential backoff. Only idempotent calls are retried; pass
+    idempotent=True for POSTs that are safe to repeat (searches).
+    """
+
+    def __init__(self, timeout, max_retries, backoff_base, backoff_max):
+        super().__init__()
+        self.default_timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def request(self, method, url, idempotent=None, **kwargs):
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.default_timeout
+        attempts = self.max_retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in RETRY_STATUSES:
+                    return response
+                response.close()
+            time.sleep(self._backoff(attempt))
+
+    def _backoff(self, attempt):
+        # Full jitter keeps retries from a burst of failures from lining up
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+class ProviderHTTPClient:
+    """Keep-alive connection pools, one session per upstream host"""
+
+    def __init__(self, pool_maxsize=20, pool_sizes=None, connect_timeout=3.05,
+                 read_timeout=10, max_retries=2, backoff_base=0.2, backoff_max=2):
+        self.pool_maxsize = pool_maxsize
+        self.pool_sizes = pool_sizes or {}
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def session_for(self, url):
+        """Return the pooled session for the URL's scheme and host"""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        session = self._sessions.get(origin)
+        if session is not None and self._pid == os.getpid():
+            return session
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Connections inherited across a fork must not be shared
+                self._sessions = {}
+                self._pid = os.getpid()
+            session = self._sessions.get(origin)
+            if session is None:
+                session = self._new_session(parts.hostname)
+                self._sessions[origin] = session
+            return session
+
+    def request(self, method, url, **kwargs):
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+
+    def _new_session(self, hostname):
+        session = ProviderSession(
+            timeout=self.timeout,
+            max_retries=self.max_retries,
+            backoff_base=self.backoff_base,
+            backoff_max=self.backoff_max
+        )
+        pool_size = self.pool_sizes.get(hostname, self.pool_maxsize)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+provider_http = ProviderHTTPClient(
+    pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+    pool_sizes=parse_pool_sizes(Config.HTTP_HOST_POOL_SIZES),
+    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.HTTP_READ_TIMEOUT,
+    max_retries=Config.HTTP_MAX_RETRIES,
+    backoff_base=Config.HTTP_BACKOFF_BASE,
+    backoff_max=Config.HTTP_BACKOFF_MAX
+)
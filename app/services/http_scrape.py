@@ -0,0 +1,81 @@
+import logging
+import time
+from datetime import date
+from urllib.parse import quote
+from app.services.http_client import provider_http
+from app.services.page_extraction import extract_cards, extract_embedded
+from app.services.page_waits import page_metrics
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Search result pages that can be fetched without a browser. 'base' names
+# the Config attribute holding the site root; params are URL-quoted and
+# dates formatted with 'date_format'.
+SEARCH_PAGES = {
+    'redbus': {
+        'base': 'REDBUS_WEB_URL',
+        'url': '{base}/search?fromCityName={source}&toCityName={destination}&onward={date}',
+        'date_format': '%d-%b-%Y'
+    },
+    'booking.com': {
+        'base': 'BOOKING_COM_WEB_URL',
+        'url': '{base}/searchresults.html?ss={location}&checkin={check_in}&checkout={check_out}',
+        'date_format': '%Y-%m-%d'
+    }
+}
+
+# Sites serve their server-rendered listing to ordinary browser requests
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/124.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Language': 'en-IN,en;q=0.9'
+}
+
+def parse_strategies(value):
+    """Parse 'site=strategy,site=strategy' into a dict"""
+    strategies = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            site, strategy = item.split('=', 1)
+            strategies[site.strip()] = strategy.strip().lower()
+    return strategies
+
+SCRAPE_STRATEGIES = parse_strategies(Config.SCRAPE_STRATEGIES)
+
+def strategy_for(site):
+    """'http' when the site's search page is fetched directly, else 'browser'"""
+    if site in SEARCH_PAGES and SCRAPE_STRATEGIES.get(site) == 'http':
+        return 'http'
+    return 'browser'
+
+def search_url(site, **params):
+    page = SEARCH_PAGES[site]
+    values = {}
+    for name, value in params.items():
+        if isinstance(value, date):
+            value = value.strftime(page['date_format'])
+        values[name] = quote('' if value is None else str(value), safe='')
+    return page['url'].format(base=getattr(Config, page['base']).rstrip('/'), **values)
+
+def scrape(site, **params):
+    """
+    Results from one GET of the site's search page: its result cards, or
+    its embedded JSON blob when the cards are rendered client-side. Returns
+    [] when the page has neither or the request fails.
+    """
+    url = search_url(site, **params)
+    started = time.monotonic()
+    try:
+        response = provider_http.get(url, headers=REQUEST_HEADERS)
+        response.raise_for_status()
+    except Exception as e:
+        logger.warning(f"HTTP scrape of {site} failed: {str(e)}")
+        return []
+    html = response.text
+    results = extract_cards(html, site) or extract_embedded(html, site)
+    # Wire size when the server sent one (compressed), else the body size
+    transferred = int(response.headers.get('Content-Length') or len(response.content))
+    page_metrics.record(site, 'http', transferred, 1, time.monotonic() - started)
+    return results
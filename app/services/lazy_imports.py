@@ -0,0 +1,68 @@
+import importlib
+import sys
+import time
+
+# Optional dependencies that are slow to import or large in memory. None of
+# them may be imported by create_app(); benchmarks/import_report.py checks it.
+HEAVY_MODULES = ('selenium', 'bs4', 'razorpay', 'spacy', 'dateparser', 'numpy')
+
+_load_times = {}
+
+def load(name):
+    """Import `name` now, recording how long the first import took"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    _load_times.setdefault(name, time.perf_counter() - started)
+    return module
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+        webdriver = LazyModule('selenium.webdriver')
+        webdriver.Chrome(...)   # selenium is imported here
+    """
+
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, attr):
+        return getattr(load(self._name), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._name in sys.modules else 'not loaded'
+        return f"<LazyModule {self._name} ({state})>"
+
+class LazyAttribute:
+    """
+    Stand-in for `from module import attr`, resolved on first use.
+    Calls and attribute access are forwarded, so classes and constant
+    holders (By.ID, WebDriverWait(driver, 20)) work unchanged. Not usable
+    where Python needs the real object, such as an `except` clause.
+    """
+
+    def __init__(self, module, attr):
+        object.__setattr__(self, '_module', module)
+        object.__setattr__(self, '_attr', attr)
+
+    def _resolve(self):
+        return getattr(load(self._module), self._attr)
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<LazyAttribute {self._module}.{self._attr}>"
+
+def is_loaded(name):
+    return name in sys.modules
+
+def import_report():
+    """Seconds spent on each first import made through this module, slowest first"""
+    return dict(sorted(_load_times.items(), key=lambda item: item[1], reverse=True))
@@ -0,0 +1,70 @@
+import threading
+from app.services.lazy_imports import LazyModule
+from config import Config
+
+spacy = LazyModule('spacy')
+
+_nlp = None
+_bulk_nlp = None
+_load_lock = threading.Lock()
+_call_lock = threading.Lock()
+_bulk_lock = threading.Lock()
+
+def _load():
+    return spacy.load(Config.SPACY_MODEL, exclude=Config.SPACY_EXCLUDED_PIPES)
+
+def get_nlp():
+    """
+    Process-wide spaCy pipeline, loaded on first use.
+    Components none of the extractors read (parser, lemmatizer) are excluded,
+    which cuts load time and resident memory.
+    """
+    global _nlp
+    if _nlp is None:
+        with _load_lock:
+            if _nlp is None:
+                _nlp = _load()
+    return _nlp
+
+def _get_bulk_nlp():
+    """Second copy of the pipeline for pipe(), loaded the first time a batch runs"""
+    global _bulk_nlp
+    if _bulk_nlp is None:
+        with _load_lock:
+            if _bulk_nlp is None:
+                _bulk_nlp = _load()
+    return _bulk_nlp
+
+def parse(text):
+    """Run the shared pipeline over one text"""
+    nlp = get_nlp()
+    # Language objects are not documented as thread-safe; calls are short
+    with _call_lock:
+        return nlp(text)
+
+def pipe(texts, batch_size=None, n_process=None):
+    """
+    Stream docs for an iterable of texts through nlp.pipe, in input order.
+    Batches run on their own copy of the pipeline under their own lock:
+    nlp.pipe processes a whole batch inside one next(), and interactive
+    parse() calls must not wait behind it.
+    """
+    nlp = _get_bulk_nlp()
+    docs = nlp.pipe(
+        texts,
+        batch_size=batch_size or Config.NLP_BATCH_SIZE,
+        n_process=n_process or Config.NLP_N_PROCESS
+    )
+    while True:
+        with _bulk_lock:
+            doc = next(docs, None)
+        if doc is None:
+            return
+        yield doc
+
+def prewarm():
+    """Load the model and run it once so the first request doesn't pay for it"""
+    parse("Book a hotel in Mumbai tomorrow")
+
+def is_loaded():
+    return _nlp is not None
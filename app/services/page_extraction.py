@@ -0,0 +1,179 @@
+import json
+import re
+from app.services.lazy_imports import LazyAttribute
+from config import Config
+
+BeautifulSoup = LazyAttribute('bs4', 'BeautifulSoup')
+
+# Per-site result card layouts. 'card' selects one element per result;
+# each field is (CSS selector inside the card, or None for the card
+# itself; attribute to read, or None for the element's text).
+# 'embedded' is optional, for pages that render their cards client-side
+# from a JSON blob: the <script> id, the key path to the result list, and
+# per field the item key, or a format string over the item's keys and
+# {base}, the site root from the Config attribute named by 'base'.
+SITE_SELECTORS = {
+    'redbus': {
+        'card': '.bus-item',
+        'fields': {
+            'operator': ('.travels', None),
+            'departure': ('.dep-time', None),
+            'arrival': ('.arr-time', None),
+            'duration': ('.dur', None),
+            'fare': ('.fare', None),
+            'available_seats': ('.seat-available', None),
+            'rating': ('.rating', None),
+            'booking_url': (None, 'data-url')
+        },
+        'embedded': {
+            'script': '__NEXT_DATA__',
+            'base': 'REDBUS_WEB_URL',
+            'path': ('props', 'pageProps', 'searchResult', 'inventories'),
+            'fields': {
+                'operator': 'travelsName',
+                'departure': 'departureTime',
+                'arrival': 'arrivalTime',
+                'duration': None,
+                'fare': 'fare',
+                'available_seats': 'availableSeats',
+                'rating': 'rating',
+                'booking_url': '{base}/bus/{id}'
+            }
+        }
+    },
+    'booking.com': {
+        'card': '.hotel-item',
+        'fields': {
+            'name': ('.hotel-name', None),
+            'rating': ('.rating', None),
+            'price': ('.price', None),
+            'location': ('.location', None),
+            'booking_url': (None, 'data-url')
+        }
+    }
+}
+
+_parser = None
+
+def _parser_name():
+    """lxml when it is installed, the stdlib parser otherwise"""
+    global _parser
+    if _parser is None:
+        try:
+            import lxml  # noqa: F401
+            _parser = 'lxml'
+        except ImportError:
+            _parser = 'html.parser'
+    return _parser
+
+_CLASS_SELECTOR = re.compile(r'\.([A-Za-z_][\w-]*)')
+_compiled = {}
+
+def _compile(site):
+    """
+    Split a site's selectors into plain '.class' lookups, served from one
+    walk over each card, and anything else, which goes through CSS select
+    """
+    layout = _compiled.get(site)
+    if layout is None:
+        spec = SITE_SELECTORS[site]
+        fields = []
+        for name, (selector, attribute) in spec['fields'].items():
+            match = _CLASS_SELECTOR.fullmatch(selector or '')
+            fields.append((name, selector, match.group(1) if match else None, attribute))
+        card = _CLASS_SELECTOR.fullmatch(spec['card'])
+        layout = _compiled[site] = (spec['card'], card.group(1) if card else None, fields)
+    return layout
+
+def _classes(card):
+    """First descendant element for each class name in the card"""
+    by_class = {}
+    for element in card.find_all(True):
+        for name in element.get('class') or ():
+            by_class.setdefault(name, element)
+    return by_class
+
+def _read(element, attribute):
+    if element is None:
+        return None
+    if attribute is not None:
+        return element.get(attribute)
+    return element.get_text(' ', strip=True)
+
+def extract_cards(html, site, limit=None):
+    """
+    Every result card in one HTML snapshot as a list of dicts, using the
+    site's entry in SITE_SELECTORS. Fields a card lacks come back as None.
+    """
+    card_selector, card_class, fields = _compile(site)
+    soup = BeautifulSoup(html, _parser_name())
+    if card_class:
+        cards = soup.find_all(class_=card_class, limit=limit)
+    else:
+        cards = soup.select(card_selector, limit=limit or 0)
+
+    results = []
+    for card in cards:
+        by_class = _classes(card)
+        result = {}
+        for name, selector, class_name, attribute in fields:
+            if selector is None:
+                element = card
+            elif class_name is not None:
+                element = by_class.get(class_name)
+            else:
+                element = card.select_one(selector)
+            result[name] = _read(element, attribute)
+        results.append(result)
+    return results
+
+_scripts = {}
+
+def _script_pattern(script_id):
+    pattern = _scripts.get(script_id)
+    if pattern is None:
+        pattern = _scripts[script_id] = re.compile(
+            r'<script[^>]*\bid=["\']' + re.escape(script_id) + r'["\'][^>]*>(.*?)</script>', re.S | re.I
+        )
+    return pattern
+
+def _embedded_value(item, key, base):
+    if key is None:
+        return None
+    if '{' in key:
+        try:
+            return key.format_map(dict(item, base=base))
+        except (KeyError, IndexError, ValueError):
+            return None
+    value = item.get(key)
+    # Same type the card path returns
+    return None if value is None else str(value)
+
+def extract_embedded(html, site, limit=None):
+    """
+    Results from the site's embedded JSON blob (its 'embedded' entry in
+    SITE_SELECTORS), in the same shape as extract_cards. [] when the site
+    has no blob configured or the page doesn't carry one.
+    """
+    spec = SITE_SELECTORS[site].get('embedded')
+    if not spec:
+        return []
+    # A regex finds the one script without parsing the whole document
+    match = _script_pattern(spec['script']).search(html)
+    if not match:
+        return []
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return []
+    for key in spec['path']:
+        data = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(data, list):
+        return []
+
+    fields = spec['fields'].items()
+    base = getattr(Config, spec['base']).rstrip('/') if spec.get('base') else ''
+    return [
+        {name: _embedded_value(item, key, base) for name, key in fields}
+        for item in data[:limit] if isinstance(item, dict)
+    ]
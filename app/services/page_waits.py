@@ -0,0 +1,270 @@
+import json
+import threading
+import time
+from collections import deque
+from fnmatch import fnmatchcase
+from config import Config
+
+# DevTools events that start and end a network request
+_REQUEST_STARTED = 'Network.requestWillBeSent'
+_REQUEST_DONE = ('Network.loadingFinished', 'Network.loadingFailed')
+
+# Request types that stay open or fire on their own schedule; they never
+# make a page look busy
+_LONG_LIVED_TYPES = frozenset(['WebSocket', 'EventSource', 'Ping'])
+
+def idle_ignored_patterns():
+    return [pattern.strip() for pattern in Config.SCRAPE_IDLE_IGNORED_URLS.split(',') if pattern.strip()]
+
+class WaitTimings:
+    """
+    How long each named wait took per site, so timeouts can be tuned from
+    data. Keeps running totals plus the last `window` samples for percentiles.
+    """
+
+    def __init__(self, window=256):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, site, name, seconds, timed_out=False):
+        with self._lock:
+            entry = self._samples.get((site, name))
+            if entry is None:
+                entry = self._samples[(site, name)] = {
+                    'count': 0, 'timeouts': 0, 'total_s': 0.0, 'max_s': 0.0,
+                    'recent': deque(maxlen=self.window)
+                }
+            entry['count'] += 1
+            entry['timeouts'] += int(timed_out)
+            entry['total_s'] += seconds
+            entry['max_s'] = max(entry['max_s'], seconds)
+            entry['recent'].append(seconds)
+
+    def stats(self):
+        """{site: {wait: {'count', 'timeouts', 'mean_s', 'p50_s', 'p95_s', 'max_s'}}}"""
+        with self._lock:
+            snapshot = {key: dict(entry, recent=sorted(entry['recent'])) for key, entry in self._samples.items()}
+        stats = {}
+        for (site, name), entry in snapshot.items():
+            recent = entry['recent']
+            stats.setdefault(site, {})[name] = {
+                'count': entry['count'],
+                'timeouts': entry['timeouts'],
+                'mean_s': entry['total_s'] / entry['count'],
+                'p50_s': recent[len(recent) // 2],
+                'p95_s': recent[min(len(recent) - 1, int(0.95 * len(recent)))],
+                'max_s': entry['max_s']
+            }
+        return stats
+
+wait_timings = WaitTimings()
+
+# Bytes over the wire and timings of the current page, from Navigation and
+# Resource Timing. Cross-origin resources without Timing-Allow-Origin report
+# a transferSize of 0, so 'bytes' is a lower bound; blocked requests never
+# appear at all.
+_PAGE_METRICS_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0] || {};
+var resources = performance.getEntriesByType('resource');
+var bytes = nav.transferSize || 0;
+for (var i = 0; i < resources.length; i++) { bytes += resources[i].transferSize || 0; }
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd || 0,
+    ready_ms: performance.now()
+};
+"""
+
+class PageMetrics:
+    """
+    Per-page transfer size and load time for each (site, profile), where
+    profile is the browser profile ('lean'/'full') or 'http' for pages
+    fetched without one, so the cost of each way of scraping can be compared
+    """
+
+    def __init__(self, window=256):
+        self.window = window
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def record(self, site, profile, transferred, requests, load_s):
+        with self._lock:
+            entry = self._pages.get((site, profile))
+            if entry is None:
+                entry = self._pages[(site, profile)] = {
+                    'pages': 0, 'bytes': 0, 'requests': 0, 'load_s': 0.0,
+                    'recent_bytes': deque(maxlen=self.window), 'recent_load_s': deque(maxlen=self.window)
+                }
+            entry['pages'] += 1
+            entry['bytes'] += transferred
+            entry['requests'] += requests
+            entry['load_s'] += load_s
+            entry['recent_bytes'].append(transferred)
+            entry['recent_load_s'].append(load_s)
+
+    def stats(self):
+        """{site: {profile: {'pages', 'mean_kb', 'p95_kb', 'mean_requests', 'mean_load_s', 'p50_load_s', 'p95_load_s'}}}"""
+        with self._lock:
+            snapshot = {
+                key: dict(entry, recent_bytes=sorted(entry['recent_bytes']),
+                          recent_load_s=sorted(entry['recent_load_s']))
+                for key, entry in self._pages.items()
+            }
+        stats = {}
+        for (site, profile), entry in snapshot.items():
+            pages = entry['pages']
+            sizes, loads = entry['recent_bytes'], entry['recent_load_s']
+            stats.setdefault(site, {})[profile] = {
+                'pages': pages,
+                'mean_kb': entry['bytes'] / pages / 1024,
+                'p95_kb': sizes[min(len(sizes) - 1, int(0.95 * len(sizes)))] / 1024,
+                'mean_requests': entry['requests'] / pages,
+                'mean_load_s': entry['load_s'] / pages,
+                'p50_load_s': loads[len(loads) // 2],
+                'p95_load_s': loads[min(len(loads) - 1, int(0.95 * len(loads)))]
+            }
+        return stats
+
+page_metrics = PageMetrics()
+
+class PageWaiter:
+    """
+    Condition-based waits for one site, each timed into `timings`.
+    Waits poll every `poll` seconds and return as soon as their condition
+    holds; on timeout they return what they last saw instead of raising,
+    and the caller's own element waits decide whether the page is usable.
+    """
+
+    def __init__(self, driver, site, timeout=None, poll=None, timings=None):
+        self.driver = driver
+        self.site = site
+        self.timeout = timeout or Config.SCRAPE_WAIT_TIMEOUT
+        self.poll = poll or Config.SCRAPE_POLL_INTERVAL
+        self.timings = timings or wait_timings
+
+    def dom_ready(self, timeout=None):
+        """document.readyState is 'complete'"""
+        return self._poll('dom_ready', lambda: self.driver.execute_script('return document.readyState') == 'complete',
+                          timeout)
+
+    def results_stable(self, css_selector, settle=None, timeout=None):
+        """
+        Number of elements matching css_selector is non-zero and unchanged
+        for `settle` seconds; returns the final count
+        """
+        settle = Config.SCRAPE_SETTLE_SECONDS if settle is None else settle
+        script = 'return document.querySelectorAll(arguments[0]).length'
+        state = {'count': -1, 'since': time.monotonic()}
+
+        def stable():
+            count = self.driver.execute_script(script, css_selector)
+            now = time.monotonic()
+            if count != state['count']:
+                state['count'], state['since'] = count, now
+            return count > 0 and now - state['since'] >= settle
+
+        self._poll('results_stable', stable, timeout)
+        return max(state['count'], 0)
+
+    def network_idle(self, idle=None, timeout=None):
+        """
+        No request started or finished for `idle` seconds, read from the
+        DevTools performance log (needs goog:loggingPrefs, see
+        build_chrome_options). Long-polls, websockets, beacons and
+        SCRAPE_IDLE_IGNORED_URLS don't count, and a request left open is
+        not activity, so pages that never fall silent still go idle. Falls
+        back to a stable count of Resource Timing entries without the log.
+        Meant as a short check after results_stable: the timeout defaults
+        to SCRAPE_NETWORK_IDLE_TIMEOUT, and a timeout of 0 skips it.
+        """
+        idle = Config.SCRAPE_NETWORK_IDLE_SECONDS if idle is None else idle
+        timeout = Config.SCRAPE_NETWORK_IDLE_TIMEOUT if timeout is None else timeout
+        if timeout <= 0:
+            return True
+        state = {'since': time.monotonic(), 'log': True, 'resources': -1, 'ignored': set()}
+        patterns = idle_ignored_patterns()
+
+        def quiet():
+            now = time.monotonic()
+            busy = self._network_busy(state, patterns)
+            if busy:
+                state['since'] = now
+            return not busy and now - state['since'] >= idle
+
+        return self._poll('network_idle', quiet, timeout)
+
+    def url_change(self, previous_url, timeout=None):
+        """The browser has navigated away from previous_url"""
+        return self._poll('url_change', lambda: self.driver.current_url != previous_url, timeout)
+
+    def measure_page(self, profile, metrics=None):
+        """
+        Record the current page's bytes transferred and time until now (its
+        results are usable) under this site and `profile`; returns the sample
+        """
+        try:
+            sample = self.driver.execute_script(_PAGE_METRICS_SCRIPT)
+        except Exception:
+            return None
+        (metrics or page_metrics).record(
+            self.site, profile, int(sample['bytes']), int(sample['requests']), sample['ready_ms'] / 1000.0
+        )
+        return sample
+
+    def until(self, name, condition, timeout=None):
+        """Any Selenium-style condition (e.g. an expected_conditions callable), timed as `name`"""
+        result = {}
+
+        def met():
+            value = condition(self.driver)
+            result['value'] = value
+            return bool(value)
+
+        if not self._poll(name, met, timeout):
+            raise TimeoutError(f"{self.site}: '{name}' not met within {self.timeout if timeout is None else timeout}s")
+        return result['value']
+
+    def _network_busy(self, state, patterns):
+        """True when a request that counts started or finished since the last poll"""
+        if state['log']:
+            try:
+                entries = self.driver.get_log('performance')
+            except Exception:
+                state['log'] = False
+            else:
+                busy = False
+                for entry in entries:
+                    message = json.loads(entry['message'])['message']
+                    method = message.get('method')
+                    if method == _REQUEST_STARTED:
+                        params = message['params']
+                        url = params.get('request', {}).get('url', '')
+                        if params.get('type') in _LONG_LIVED_TYPES or any(fnmatchcase(url, p) for p in patterns):
+                            state['ignored'].add(params['requestId'])
+                        else:
+                            busy = True
+                    elif method in _REQUEST_DONE:
+                        busy = busy or message['params']['requestId'] not in state['ignored']
+                return busy
+        count = self.driver.execute_script("return performance.getEntriesByType('resource').length")
+        busy = count != state['resources']
+        state['resources'] = count
+        return busy
+
+    def _poll(self, name, condition, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            try:
+                met = condition()
+            except Exception:
+                # Mid-navigation the page can vanish under a script; treat as not yet
+                met = False
+            now = time.monotonic()
+            if met or now >= deadline:
+                self.timings.record(self.site, name, now - started, timed_out=not met)
+                return met
+            time.sleep(min(self.poll, deadline - now))
@@ -1,12 +1,33 @@
-import razorpay
+import threading
 from app.models import db
+from app.services.http_client import provider_http
+from app.services.lazy_imports import LazyModule
 from config import Config
 
+razorpay = LazyModule('razorpay')
+
+_razorpay_client = None
+_razorpay_lock = threading.Lock()
+
+def get_razorpay_client():
+    """
+    Process-wide Razorpay client on the pooled session for api.razorpay.com,
+    so payment calls reuse keep-alive connections and get default timeouts
+    """
+    global _razorpay_client
+    if _razorpay_client is None:
+        with _razorpay_lock:
+            if _razorpay_client is None:
+                _razorpay_client = razorpay.Client(
+                    session=provider_http.session_for(Config.RAZORPAY_BASE_URL),
+                    auth=(Config.RAZORPAY_KEY_ID, Config.RAZORPAY_KEY_SECRET),
+                    base_url=Config.RAZORPAY_BASE_URL
+                )
+    return _razorpay_client
+
 class PaymentService:
     def __init__(self):
-        self.client = razorpay.Client(
-            auth=(Config.RAZORPAY_KEY_ID, Config.RAZORPAY_KEY_SECRET)
-        )
+        self.client = get_razorpay_client()
         
     def create_payment_link(self, booking):
         """Create a payment link for the booking"""
@@ -0,0 +1,479 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from app.services.lazy_imports import LazyModule
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per store path
+    fcntl = None
+
+np = LazyModule('numpy')
+
+logger = logging.getLogger(__name__)
+
+# Column name -> numpy dtype string. Segment files lay the columns out one
+# after another in this order (widest first, so every column stays aligned).
+COLUMNS = (
+    ('ts', '<i8'),
+    ('key', '<u4'),
+    ('min', '<f4'),
+    ('median', '<f4'),
+    ('max', '<f4'),
+    ('count', '<u4'),
+    ('provider', '<u2')
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+ROW_BYTES = sum(int(dtype[-1]) for _, dtype in COLUMNS)
+
+# Tier -> bucket width in seconds (None keeps every observation)
+TIERS = (('raw', None), ('hourly', 3600), ('daily', 86400))
+TIER_WIDTHS = dict(TIERS)
+
+def _empty(size=0):
+    return {name: np.empty(size, dtype=dtype) for name, dtype in COLUMNS}
+
+def _concat(parts):
+    if not parts:
+        return _empty()
+    return {name: np.concatenate([part[name] for part in parts]) for name in COLUMN_NAMES}
+
+def rollup(columns, width):
+    """
+    Downsample rows into `width`-second buckets per key and provider:
+    min of mins, max of maxes, summed counts, and the median of the
+    bucket's medians (an approximation of the true median)
+    """
+    n = len(columns['ts'])
+    if n == 0:
+        return _empty()
+    bucket = columns['ts'] // width * width
+    order = np.lexsort((columns['median'], columns['provider'], bucket, columns['key']))
+    key, bucket, provider = columns['key'][order], bucket[order], columns['provider'][order]
+
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (key[1:] != key[:-1]) | (bucket[1:] != bucket[:-1]) | (provider[1:] != provider[:-1])
+    starts = np.flatnonzero(boundary)
+    sizes = np.diff(np.append(starts, n))
+    return {
+        'ts': bucket[starts],
+        'key': key[starts],
+        'min': np.minimum.reduceat(columns['min'][order], starts),
+        # Within a group rows are sorted by median, so the middle row holds it
+        'median': columns['median'][order][starts + (sizes - 1) // 2],
+        'max': np.maximum.reduceat(columns['max'][order], starts),
+        'count': np.add.reduceat(columns['count'][order], starts).astype('<u4'),
+        'provider': provider[starts]
+    }
+
+class _Segment:
+    """Immutable columns of one tier, memory-mapped when the store has a path"""
+
+    def __init__(self, tier, seq, columns, path=None):
+        self.tier = tier
+        self.seq = seq
+        self.columns = columns
+        self.path = path
+        self.rows = len(columns['ts'])
+        self.min_ts = int(columns['ts'].min()) if self.rows else 0
+        self.max_ts = int(columns['ts'].max()) if self.rows else 0
+
+    @classmethod
+    def write(cls, directory, tier, seq, columns):
+        path = os.path.join(directory, f"{tier}-{seq:08d}.seg")
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for name, dtype in COLUMNS:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        os.replace(tmp_path, path)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        tier, seq = os.path.basename(path)[:-len('.seg')].split('-')
+        rows = os.path.getsize(path) // ROW_BYTES
+        columns, offset = {}, 0
+        for name, dtype in COLUMNS:
+            if rows:
+                columns[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(rows,))
+            else:
+                columns[name] = np.empty(0, dtype=dtype)
+            offset += rows * np.dtype(dtype).itemsize
+        return cls(tier, int(seq), columns, path)
+
+    def remove(self):
+        self.columns = None
+        if self.path:
+            os.remove(self.path)
+
+class PriceHistory:
+    """
+    Price observations per watch key (route or hotel search) and provider,
+    stored as columns: ts, min, median and max fare, and how many raw
+    observations a row stands for.
+
+    New rows go to an in-memory raw buffer that is sealed into a segment
+    once it holds `segment_rows` rows or its oldest row is `seal_seconds`
+    old (a timer covers quiet periods), and every seal runs compaction:
+    raw rows older than `raw_hours` are rolled up hourly, and hourly ones
+    older than `hourly_days` daily; a tier with more than `max_segments`
+    segments is merged. With a `path` every segment is a file of contiguous columns,
+    memory-mapped for queries. Queries scan all tiers with vectorized masks.
+
+    Every worker process sharing a path writes to the same store: changes
+    to segments and ids happen under an flock on the directory's lock
+    file, after picking up what other processes have written. Rows still
+    buffered in one process are not visible to the others until sealed.
+    """
+
+    def __init__(self, path=None, segment_rows=None, raw_hours=None, hourly_days=None, max_segments=None,
+                 seal_seconds=None):
+        self.path = Config.PRICE_HISTORY_PATH if path is None else path
+        self.segment_rows = segment_rows or Config.PRICE_HISTORY_SEGMENT_ROWS
+        self.seal_seconds = seal_seconds or Config.PRICE_HISTORY_SEAL_SECONDS
+        self.raw_seconds = (raw_hours or Config.PRICE_HISTORY_RAW_HOURS) * 3600
+        self.hourly_seconds = (hourly_days or Config.PRICE_HISTORY_HOURLY_DAYS) * 86400
+        self.max_segments = max_segments or Config.PRICE_HISTORY_MAX_SEGMENTS
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._timer = None
+        # Nesting depth of _exclusive, and the lock file held by its outermost entry
+        self._depth = 0
+        self._lock_file = None
+
+    def record(self, key, provider, prices, ts=None):
+        """Append one observation: the min/median/max of a scrape's prices"""
+        prices = sorted(prices)
+        if not prices:
+            return
+        ts = int(ts if ts is not None else time.time())
+        self._load()
+        with self._lock:
+            if self._rows == 0:
+                self._oldest = ts
+                self._arm()
+            elif self._rows == len(self._raw['ts']):
+                self._grow()
+            self._oldest = min(self._oldest, ts)
+            i = self._rows
+            self._raw['ts'][i] = ts
+            self._raw['key'][i] = self._id('keys', key)
+            self._raw['provider'][i] = self._id('providers', provider)
+            self._raw['min'][i] = prices[0]
+            self._raw['median'][i] = prices[(len(prices) - 1) // 2]
+            self._raw['max'][i] = prices[-1]
+            self._raw['count'][i] = 1
+            self._rows += 1
+            if self._rows >= self.segment_rows or ts - self._oldest >= self.seal_seconds:
+                with self._exclusive():
+                    self._seal()
+                    self.compact(max(ts, int(time.time())))
+
+    def record_many(self, columns):
+        """
+        Bulk append: a dict of equal-length sequences with 'key' and
+        'provider' names plus 'ts', 'min', 'median', 'max' (and optional 'count')
+        """
+        self._load()
+        with self._exclusive():
+            n = len(columns['ts'])
+            rows = {
+                'ts': np.asarray(columns['ts'], dtype='<i8'),
+                'key': np.fromiter((self._id('keys', key) for key in columns['key']), '<u4', n),
+                'provider': np.fromiter(
+                    (self._id('providers', provider) for provider in columns['provider']), '<u2', n
+                ),
+                'min': np.asarray(columns['min'], dtype='<f4'),
+                'median': np.asarray(columns['median'], dtype='<f4'),
+                'max': np.asarray(columns['max'], dtype='<f4'),
+                'count': np.asarray(columns.get('count', np.ones(n)), dtype='<u4')
+            }
+            for start in range(0, n, self.segment_rows):
+                self._add_segment('raw', {name: rows[name][start:start + self.segment_rows] for name in COLUMN_NAMES})
+            self.compact()
+
+    def flush(self):
+        """Seal buffered raw rows into a segment"""
+        if not self._loaded:
+            return
+        with self._exclusive():
+            if self._rows:
+                self._seal()
+
+    def compact(self, now=None):
+        """Roll aged raw segments up hourly, aged hourly segments daily, and merge crowded tiers"""
+        self._load()
+        now = int(now if now is not None else time.time())
+        with self._exclusive():
+            self._age('raw', 'hourly', now - self.raw_seconds)
+            self._age('hourly', 'daily', now - self.hourly_seconds)
+            for tier, width in TIERS:
+                segments = list(self._segments[tier])
+                if len(segments) > self.max_segments:
+                    merged = _concat([segment.columns for segment in segments])
+                    if width:
+                        merged = rollup(merged, width)
+                    self._replace(segments, tier, merged)
+
+    def lowest(self, key, days=30, provider=None, now=None):
+        """Lowest price seen for key over the last `days` days, or None"""
+        rows = self._select(key, days, provider, now, ('min',))
+        return float(rows['min'].min()) if len(rows['min']) else None
+
+    def percentiles(self, key, q=(5, 25, 50, 75, 95), days=30, provider=None, now=None):
+        """
+        {q: price} over the last `days` days, from each row's median weighted
+        by the observations it stands for; {} when there is no data
+        """
+        rows = self._select(key, days, provider, now, ('median', 'count'))
+        if not len(rows['median']):
+            return {}
+        order = np.argsort(rows['median'], kind='stable')
+        values = rows['median'][order]
+        weights = np.cumsum(rows['count'][order], dtype='f8')
+        positions = np.searchsorted(weights, np.asarray(q, dtype='f8') / 100.0 * weights[-1], side='left')
+        positions = np.minimum(positions, len(values) - 1)
+        return {p: float(values[i]) for p, i in zip(q, positions)}
+
+    def trend(self, key, days=30, bucket='daily', provider=None, now=None):
+        """
+        Per-bucket ('hourly' or 'daily') min/median/max over the last `days`
+        days, plus the least-squares slope of the bucket minimums per day
+        """
+        rows = self._select(key, days, provider, now, ('ts', 'key', 'provider', 'min', 'median', 'max', 'count'))
+        # Collapse providers so there is one point per bucket
+        rows['provider'] = np.zeros_like(rows['provider'])
+        points = rollup(rows, TIER_WIDTHS[bucket])
+        slope = None
+        if len(points['ts']) >= 2:
+            days_axis = (points['ts'] - points['ts'][0]) / 86400.0
+            slope = float(np.polyfit(days_axis, points['min'].astype('f8'), 1)[0])
+        return {
+            'points': [
+                {'ts': int(t), 'min': float(lo), 'median': float(mid), 'max': float(hi), 'count': int(c)}
+                for t, lo, mid, hi, c in zip(points['ts'], points['min'], points['median'], points['max'],
+                                             points['count'])
+            ],
+            'slope_per_day': slope
+        }
+
+    def stats(self):
+        self._load()
+        with self._exclusive():
+            stats = {
+                tier: {
+                    'segments': len(self._segments[tier]),
+                    'rows': sum(segment.rows for segment in self._segments[tier])
+                }
+                for tier, _ in TIERS
+            }
+            stats['raw']['buffered'] = self._rows
+            stats['keys'] = len(self._ids['keys'])
+            stats['bytes'] = (self._rows + sum(stats[tier]['rows'] for tier, _ in TIERS)) * ROW_BYTES
+        return stats
+
+    def _select(self, key, days, provider, now, names):
+        """Rows for key (and provider) newer than `days` days ago, as a dict of the named columns"""
+        self._load()
+        since = int(now if now is not None else time.time()) - int(days * 86400)
+        with self._exclusive():
+            key_id = self._ids['keys'].get(key)
+            provider_id = self._ids['providers'].get(provider) if provider is not None else None
+            sources = [
+                segment.columns for tier, _ in TIERS for segment in self._segments[tier] if segment.max_ts >= since
+            ]
+            # A view of the filled part; later appends don't touch it
+            sources.append({name: column[:self._rows] for name, column in self._raw.items()})
+        if key_id is None or (provider is not None and provider_id is None):
+            return {name: _empty()[name] for name in names}
+
+        parts = []
+        for columns in sources:
+            mask = columns['key'] == key_id
+            mask &= columns['ts'] >= since
+            if provider_id is not None:
+                mask &= columns['provider'] == provider_id
+            index = np.flatnonzero(mask)
+            if index.size:
+                parts.append({name: columns[name][index] for name in names})
+        if not parts:
+            return {name: _empty()[name] for name in names}
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._segments = {tier: [] for tier, _ in TIERS}
+            # Key and provider ids, and the last segment number; shared through ids.json
+            self._ids = {'keys': {}, 'providers': {}, 'seq': 0}
+            self._generation = None
+            if self.path:
+                # Segments and ids are read on the first _exclusive
+                os.makedirs(self.path, exist_ok=True)
+            self._raw = _empty(1024)
+            self._rows = 0
+            self._loaded = True
+
+    def _arm(self):
+        """Seal whatever is buffered `seal_seconds` from now, even if no more rows arrive"""
+        if self._timer is None:
+            self._timer = threading.Timer(self.seal_seconds, self._seal_due)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _seal_due(self):
+        try:
+            with self._exclusive():
+                # Lost the race with a seal that cancelled this timer; the
+                # buffer now belongs to the timer armed after it
+                if self._timer is not threading.current_thread():
+                    return
+                self._timer = None
+                if self._rows:
+                    self._seal()
+                self.compact()
+        except Exception as e:
+            logger.error(f"Sealing price history failed: {str(e)}")
+
+    @contextmanager
+    def _exclusive(self):
+        """
+        Hold the store against other threads and, with a path, other
+        processes; the outermost entry first syncs with the directory
+        """
+        with self._lock:
+            outermost = self._depth == 0 and self.path
+            if outermost:
+                self._lock_file = open(os.path.join(self.path, '.lock'), 'a+')
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                if outermost:
+                    self._sync()
+                yield
+            finally:
+                self._depth -= 1
+                if outermost:
+                    # Closing releases the flock
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _sync(self):
+        """Pick up ids and segments other processes sharing the path have written"""
+        # The lock file holds a generation bumped on every ids.json write
+        self._lock_file.seek(0)
+        generation = self._lock_file.read()
+        if not generation or generation != self._generation:
+            ids_path = os.path.join(self.path, 'ids.json')
+            if os.path.exists(ids_path):
+                with open(ids_path) as f:
+                    ids = json.load(f)
+                self._ids = {'keys': ids['keys'], 'providers': ids['providers'], 'seq': ids.get('seq', 0)}
+            self._generation = generation
+
+        names = {name for name in os.listdir(self.path) if name.endswith('.seg')}
+        known = set()
+        for tier, _ in TIERS:
+            # Segments another process compacted away are dropped, never removed here
+            self._segments[tier] = [
+                segment for segment in self._segments[tier] if os.path.basename(segment.path) in names
+            ]
+            known.update(os.path.basename(segment.path) for segment in self._segments[tier])
+        for name in sorted(names - known):
+            segment = _Segment.open(os.path.join(self.path, name))
+            self._segments[segment.tier].append(segment)
+            self._ids['seq'] = max(self._ids['seq'], segment.seq)
+        for tier, _ in TIERS:
+            self._segments[tier].sort(key=lambda segment: segment.seq)
+
+    def _grow(self):
+        size = len(self._raw['ts']) * 2
+        for name, dtype in COLUMNS:
+            column = np.empty(size, dtype=dtype)
+            column[:self._rows] = self._raw[name][:self._rows]
+            self._raw[name] = column
+
+    def _seal(self):
+        # The next row into the empty buffer arms a timer of its own
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._add_segment('raw', {name: column[:self._rows].copy() for name, column in self._raw.items()})
+        self._raw = _empty(1024)
+        self._rows = 0
+
+    def _add_segment(self, tier, columns):
+        with self._exclusive():
+            self._ids['seq'] += 1
+            # Saved before the file is written, so no crash can hand the number out twice
+            self._save_ids()
+            if self.path:
+                segment = _Segment.write(self.path, tier, self._ids['seq'], columns)
+            else:
+                segment = _Segment(tier, self._ids['seq'], columns)
+            self._segments[tier].append(segment)
+        return segment
+
+    def _replace(self, old_segments, tier, columns):
+        # New segment first, so a crash in between duplicates rows rather than losing them
+        if len(columns['ts']):
+            self._add_segment(tier, columns)
+        for segment in old_segments:
+            self._segments[segment.tier].remove(segment)
+            segment.remove()
+
+    def _age(self, tier, into, cutoff):
+        """Roll rows older than cutoff into the next tier; younger rows in the same segments are rewritten"""
+        aged = [segment for segment in self._segments[tier] if segment.min_ts < cutoff]
+        if not aged:
+            return
+        columns = _concat([segment.columns for segment in aged])
+        old = columns['ts'] < cutoff
+        # Align the cut to the next tier's buckets so no bucket is split across two rollups
+        width = TIER_WIDTHS[into]
+        old &= columns['ts'] // width * width + width <= cutoff
+        if not old.any():
+            return
+        young = {name: column[~old] for name, column in columns.items()}
+        rolled = rollup({name: column[old] for name, column in columns.items()}, width)
+        self._add_segment(into, rolled)
+        self._replace(aged, tier, young)
+
+    def _id(self, kind, name):
+        """Id of a key or provider name ('keys' or 'providers'), allocated store-wide when new"""
+        value = self._ids[kind].get(name)
+        if value is None:
+            with self._exclusive():
+                ids = self._ids[kind]
+                value = ids.get(name)
+                if value is None:
+                    value = ids[name] = len(ids)
+                    self._save_ids()
+        return value
+
+    def _save_ids(self):
+        """Write ids.json and bump the generation other processes sync on; needs _exclusive"""
+        if not self.path:
+            return
+        ids_path = os.path.join(self.path, 'ids.json')
+        with open(ids_path + '.tmp', 'w') as f:
+            json.dump(self._ids, f)
+        os.replace(ids_path + '.tmp', ids_path)
+        self._generation = str(int(self._generation or 0) + 1)
+        self._lock_file.seek(0)
+        self._lock_file.truncate()
+        self._lock_file.write(self._generation)
+        self._lock_file.flush()
+
+price_history = PriceHistory()
+atexit.register(price_history.flush)
@@ -0,0 +1,390 @@
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from app.services.price_history import price_history
+from app.services.search_cache import make_cache_key
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def search_prices(search_params):
+    """Default price source: one BookingAutomation search, on a pooled browser only if needed"""
+    from app.services.booking_automation import BookingAutomation
+    return BookingAutomation(headless=True).search_prices(search_params)
+
+def watch_site(search_params):
+    """Site a watch's prices come from: RedBus for routes, Booking.com for hotel searches"""
+    if search_params.get('source') and search_params.get('destination'):
+        return 'redbus'
+    return 'booking.com'
+
+# Watch params that are numbers; query strings carry them as text
+_NUMERIC_FIELDS = ('guests', 'rooms', 'min_rating')
+
+def watch_key(search_params):
+    """
+    Group key for a watch's search params. Numeric fields key the same
+    whether given as numbers or as text (e.g. '2' from a query string).
+    """
+    params = dict(search_params)
+    for field in _NUMERIC_FIELDS:
+        value = params.get(field)
+        if isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                continue
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if value is not None:
+            params[field] = value
+    return make_cache_key('price_watch', params)
+
+def log_alert(subscriber, price, search_params):
+    logger.info(f"Price alert for {subscriber}: {price} for {json.dumps(search_params, default=str)}")
+
+# Date formats a watch's travel date may arrive in besides ISO
+_DATE_FORMATS = ('%d-%m-%Y', '%d/%m/%Y', '%d-%b-%Y', '%d %b %Y', '%d %B %Y')
+
+def travel_date(search_params):
+    """The watch's departure or check-in date, or None when it has none we can read"""
+    value = search_params.get('date') or search_params.get('check_in')
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+class _WatchGroup:
+    """Every watch on one set of search params; checked with a single scrape"""
+
+    def __init__(self, key, search_params, now):
+        self.key = key
+        self.search_params = search_params
+        self.travel_date = travel_date(search_params)
+        # subscriber -> (threshold, on_alert)
+        self.subscribers = {}
+        self.created_at = now
+        self.last_price = None
+        self.checked_at = None
+        # EWMA of relative price change per hour; None until two prices are seen
+        self.volatility = None
+        self.interval = None
+        # When the group's live heap entry is due, and whether a check is running
+        self.due = None
+        self.checking = False
+
+    def nearest_threshold(self):
+        return max(threshold for threshold, _ in self.subscribers.values())
+
+class PollingPolicy:
+    """
+    When a watch group is next checked.
+
+    The interval aims to check about twice before the price could drift
+    from where it is to the nearest subscriber threshold at the observed
+    volatility (an EWMA of relative change per hour), shrinks linearly
+    inside `urgent_days` of travel, and is clamped to [min_interval,
+    max_interval]. Groups without two prices yet use `base`.
+    """
+
+    def __init__(self, base=None, min_interval=None, max_interval=None, alpha=None, urgent_days=None,
+                 safety=0.5):
+        self.base = base or Config.PRICE_WATCH_INTERVAL
+        self.min_interval = min_interval or Config.PRICE_WATCH_MIN_INTERVAL
+        self.max_interval = max_interval or Config.PRICE_WATCH_MAX_INTERVAL
+        self.alpha = alpha or Config.PRICE_WATCH_VOLATILITY_ALPHA
+        self.urgent_days = urgent_days or Config.PRICE_WATCH_URGENT_DAYS
+        self.safety = safety
+
+    def observe(self, group, price, now):
+        """Fold a new lowest price into the group's volatility"""
+        if group.last_price and group.checked_at is not None:
+            hours = max((now - group.checked_at) / 3600.0, 1 / 60.0)
+            change = abs(price - group.last_price) / group.last_price / hours
+            if group.volatility is None:
+                group.volatility = change
+            else:
+                group.volatility = self.alpha * change + (1 - self.alpha) * group.volatility
+        group.last_price, group.checked_at = price, now
+
+    def interval(self, group, today=None):
+        """Seconds until the group's next check"""
+        if group.volatility is None or not group.last_price or not group.subscribers:
+            seconds = self.base
+        elif group.volatility == 0:
+            seconds = self.max_interval
+        else:
+            gap = max(group.last_price - group.nearest_threshold(), 0) / group.last_price
+            seconds = self.safety * gap / group.volatility * 3600
+
+        if group.travel_date is not None:
+            days = (group.travel_date - (today or date.today())).days
+            if days < 0:
+                # Travel date has passed; the scheduler drops the group when it comes due
+                return self.max_interval
+            if days < self.urgent_days:
+                seconds *= (days + 1) / (self.urgent_days + 1)
+        return min(max(seconds, self.min_interval), self.max_interval)
+
+class PriceWatchScheduler:
+    """
+    One scheduler for every price watch.
+
+    Watches whose search params normalize the same (see watch_key)
+    share a group, and each due check is one scrape compared against every
+    subscriber's threshold. Due checks sit in a heap and run on at most
+    `workers` threads, so browsers in use never exceed the worker count.
+    A subscriber is alerted once and then dropped, as is one who cancels;
+    a group with no subscribers left is never checked again.
+
+    Each group's next check comes from `policy` (PollingPolicy). With an
+    hourly budget, intervals are stretched evenly while the planned rate
+    exceeds it, and dispatch waits rather than go over it. stats() reports
+    checks saved against polling every group hourly. Each check's prices
+    go to `history` (price_history) under the group key. A new subscriber
+    can bring the group's next check forward; a group whose travel date
+    has passed is dropped, subscribers and all, instead of being checked.
+    """
+
+    def __init__(self, workers=None, policy=None, fetch_prices=None, hourly_budget=None, history=None):
+        self.workers = workers or Config.PRICE_WATCH_WORKERS
+        self.policy = policy or PollingPolicy()
+        self.fetch_prices = fetch_prices or search_prices
+        # Every check's prices are kept, keyed like the watch group
+        self.history = history or price_history
+        self.hourly_budget = Config.PRICE_WATCH_HOURLY_BUDGET if hourly_budget is None else hourly_budget
+        self._groups = {}
+        self._subscriptions = {}
+        # (due, seq, group); entries for dropped or rescheduled groups are skipped when popped
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._thread = None
+        self._executor = None
+        # Planned checks per hour over live groups, before budget stretching
+        self._hourly_rate = 0.0
+        self._dispatched = deque(maxlen=self.hourly_budget or 1)
+        # Hourly-polling checks owed by groups that have ended
+        self._fixed_checks_done = 0
+        self.counters = {'checks': 0, 'errors': 0, 'alerts': 0, 'budget_waits': 0, 'expired': 0}
+
+    def watch(self, subscriber, search_params, threshold, on_alert=None):
+        """
+        Alert `subscriber` once the lowest price for search_params is at or
+        below threshold, via on_alert(subscriber, price, search_params).
+        Replaces the subscriber's current watch; returns the group key.
+        """
+        key = watch_key(search_params)
+        with self._cond:
+            self._remove(subscriber)
+            group = self._groups.get(key)
+            if group is None:
+                now = time.monotonic()
+                group = self._groups[key] = _WatchGroup(key, dict(search_params), now)
+                self._schedule(group, now)
+                group.subscribers[subscriber] = (threshold, on_alert or log_alert)
+            else:
+                group.subscribers[subscriber] = (threshold, on_alert or log_alert)
+                self._reschedule(group)
+            self._subscriptions[subscriber] = key
+            self._start()
+            self._cond.notify()
+        return key
+
+    def cancel(self, subscriber):
+        """Stop a subscriber's watch; no alert is sent after this returns. False if there was none."""
+        with self._cond:
+            return self._remove(subscriber)
+
+    def is_watching(self, subscriber):
+        with self._cond:
+            return subscriber in self._subscriptions
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            fixed = self._fixed_checks_done + sum(self._fixed_checks(group, now) for group in self._groups.values())
+            stats = dict(self.counters)
+            stats.update({
+                'watches': len(self._subscriptions),
+                'groups': len(self._groups),
+                'in_flight': self._in_flight,
+                'workers': self.workers,
+                'planned_per_hour': round(self._hourly_rate, 2),
+                'budget_per_hour': self.hourly_budget or None,
+                'budget_stretch': round(self._stretch(), 3),
+                'fixed_hourly_checks': fixed,
+                'checks_saved': fixed - self.counters['checks']
+            })
+        return stats
+
+    def _fixed_checks(self, group, now):
+        # Hourly polling checks on creation and then once an hour
+        return int((now - group.created_at) // 3600) + 1
+
+    def _remove(self, subscriber):
+        key = self._subscriptions.pop(subscriber, None)
+        if key is None:
+            return False
+        group = self._groups[key]
+        group.subscribers.pop(subscriber, None)
+        if not group.subscribers:
+            del self._groups[key]
+            self._set_interval(group, None)
+            self._fixed_checks_done += self._fixed_checks(group, time.monotonic())
+        return True
+
+    def _schedule(self, group, due):
+        # Supersedes any earlier entry for the group; those are skipped when popped
+        group.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), group))
+
+    def _reschedule(self, group):
+        """Bring the group's next check forward if its subscribers now call for a shorter interval"""
+        if group.checking or group.checked_at is None:
+            # The running check, or the first one still pending, schedules with everyone in
+            return
+        self._set_interval(group, self.policy.interval(group))
+        due = group.checked_at + group.interval * self._stretch()
+        if due < group.due:
+            self._schedule(group, due)
+            self._cond.notify()
+
+    def _expire(self, group):
+        """Drop a group whose travel date has passed, with every subscriber still on it"""
+        logger.info(f"Price watch {group.key} ended: travel date {group.travel_date} has passed "
+                    f"({len(group.subscribers)} subscribers dropped)")
+        for subscriber in list(group.subscribers):
+            self._remove(subscriber)
+        self.counters['expired'] += 1
+
+    def _set_interval(self, group, interval):
+        """Track the group's planned interval in the total hourly rate"""
+        if group.interval:
+            self._hourly_rate -= 3600.0 / group.interval
+        group.interval = interval
+        if interval:
+            self._hourly_rate += 3600.0 / interval
+
+    def _stretch(self):
+        if not self.hourly_budget or self._hourly_rate <= self.hourly_budget:
+            return 1.0
+        return self._hourly_rate / self.hourly_budget
+
+    def _budget_wait(self, now):
+        """Seconds until another dispatch fits the hourly budget"""
+        if not self.hourly_budget or len(self._dispatched) < self.hourly_budget:
+            return 0
+        return max(self._dispatched[0] + 3600 - now, 0)
+
+    def _live(self, group):
+        return self._groups.get(group.key) is group
+
+    def _stale(self, entry):
+        due, _, group = entry
+        return not self._live(group) or due != group.due
+
+    def _start(self):
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='price-watch')
+            self._thread = threading.Thread(target=self._run, name='price-watch-scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                group = self._next_due()
+                self._in_flight += 1
+            self._executor.submit(self._check, group)
+
+    def _next_due(self):
+        """Block until a live group is due, a worker is free and the budget allows, then pop it"""
+        while True:
+            while self._heap and self._stale(self._heap[0]):
+                heapq.heappop(self._heap)
+            timeout = None
+            if self._heap and self._in_flight < self.workers:
+                now = time.monotonic()
+                timeout = self._heap[0][0] - now
+                if timeout <= 0:
+                    budget_wait = self._budget_wait(now)
+                    if budget_wait <= 0:
+                        if self.hourly_budget:
+                            self._dispatched.append(now)
+                        group = heapq.heappop(self._heap)[2]
+                        group.checking = True
+                        return group
+                    self.counters['budget_waits'] += 1
+                    timeout = budget_wait
+            self._cond.wait(timeout)
+
+    def _check(self, group):
+        if group.travel_date is not None and group.travel_date < date.today():
+            with self._cond:
+                self._in_flight -= 1
+                group.checking = False
+                if self._live(group):
+                    self._expire(group)
+                self._cond.notify()
+            return
+
+        prices = None
+        try:
+            prices = self.fetch_prices(group.search_params)
+        except Exception as e:
+            logger.error(f"Price watch check failed: {str(e)}")
+        if prices:
+            try:
+                self.history.record(group.key, watch_site(group.search_params), prices)
+            except Exception as e:
+                logger.error(f"Recording price history failed: {str(e)}")
+
+        alerts = []
+        with self._cond:
+            self._in_flight -= 1
+            group.checking = False
+            self.counters['checks'] += 1
+            now = time.monotonic()
+            if prices is None:
+                self.counters['errors'] += 1
+            elif prices:
+                price = min(prices)
+                self.policy.observe(group, price, now)
+                # Only subscribers still watching now; a cancel mid-scrape gets no alert
+                for subscriber, (threshold, on_alert) in list(group.subscribers.items()):
+                    if price <= threshold:
+                        self._remove(subscriber)
+                        alerts.append((subscriber, on_alert, price))
+                self.counters['alerts'] += len(alerts)
+            if self._live(group):
+                self._set_interval(group, self.policy.interval(group))
+                self._schedule(group, now + group.interval * self._stretch())
+            self._cond.notify()
+
+        for subscriber, on_alert, price in alerts:
+            try:
+                on_alert(subscriber, price, group.search_params)
+            except Exception as e:
+                logger.error(f"Price alert for {subscriber} failed: {str(e)}")
+
+price_watch = PriceWatchScheduler()
@@ -0,0 +1,186 @@
+import calendar
+import re
+from datetime import datetime, timedelta
+from app.services.lazy_imports import LazyModule
+
+_AMOUNT = r'\d+(?:,\d+)*(?:\.\d{2})?'
+_CURRENCY = r'(?:Rs\.?|INR|₹)'
+
+MONTHS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8, 'sep': 9, 'sept': 9, 'september': 9, 'oct': 10,
+    'october': 10, 'nov': 11, 'november': 11, 'dec': 12, 'december': 12
+}
+
+# Words after a number, besides month names, that make a "<number> <word>"
+# phrase worth handing to dateparser ("2 months" reads as two months ago).
+# Any other word ("2 AC", "4 sleeper", "5 days") is not a date and costs no
+# dateparser call.
+DATEPARSER_WORDS = frozenset([
+    'month', 'months', 'year', 'years', 'fortnight', 'fortnights',
+    'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+    'mon', 'tue', 'tues', 'wed', 'thu', 'thur', 'thurs', 'fri', 'sat', 'sun'
+])
+
+# Output order matches the order SmartSearch has always reported preferences in
+PREFERENCES = ('AC', 'Non-AC', 'Sleeper', 'Window Seat', 'Direct', 'Rating')
+BUDGET_PRIORITY = ('budget_currency', 'budget_keyword', 'budget_under', 'budget_less_than')
+TRANSPORT_PRIORITY = ('bus', 'train')
+
+# One alternation scanned once per prompt. At any position the first listed
+# alternative wins, so "non-AC" is read before "AC" and "4 star" before the
+# "<day> <month>" date form. That form only consumes the number and looks
+# ahead at the word, so "2 AC" or "2 under 3000" still yield the AC
+# preference or the budget.
+_PATTERN = re.compile('|'.join([
+    r'(?P<pref_non_ac>\bnon.?AC\b|\bnon.?air.?condition(?:ed|ing)?)',
+    r'(?P<pref_ac>\bAC\b|\bair.?condition(?:ed|ing)?)',
+    r'(?P<pref_sleeper>\bsleep(?:er)?\b|\bberth)',
+    r'(?P<pref_window>\bwindow.?seat)',
+    r'(?P<pref_direct>\bdirect\b|\bnon.?stop)',
+    r'(?P<pref_rating>\b\d+\s*star|\brating\s*\d+\+?)',
+    rf'(?P<budget_currency>{_CURRENCY}\s*(?P<amount_currency>{_AMOUNT}))',
+    rf'(?P<budget_keyword>\bbudget\s*(?:of|:)?\s*{_CURRENCY}?\s*(?P<amount_keyword>{_AMOUNT}))',
+    rf'(?P<budget_under>\bunder\s*{_CURRENCY}?\s*(?P<amount_under>{_AMOUNT}))',
+    rf'(?P<budget_less_than>\bless\s*than\s*{_CURRENCY}?\s*(?P<amount_less_than>{_AMOUNT}))',
+    r'(?P<transport_bus>\b(?:bus|volvo|ordinary|luxury)\b)',
+    r'(?P<transport_train>\b(?:train|rail|railway)\b)',
+    r'(?P<date_numeric>\b(?P<num_day>\d{1,2})[-/](?P<num_month>\d{1,2})[-/](?P<num_year>\d{2,4})\b)',
+    r'(?P<date_tomorrow>\btomorrow\b)',
+    r'(?P<date_next_week>\bnext\s+week\b)',
+    r'(?P<date_next_month>\bnext\s+month\b)',
+    r'(?P<date_day_word>\b(?P<word_day>\d{1,2})(?:st|nd|rd|th)?(?=\s+(?P<word>[A-Za-z]+)))'
+]), re.IGNORECASE)
+
+_PREFERENCE_GROUPS = {
+    'pref_ac': 'AC',
+    'pref_non_ac': 'Non-AC',
+    'pref_sleeper': 'Sleeper',
+    'pref_window': 'Window Seat',
+    'pref_direct': 'Direct',
+    'pref_rating': 'Rating'
+}
+
+def _add_months(moment, months):
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+def resolve_date(spec, now=None):
+    """
+    Turn a date spec from PromptExtractor.scan into a datetime.
+    Specs relative to today ("tomorrow", "12th March", and phrases left to
+    dateparser such as "3 months") are resolved against `now`, so a cached
+    scan stays correct across midnight.
+    """
+    now = now or datetime.now()
+    kind = spec[0]
+    if kind == 'absolute':
+        return spec[1]
+    if kind == 'offset':
+        _, days, months = spec
+        return _add_months(now + timedelta(days=days), months)
+    if kind == 'month_day':
+        _, month, day = spec
+        try:
+            return datetime(now.year, month, day)
+        except ValueError:
+            return None
+    if kind == 'text':
+        return _fallback_parse(spec[1], now)
+    raise ValueError(f"Unknown date spec: {spec!r}")
+
+def resolve_dates(specs, now=None):
+    now = now or datetime.now()
+    dates = []
+    for spec in specs:
+        date = resolve_date(spec, now)
+        if date is not None:
+            dates.append(date)
+    return dates
+
+# Only needed for forms the fast path doesn't know
+dateparser = LazyModule('dateparser')
+
+def _fallback_parse(text, now=None):
+    settings = {'RELATIVE_BASE': now} if now is not None else None
+    return dateparser.parse(text, settings=settings)
+
+class PromptExtractor:
+    """
+    Precompiled, single-pass extraction of preferences, budget, transport
+    type and dates from a search prompt.
+    """
+
+    def scan(self, prompt):
+        """
+        Scan `prompt` once. Dates are returned as unresolved specs under
+        'date_specs' (see resolve_date); use extract() for datetimes.
+        """
+        preferences = set()
+        budgets = {}
+        transports = set()
+        date_specs = []
+
+        for match in _PATTERN.finditer(prompt):
+            group = match.lastgroup
+            if group in _PREFERENCE_GROUPS:
+                preferences.add(_PREFERENCE_GROUPS[group])
+            elif group in BUDGET_PRIORITY:
+                if group not in budgets:
+                    budgets[group] = float(match.group('amount' + group[len('budget'):]).replace(',', ''))
+            elif group == 'transport_bus':
+                transports.add('bus')
+            elif group == 'transport_train':
+                transports.add('train')
+            else:
+                spec = self._date_spec(group, match)
+                if spec is not None:
+                    date_specs.append(spec)
+
+        return {
+            'preferences': [pref for pref in PREFERENCES if pref in preferences],
+            'budget': next((budgets[kind] for kind in BUDGET_PRIORITY if kind in budgets), None),
+            'transport_type': next((kind for kind in TRANSPORT_PRIORITY if kind in transports), None),
+            'date_specs': date_specs
+        }
+
+    def extract(self, prompt, now=None):
+        """Like scan(), with dates resolved to datetimes under 'dates'"""
+        result = self.scan(prompt)
+        result['dates'] = resolve_dates(result.pop('date_specs'), now)
+        return result
+
+    def _date_spec(self, group, match):
+        if group == 'date_tomorrow':
+            return ('offset', 1, 0)
+        if group == 'date_next_week':
+            return ('offset', 7, 0)
+        if group == 'date_next_month':
+            return ('offset', 0, 1)
+        if group == 'date_numeric':
+            # Fast path reads dd/mm/yyyy, the format our users write
+            day, month, year = (int(match.group(name)) for name in ('num_day', 'num_month', 'num_year'))
+            if year < 100:
+                year += 2000
+            try:
+                return ('absolute', datetime(year, month, day))
+            except ValueError:
+                return self._fallback(match.group())
+        if group == 'date_day_word':
+            word = match.group('word').lower()
+            if word in MONTHS:
+                return ('month_day', MONTHS[word], int(match.group('word_day')))
+            if word in DATEPARSER_WORDS:
+                return self._fallback(f"{match.group()} {match.group('word')}")
+            return None
+        return None
+
+    def _fallback(self, text):
+        # Kept as text and parsed again on resolve: dateparser may read it
+        # relative to now. Parsing here just drops phrases that aren't dates.
+        return ('text', text) if _fallback_parse(text) else None
+
+prompt_extractor = PromptExtractor()
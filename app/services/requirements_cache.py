@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+from config import Config
+
+def normalize_prompt(prompt):
+    """
+    Cache key for a prompt: whitespace collapsed, nothing else. Entity
+    recognition reads case ("Pune" is a place, "pune" may not be) and the
+    extractors read punctuation ("4.5 star"), so prompts that differ in
+    either are parsed separately.
+    """
+    return ' '.join(prompt.split())
+
+class RequirementsCache:
+    """
+    Bounded, thread-safe LRU of parsed prompts, shared by every SmartSearch
+    in the process. Entries hold unresolved date specs; the caller resolves
+    them on each lookup so "tomorrow" keeps meaning tomorrow.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or Config.REQUIREMENTS_CACHE_MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_or_parse(self, prompt, parse):
+        """Cached entry for `prompt`, or parse(prompt) stored under its normalized key"""
+        key = normalize_prompt(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry
+            self.counters['misses'] += 1
+
+        # Parse outside the lock; a concurrent miss on the same key just parses twice
+        entry = parse(prompt)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters plus current size and hit rate"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+requirements_cache = RequirementsCache()
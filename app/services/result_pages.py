@@ -0,0 +1,107 @@
+import base64
+import heapq
+import json
+import math
+
+SORT_KEYS = ('price', 'rating', 'distance')
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+def parse_origin(value):
+    """
+    (latitude, longitude) from a pair, a 'lat,lon' string or a
+    {'latitude', 'longitude'} dict; None when missing or out of range
+    """
+    if isinstance(value, str):
+        value = value.split(',')
+    elif isinstance(value, dict):
+        value = (value.get('latitude'), value.get('longitude'))
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        return None
+    lat, lon = _number(value[0]), _number(value[1])
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return (lat, lon)
+
+def sort_key(sort_by, origin=None):
+    """
+    Key function for hotel dicts. Hotels missing the sort value (no price,
+    no rating, no coordinates) sort last instead of breaking the comparison.
+    """
+    if sort_by == 'price':
+        def key(hotel):
+            amount = _number((hotel.get('price') or {}).get('amount'))
+            return (amount is None, amount or 0.0)
+    elif sort_by == 'rating':
+        def key(hotel):
+            rating = _number(hotel.get('rating'))
+            return (rating is None, -(rating or 0.0))
+    elif sort_by == 'distance':
+        def key(hotel):
+            location = hotel.get('location') or {}
+            lat, lon = _number(location.get('latitude')), _number(location.get('longitude'))
+            if origin is None or lat is None or lon is None:
+                return (True, 0.0)
+            return (False, haversine_km(origin[0], origin[1], lat, lon))
+    else:
+        raise ValueError(f"Unknown sort key: {sort_by}")
+    return key
+
+def top_k(hotels, sort_by, offset, page_size, origin=None):
+    """
+    Return one page of `hotels` in sort order using a bounded heap, so a page
+    costs O(n log(offset + page_size)) rather than a full sort
+    """
+    page = heapq.nsmallest(offset + page_size, hotels, key=sort_key(sort_by, origin))
+    return page[offset:]
+
+def encode_cursor(state):
+    """Opaque, URL-safe cursor for the next page"""
+    payload = json.dumps(state, sort_keys=True, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_param_value(value):
+    # JSON scalars, or a list of them (e.g. an origin's coordinates)
+    if isinstance(value, list):
+        return len(value) <= 2 and all(_is_param_value(item) for item in value)
+    return value is None or isinstance(value, (str, int, float))
+
+def decode_cursor(cursor, fields, max_page_size):
+    """
+    Inverse of encode_cursor. Cursors come back from clients, so raises
+    ValueError unless sort_by is known, offset is a non-negative int,
+    page_size an int in [1, max_page_size] and params a dict of `fields`
+    holding plain values, with a usable origin when sorting by distance.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+    if not isinstance(state, dict) or state.get('sort_by') not in SORT_KEYS:
+        raise ValueError("Invalid cursor")
+    offset, page_size, params = state.get('offset'), state.get('page_size'), state.get('params')
+    if not _is_int(offset) or offset < 0:
+        raise ValueError("Invalid cursor: bad offset")
+    if not _is_int(page_size) or not 1 <= page_size <= max_page_size:
+        raise ValueError(f"Invalid cursor: page_size must be 1 to {max_page_size}")
+    if not isinstance(params, dict) or not set(params) <= set(fields) or \
+            not all(_is_param_value(value) for value in params.values()):
+        raise ValueError("Invalid cursor: bad search params")
+    if state['sort_by'] == 'distance' and parse_origin(params.get('origin')) is None:
+        raise ValueError("Invalid cursor: distance sort without an origin")
+    return state
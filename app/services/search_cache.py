@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+# Search fields that change what the upstream APIs return
+SEARCH_KEY_FIELDS = (
+    'location', 'source', 'destination',
+    'check_in', 'check_out', 'date',
+    'guests', 'rooms', 'min_rating'
+)
+
+def normalize_search_params(params):
+    """Reduce search params to the fields that affect upstream results"""
+    normalized = {}
+    for field in SEARCH_KEY_FIELDS:
+        value = params.get(field)
+        if value is None or value == '':
+            continue
+        if isinstance(value, str):
+            value = ' '.join(value.lower().split())
+        normalized[field] = value
+    return normalized
+
+def make_cache_key(namespace, params):
+    """Stable cache key for a namespace (usually the provider) and search params"""
+    payload = json.dumps(normalize_search_params(params), sort_keys=True, default=str)
+    return f"{namespace}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+class SearchCache:
+    """
+    Two-tier cache for upstream search results.
+
+    The memory tier is a bounded LRU private to the process. The disk tier is a
+    SQLite file shared by every worker on the host. Entries stay fresh for the
+    provider's TTL and may then be served stale for `stale_seconds` while a
+    background refresh fetches a new copy.
+    """
+
+    def __init__(self, max_entries, db_path, ttls, default_ttl=300, stale_seconds=600):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.stale_seconds = stale_seconds
+        self._memory = OrderedDict()  # key -> (value, fresh_until, stale_until)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._local = threading.local()
+        self._writes = 0
+        self.counters = {
+            'hits': 0,
+            'disk_hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'refreshes': 0,
+            'refresh_errors': 0
+        }
+
+    def get_or_fetch(self, namespace, params, fetch):
+        """
+        Return cached results for `params`, calling `fetch()` on a miss.
+        Stale entries are returned immediately and refreshed in the background.
+        Exceptions from `fetch` propagate and are never cached.
+        """
+        key = make_cache_key(namespace, params)
+        value, state = self.get(key)
+        if state == 'fresh':
+            return value
+        if state == 'stale':
+            self._refresh_in_background(namespace, key, fetch)
+            return value
+
+        value = fetch()
+        self.set(namespace, key, value)
+        return value
+
+    def get(self, key):
+        """Return (value, 'fresh' | 'stale') or (None, None) on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, fresh_until, stale_until = entry
+                if now < stale_until:
+                    self._memory.move_to_end(key)
+                    if now < fresh_until:
+                        self.counters['hits'] += 1
+                        return value, 'fresh'
+                    self.counters['stale_hits'] += 1
+                    return value, 'stale'
+                del self._memory[key]
+
+        entry = self._disk_get(key, now)
+        if entry is None:
+            with self._lock:
+                self.counters['misses'] += 1
+            return None, None
+
+        value, fresh_until, stale_until = entry
+        with self._lock:
+            self._remember(key, entry)
+            if now < fresh_until:
+                self.counters['disk_hits'] += 1
+                return value, 'fresh'
+            self.counters['stale_hits'] += 1
+            return value, 'stale'
+
+    def set(self, namespace, key, value, ttl=None, persist=True):
+        """
+        Store a value using the namespace's TTL. With persist=False the value
+        only goes to the memory tier, for large values that are cheap to rebuild.
+        """
+        if ttl is None:
+            ttl = self.ttls.get(namespace, self.default_ttl)
+        now = time.time()
+        entry = (value, now + ttl, now + ttl + self.stale_seconds)
+        with self._lock:
+            self._remember(key, entry)
+        if persist:
+            self._disk_set(key, entry, now)
+
+    def invalidate(self, key):
+        """Drop a key from both tiers"""
+        with self._lock:
+            self._memory.pop(key, None)
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            with conn:
+                conn.execute('DELETE FROM search_cache WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            print(f"Search cache disk error: {str(e)}")
+
+    def stats(self):
+        """Counters plus current memory tier size"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = (lookups - stats['misses']) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key, entry):
+        """Insert into the LRU tier; caller holds the lock"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def _refresh_in_background(self, namespace, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.set(namespace, key, fetch())
+                with self._lock:
+                    self.counters['refreshes'] += 1
+            except Exception as e:
+                print(f"Search cache refresh error for {namespace}: {str(e)}")
+                with self._lock:
+                    self.counters['refresh_errors'] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _connection(self):
+        """Per-thread SQLite connection, reopened after a fork"""
+        if not self.db_path:
+            return None
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=1.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS search_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'fresh_until REAL NOT NULL, stale_until REAL NOT NULL)'
+            )
+        except sqlite3.Error as e:
+            print(f"Search cache disk error: {str(e)}")
+            return None
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _disk_get(self, key, now):
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                'SELECT value, fresh_until, stale_until FROM search_cache '
+                'WHERE key = ? AND stale_until > ?',
+                (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Search cache disk error: {str(e)}")
+            return None
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def _disk_set(self, key, entry, now):
+        conn = self._connection()
+        if conn is None:
+            return
+        value, fresh_until, stale_until = entry
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(value, default=str), fresh_until, stale_until)
+                )
+                self._writes += 1
+                if self._writes % 500 == 0:
+                    conn.execute('DELETE FROM search_cache WHERE stale_until < ?', (now,))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Search cache disk error: {str(e)}")
+
+search_cache = SearchCache(
+    max_entries=Config.SEARCH_CACHE_MAX_ENTRIES,
+    db_path=Config.SEARCH_CACHE_PATH,
+    ttls=Config.SEARCH_CACHE_TTLS,
+    stale_seconds=Config.SEARCH_CACHE_STALE_SECONDS
+)
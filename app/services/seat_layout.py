@@ -0,0 +1,187 @@
+import threading
+import time
+from array import array
+from config import Config
+
+# Per-cell flag bits
+PRESENT = 1
+AVAILABLE = 2
+WINDOW = 4
+LOWER = 8
+LADIES = 16
+
+class SeatMap:
+    """
+    A RedBus seat layout decoded into flat arrays, one cell per
+    (deck, row, column) position. Cells hold flag bits in a bytearray,
+    so queries are linear scans over a few hundred bytes.
+    """
+
+    def __init__(self, layout):
+        seats = layout.get('seats') or []
+        self.bus_id = layout.get('busId')
+        self.rows = max([layout.get('maxRows') or 0] + [seat.get('row', 0) + 1 for seat in seats])
+        self.columns = max([layout.get('maxColumns') or 0] + [seat.get('column', 0) + 1 for seat in seats])
+        self.decks = max([1] + [seat.get('zIndex', 0) + 1 for seat in seats])
+
+        size = self.decks * self.rows * self.columns
+        self.flags = bytearray(size)
+        self.fares = array('d', bytes(8 * size))
+        self.names = [None] * size
+        self._positions = {}
+
+        for seat in seats:
+            deck, row, column = seat.get('zIndex', 0), seat.get('row', 0), seat.get('column', 0)
+            cell = self._cell(deck, row, column)
+            flags = PRESENT
+            if seat.get('available'):
+                flags |= AVAILABLE
+            if column == 0 or column == self.columns - 1:
+                flags |= WINDOW
+            if deck == 0:
+                flags |= LOWER
+            if seat.get('ladiesSeat'):
+                flags |= LADIES
+            self.flags[cell] = flags
+            self.fares[cell] = float(seat.get('fare') or 0)
+            self.names[cell] = seat.get('name')
+            self._positions[seat.get('name')] = cell
+
+    def _cell(self, deck, row, column):
+        return (deck * self.rows + row) * self.columns + column
+
+    def _matching(self, required, excluded=0):
+        for cell, flags in enumerate(self.flags):
+            if flags & required == required and not flags & excluded:
+                yield cell
+
+    def _requirements(self, window=False, lower=False, allow_ladies=False):
+        required = PRESENT | AVAILABLE
+        if window:
+            required |= WINDOW
+        if lower:
+            required |= LOWER
+        return required, 0 if allow_ladies else LADIES
+
+    def available(self, window=False, lower=False, allow_ladies=False):
+        """Names of available seats matching the filters, in layout order"""
+        return [self.names[cell] for cell in self._matching(*self._requirements(window, lower, allow_ladies))]
+
+    def window_seats(self, lower=False, allow_ladies=False):
+        return self.available(window=True, lower=lower, allow_ladies=allow_ladies)
+
+    def lower_berths(self, allow_ladies=False):
+        return self.available(lower=True, allow_ladies=allow_ladies)
+
+    def adjacent(self, count, lower=False, allow_ladies=False):
+        """
+        First run of `count` available seats side by side in one row of one
+        deck (no aisle or missing seat between them), or None
+        """
+        required, excluded = self._requirements(lower=lower, allow_ladies=allow_ladies)
+        run = []
+        for cell, flags in enumerate(self.flags):
+            if cell % self.columns == 0:
+                run = []
+            if flags & required == required and not flags & excluded:
+                run.append(cell)
+                if len(run) == count:
+                    return [self.names[c] for c in run]
+            else:
+                run = []
+        return None
+
+    def pick_seats(self, count, window=False, lower=False, allow_ladies=False):
+        """
+        Seats for a group of `count`, best arrangement first: side by side,
+        then the same row across the aisle, then the nearest rows. The
+        window/lower preferences are honoured for single travellers and
+        dropped for groups when they would split the group.
+        Returns None when fewer than `count` seats are available.
+        """
+        if count <= 0:
+            return []
+        if count == 1:
+            for filters in ((window, lower), (window, False), (False, lower), (False, False)):
+                seats = self.available(*filters, allow_ladies=allow_ladies)
+                if seats:
+                    return seats[:1]
+            return None
+
+        together = self.adjacent(count, lower=lower, allow_ladies=allow_ladies)
+        if together is None and lower:
+            together = self.adjacent(count, allow_ladies=allow_ladies)
+        if together is not None:
+            return together
+
+        # Group available cells by (deck, row), then take the tightest window of rows
+        required, excluded = self._requirements(allow_ladies=allow_ladies)
+        by_row = {}
+        for cell in self._matching(required, excluded):
+            by_row.setdefault(cell // self.columns, []).append(cell)
+        rows = sorted(by_row)
+        if sum(len(cells) for cells in by_row.values()) < count:
+            return None
+
+        best = None
+        end, taken = 0, 0
+        for start in range(len(rows)):
+            while end < len(rows) and taken < count:
+                taken += len(by_row[rows[end]])
+                end += 1
+            if taken < count:
+                break
+            # Rows on different decks are never neighbours
+            deck_span = rows[end - 1] // self.rows - rows[start] // self.rows
+            spread = (deck_span * self.rows * 2) + rows[end - 1] - rows[start]
+            if best is None or spread < best[0]:
+                best = (spread, start, end)
+            taken -= len(by_row[rows[start]])
+
+        _, start, end = best
+        cells = [cell for row in rows[start:end] for cell in by_row[row]]
+        return [self.names[cell] for cell in cells[:count]]
+
+    def fare(self, name):
+        return self.fares[self._positions[name]]
+
+    def is_available(self, name):
+        cell = self._positions.get(name)
+        return cell is not None and bool(self.flags[cell] & AVAILABLE)
+
+class SeatMapCache:
+    """Decoded seat maps per bus with a short TTL; dropped as soon as a booking is made"""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl or Config.SEAT_LAYOUT_TTL
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, bus_id):
+        with self._lock:
+            entry = self._entries.get(bus_id)
+            if entry is None:
+                return None
+            seat_map, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[bus_id]
+                return None
+            return seat_map
+
+    def set(self, bus_id, seat_map):
+        with self._lock:
+            self._entries[bus_id] = (seat_map, time.monotonic() + self.ttl)
+            # Expired entries are swept on write so the dict stays small
+            if len(self._entries) > Config.SEAT_LAYOUT_CACHE_MAX_ENTRIES:
+                now = time.monotonic()
+                for key in [key for key, (_, expires_at) in self._entries.items() if expires_at < now]:
+                    del self._entries[key]
+                # Still full: drop the oldest insertions
+                while len(self._entries) > Config.SEAT_LAYOUT_CACHE_MAX_ENTRIES:
+                    del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, bus_id):
+        with self._lock:
+            self._entries.pop(bus_id, None)
+
+seat_map_cache = SeatMapCache()
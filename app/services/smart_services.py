@@ -1,13 +1,20 @@
 from app.services.booking_automation import BookingAutomation
-from threading import Thread
+from app.services.fare_analysis import FareColumns, analyze, best_deals, provider_comparison
+from app.services.fare_providers import collect_fares
+from app.services.nlp_runtime import parse, pipe
+from app.services.price_watch import price_watch
+from app.services.prompt_extraction import prompt_extractor, resolve_dates
+from app.services.requirements_cache import requirements_cache
+from collections import deque
 import json
 from datetime import datetime
 import logging
 
 class PriceMonitor:
-    def __init__(self):
-        self.automation = BookingAutomation(headless=True)
-        self.monitoring_threads = {}
+    def __init__(self, scheduler=None):
+        # Watches run on the shared scheduler: identical searches are scraped
+        # once per check, on a bounded set of workers
+        self.scheduler = scheduler or price_watch
         self.setup_logging()
 
     def setup_logging(self):
@@ -19,41 +26,34 @@ class PriceMonitor:
         self.logger = logging.getLogger(__name__)
 
     def start_monitoring(self, user_id, search_params, threshold_price):
-        """Start monitoring prices for a user"""
+        """
+        Start monitoring prices for a user, replacing any watch they already
+        have. Returns the watch key (for /price_history?key=), None on error.
+        """
         try:
-            thread = Thread(
-                target=self.monitor_prices,
-                args=(user_id, search_params, threshold_price)
-            )
-            thread.daemon = True
-            thread.start()
-            
-            self.monitoring_threads[user_id] = thread
-            self.logger.info(f"Started price monitoring for user {user_id}")
+            replaced = self.scheduler.is_watching(user_id)
+            key = self.scheduler.watch(user_id, search_params, threshold_price, on_alert=self.send_price_alert)
+            if replaced:
+                self.logger.info(f"Replaced price monitoring for user {user_id}")
+            else:
+                self.logger.info(f"Started price monitoring for user {user_id}")
+            return key
             
         except Exception as e:
             self.logger.error(f"Error starting price monitor: {str(e)}")
+            return None
 
     def stop_monitoring(self, user_id):
-        """Stop monitoring prices for a user"""
-        if user_id in self.monitoring_threads:
-            # Thread will terminate on next price check
-            del self.monitoring_threads[user_id]
+        """Stop monitoring prices for a user; takes effect immediately"""
+        if self.scheduler.cancel(user_id):
             self.logger.info(f"Stopped price monitoring for user {user_id}")
 
-    def monitor_prices(self, user_id, search_params, threshold_price):
-        """Monitor prices and send alerts"""
-        try:
-            self.automation.start_browser()
-            self.automation.monitor_price(search_params, threshold_price)
-        except Exception as e:
-            self.logger.error(f"Error in price monitoring: {str(e)}")
-        finally:
-            self.automation.close_browser()
+    def send_price_alert(self, user_id, price, search_params):
+        """Alert a user that their watched search reached their threshold"""
+        self.logger.info(f"Price alert for user {user_id}: {price} for {json.dumps(search_params, default=str)}")
 
 class FareComparison:
     def __init__(self):
-        self.automation = BookingAutomation(headless=True)
         self.setup_logging()
 
     def setup_logging(self):
@@ -64,13 +64,18 @@ class FareComparison:
         )
         self.logger = logging.getLogger(__name__)
 
-    def compare_fares(self, source, destination, date):
-        """Compare fares across different providers"""
+    def compare_fares(self, source, destination, date, quorum=None, deadline=None):
+        """
+        Compare fares across providers. Every provider is fetched in its own
+        worker; the analysis runs as soon as `quorum` of them have answered
+        or `deadline` seconds pass, and 'providers' reports each one's status.
+        """
         try:
-            self.automation.start_browser()
-            fares = self.automation.compare_fares(source, destination, date)
+            fares, provider_status = collect_fares(source, destination, date, quorum=quorum, deadline=deadline)
             
             analysis = self.analyze_fares(fares)
+            if analysis is not None:
+                analysis['providers'] = provider_status
             self.logger.info(f"Completed fare comparison for {source} to {destination}")
             
             return analysis
@@ -78,21 +83,15 @@ class FareComparison:
         except Exception as e:
             self.logger.error(f"Error in fare comparison: {str(e)}")
             return None
-        finally:
-            self.automation.close_browser()
 
     def analyze_fares(self, fares):
-        """Analyze fares and provide insights"""
+        """
+        Analyze fares and provide insights: overall and per-provider
+        aggregates, fare percentiles, price per hour of travel and the best
+        deals, computed over columnar arrays in one pass (see fare_analysis)
+        """
         try:
-            analysis = {
-                'lowest_fare': min(fare['amount'] for provider in fares.values() for fare in provider),
-                'highest_fare': max(fare['amount'] for provider in fares.values() for fare in provider),
-                'average_fare': sum(fare['amount'] for provider in fares.values() for fare in provider) / 
-                              sum(len(provider) for provider in fares.values()),
-                'best_deals': self.find_best_deals(fares),
-                'provider_comparison': self.compare_providers(fares)
-            }
-            return analysis
+            return analyze(fares)
             
         except Exception as e:
             self.logger.error(f"Error analyzing fares: {str(e)}")
@@ -100,31 +99,11 @@ class FareComparison:
 
     def find_best_deals(self, fares):
         """Find the best deals across providers"""
-        all_fares = []
-        for provider, provider_fares in fares.items():
-            for fare in provider_fares:
-                all_fares.append({
-                    'provider': provider,
-                    'amount': fare['amount'],
-                    'departure': fare['departure'],
-                    'duration': fare['duration'],
-                    'rating': fare.get('rating', 'N/A')
-                })
-        
-        # Sort by price and get top 3 deals
-        return sorted(all_fares, key=lambda x: x['amount'])[:3]
+        return best_deals(FareColumns(fares))
 
     def compare_providers(self, fares):
         """Compare different providers"""
-        comparison = {}
-        for provider, provider_fares in fares.items():
-            comparison[provider] = {
-                'average_fare': sum(fare['amount'] for fare in provider_fares) / len(provider_fares),
-                'min_fare': min(fare['amount'] for fare in provider_fares),
-                'max_fare': max(fare['amount'] for fare in provider_fares),
-                'total_options': len(provider_fares)
-            }
-        return comparison
+        return provider_comparison(FareColumns(fares))
 
 class SmartSearch:
     def __init__(self):
@@ -162,151 +141,123 @@ class SmartSearch:
 
     def parse_requirements(self, prompt):
         """Parse user requirements from prompt"""
-        import spacy
-        nlp = spacy.load("en_core_web_sm")
-        doc = nlp(prompt)
+        parsed = requirements_cache.get_or_parse(prompt, self._parse_prompt)
+        return self._resolve_requirements(parsed)
 
-        requirements = {
-            'location': None,
-            'dates': [],
-            'preferences': [],
-            'budget': None,
-            'transport_type': None
-        }
+    def parse_requirements_batch(self, prompts, batch_size=None, n_process=None):
+        """
+        Parse an iterable of prompts through nlp.pipe, yielding the same
+        dicts as parse_requirements, in input order. Prompts are streamed,
+        so memory stays flat however many there are; the memo cache is
+        bypassed so bulk jobs don't evict interactive entries.
+        """
+        for _, requirements in self._parse_batch(prompts, batch_size, n_process):
+            yield requirements
 
-        # Extract location
-        for ent in doc.ents:
-            if ent.label_ == 'GPE':
-                requirements['location'] = ent.text
-                break
+    def parse_requirements_file(self, input_path, output_path, batch_size=None, n_process=None):
+        """
+        Parse a JSONL file of {"prompt": ...} records into a JSONL file of
+        {"prompt": ..., "requirements": ...} records. Returns the record count.
+        """
+        count = 0
+        with open(input_path, encoding='utf-8') as source, open(output_path, 'w', encoding='utf-8') as sink:
+            prompts = (json.loads(line)['prompt'] for line in source if line.strip())
+            for prompt, requirements in self._parse_batch(prompts, batch_size, n_process):
+                requirements['dates'] = [date.isoformat() for date in requirements['dates']]
+                sink.write(json.dumps({'prompt': prompt, 'requirements': requirements}) + '\n')
+                count += 1
+        self.logger.info(f"Parsed {count} prompts from {input_path}")
+        return count
+
+    def _parse_batch(self, prompts, batch_size, n_process):
+        now = datetime.now()
+        # nlp.pipe reads ahead by up to a batch; hold each prompt until its doc comes back
+        pending = deque()
 
-        # Extract dates
-        dates = self.extract_dates(prompt)
-        if dates:
-            requirements['dates'] = dates
+        def feed():
+            for prompt in prompts:
+                pending.append(prompt)
+                yield prompt
 
-        # Extract preferences
-        preferences = self.extract_preferences(prompt)
-        if preferences:
-            requirements['preferences'] = preferences
+        for doc in pipe(feed(), batch_size=batch_size, n_process=n_process):
+            prompt = pending.popleft()
+            yield prompt, self._resolve_requirements(self._build_requirements(doc, prompt), now)
 
-        # Extract budget
-        budget = self.extract_budget(prompt)
-        if budget:
-            requirements['budget'] = budget
+    def _parse_prompt(self, prompt):
+        return self._build_requirements(parse(prompt), prompt)
 
-        # Extract transport type
-        transport_type = self.extract_transport_type(prompt)
-        if transport_type:
-            requirements['transport_type'] = transport_type
+    def _build_requirements(self, doc, prompt):
+        """NER plus the single-pass extractor; dates stay unresolved so the result can be cached"""
+        location = None
+        for ent in doc.ents:
+            if ent.label_ == 'GPE':
+                location = ent.text
+                break
 
+        extracted = prompt_extractor.scan(prompt)
+        return {
+            'location': location,
+            'date_specs': tuple(extracted['date_specs']),
+            'preferences': tuple(extracted['preferences']),
+            'budget': extracted['budget'] or None,
+            'transport_type': extracted['transport_type']
+        }
+
+    def _resolve_requirements(self, parsed, now=None):
+        """Fresh requirements dict from a cached parse, with dates resolved against now"""
+        requirements = {
+            'location': parsed['location'],
+            'dates': [],
+            'preferences': list(parsed['preferences']),
+            'budget': parsed['budget'],
+            'transport_type': parsed['transport_type']
+        }
+        # Resolved on every call so cached relative dates stay correct
+        if parsed['date_specs']:
+            requirements['dates'] = resolve_dates(parsed['date_specs'], now)
         return requirements
 
     def extract_dates(self, prompt):
         """Extract dates from prompt"""
-        import dateparser
-        dates = []
-        
-        # Common date patterns
-        date_patterns = [
-            r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
-            r'tomorrow',
-            r'next week',
-            r'next month',
-            r'\d{1,2}(?:st|nd|rd|th)? [A-Za-z]+'
-        ]
-        
-        for pattern in date_patterns:
-            matches = re.finditer(pattern, prompt, re.IGNORECASE)
-            for match in matches:
-                date_str = match.group()
-                parsed_date = dateparser.parse(date_str)
-                if parsed_date:
-                    dates.append(parsed_date)
-                    
-        return dates
+        return prompt_extractor.extract(prompt)['dates']
 
     def extract_preferences(self, prompt):
         """Extract user preferences from prompt"""
-        preferences = []
-        
-        # Common preference patterns
-        preference_patterns = {
-            'AC': r'AC|air.?condition(?:ed|ing)?',
-            'Non-AC': r'non.?AC|non.?air.?condition(?:ed|ing)?',
-            'Sleeper': r'sleep(?:er)?|berth',
-            'Window Seat': r'window.?seat',
-            'Direct': r'direct|non.?stop',
-            'Rating': r'(\d+)\s*star|rating\s*(\d+)\+?'
-        }
-        
-        for pref, pattern in preference_patterns.items():
-            if re.search(pattern, prompt, re.IGNORECASE):
-                preferences.append(pref)
-                
-        return preferences
+        return prompt_extractor.scan(prompt)['preferences']
 
     def extract_budget(self, prompt):
         """Extract budget from prompt"""
-        # Match currency patterns
-        currency_patterns = [
-            r'(?:Rs\.?|INR|₹)\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
-            r'budget\s*(?:of|:)?\s*(?:Rs\.?|INR|₹)?\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
-            r'under\s*(?:Rs\.?|INR|₹)?\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
-            r'less\s*than\s*(?:Rs\.?|INR|₹)?\s*(\d+(?:,\d+)*(?:\.\d{2})?)'
-        ]
-        
-        for pattern in currency_patterns:
-            match = re.search(pattern, prompt, re.IGNORECASE)
-            if match:
-                amount = match.group(1).replace(',', '')
-                return float(amount)
-                
-        return None
+        return prompt_extractor.scan(prompt)['budget']
 
     def extract_transport_type(self, prompt):
         """Extract preferred transport type"""
-        transport_patterns = {
-            'bus': r'\b(?:bus|volvo|ordinary|luxury)\b',
-            'train': r'\b(?:train|rail|railway)\b'
-        }
-        
-        for transport_type, pattern in transport_patterns.items():
-            if re.search(pattern, prompt, re.IGNORECASE):
-                return transport_type
-                
-        return None
+        return prompt_extractor.scan(prompt)['transport_type']
 
     def get_search_results(self, requirements):
         """Get search results based on requirements"""
+        # Searches lease a pooled browser only if their HTTP scrape comes back empty
         automation = BookingAutomation(headless=True)
-        try:
-            automation.start_browser()
-            
-            results = {
-                'transport': [],
-                'hotels': []
-            }
-            
-            # Get transport results if needed
-            if requirements['transport_type']:
-                results['transport'] = automation.search_buses(
-                    requirements['location'],
-                    requirements['dates'][0] if requirements['dates'] else None
-                )
-            
-            # Get hotel results if needed
-            if not requirements['transport_type']:
-                results['hotels'] = automation.search_hotels(
-                    requirements['location'],
-                    requirements['dates'][0] if requirements['dates'] else None,
-                    requirements['dates'][1] if len(requirements['dates']) > 1 else None
-                )
-            
-            return results
-            
-        finally:
-            automation.close_browser()
+        results = {
+            'transport': [],
+            'hotels': []
+        }
+        
+        # Get transport results if needed
+        if requirements['transport_type']:
+            results['transport'] = automation.search_buses(
+                requirements['location'],
+                requirements['dates'][0] if requirements['dates'] else None
+            )
+        
+        # Get hotel results if needed
+        if not requirements['transport_type']:
+            results['hotels'] = automation.search_hotels(
+                requirements['location'],
+                requirements['dates'][0] if requirements['dates'] else None,
+                requirements['dates'][1] if len(requirements['dates']) > 1 else None
+            )
+        
+        return results
 
     def apply_smart_filters(self, results, requirements):
         """Apply smart filtering based on requirements"""
@@ -1,51 +1,68 @@
-import requests
 import json
 from datetime import datetime
-from app.models import Booking
+from app.models import Booking, db
+from app.services.city_catalog import city_catalog
+from app.services.http_client import provider_http
+from app.services.nlp_runtime import parse
+from app.services.search_cache import search_cache
+from app.services.seat_layout import SeatMap, seat_map_cache
 from config import Config
 
 class TransportService:
     def __init__(self):
         self.redbus_api_key = Config.REDBUS_API_KEY
         self.redbus_api_secret = Config.REDBUS_API_SECRET
-        self.base_url = "https://api.redbus.in/v2"
+        self.base_url = Config.REDBUS_BASE_URL
         
     def search_transport(self, prompt):
         """
         Search for available transportation options using RedBus API
         """
+        # Extract travel details from prompt
+        travel_details = self._extract_travel_details(prompt)
+        return self.search_transport_by_params(travel_details)
+
+    def search_transport_by_params(self, travel_details):
+        """
+        Search buses for already extracted travel details.
+        Results are served from the search cache when the same route and
+        date were searched recently.
+        """
         try:
-            # Extract travel details from prompt
-            travel_details = self._extract_travel_details(prompt)
-            
-            # Search buses using RedBus API
-            headers = {
-                'apiKey': self.redbus_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            search_params = {
-                'source': travel_details['source'],
-                'destination': travel_details['destination'],
-                'doj': travel_details['date'],  # Date of journey
-                'srcId': self._get_city_id(travel_details['source']),
-                'destId': self._get_city_id(travel_details['destination'])
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/search",
-                headers=headers,
-                json=search_params
+            return search_cache.get_or_fetch(
+                'redbus',
+                travel_details,
+                lambda: self._search_buses(travel_details)
             )
-            
-            if response.status_code == 200:
-                return self._process_bus_response(response.json())
-            else:
-                raise Exception(f"RedBus API error: {response.status_code}")
-                
         except Exception as e:
             print(f"Error searching buses: {str(e)}")
             return []
+
+    def _search_buses(self, travel_details):
+        """Search buses using RedBus API"""
+        headers = {
+            'apiKey': self.redbus_api_key,
+            'Content-Type': 'application/json'
+        }
+        
+        search_params = {
+            'source': travel_details['source'],
+            'destination': travel_details['destination'],
+            'doj': travel_details['date'],  # Date of journey
+            'srcId': self._get_city_id(travel_details['source']),
+            'destId': self._get_city_id(travel_details['destination'])
+        }
+        
+        response = provider_http.post(
+            f"{self.base_url}/search",
+            headers=headers,
+            json=search_params,
+            idempotent=True
+        )
+        
+        if response.status_code == 200:
+            return self._process_bus_response(response.json())
+        raise Exception(f"RedBus API error: {response.status_code}")
             
     def _extract_travel_details(self, prompt):
         """
@@ -53,9 +70,7 @@ class TransportService:
         Implement more sophisticated NLP here
         """
         # Basic implementation - enhance with proper NLP
-        import spacy
-        nlp = spacy.load("en_core_web_sm")
-        doc = nlp(prompt)
+        doc = parse(prompt)
         
         # Extract locations, dates, and preferences
         # This is a simplified version - implement more robust extraction
@@ -97,14 +112,18 @@ class TransportService:
         return f"https://www.redbus.in/booking/select-seat/{bus_id}"
         
     def _get_city_id(self, city_name):
-        """Get city ID from RedBus API"""
+        """Get city ID from the local city catalog, or the RedBus API if it has no match"""
+        city_id = city_catalog.resolve(city_name)
+        if city_id is not None:
+            return city_id
+
         try:
             headers = {
                 'apiKey': self.redbus_api_key,
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            response = provider_http.get(
                 f"{self.base_url}/cities",
                 headers=headers,
                 params={'search': city_name}
@@ -128,18 +147,34 @@ class TransportService:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            response = provider_http.get(
                 f"{self.base_url}/layout/{bus_id}",
                 headers=headers
             )
             
             if response.status_code == 200:
-                return response.json()
+                layout = response.json()
+                seat_map_cache.set(bus_id, SeatMap(layout))
+                return layout
             return None
             
         except Exception as e:
             print(f"Error getting seat layout: {str(e)}")
             return None
+
+    def get_seat_map(self, bus_id):
+        """Decoded seat layout, from the short-lived cache when possible"""
+        seat_map = seat_map_cache.get(bus_id)
+        if seat_map is None and self.get_seat_layout(bus_id) is not None:
+            seat_map = seat_map_cache.get(bus_id)
+        return seat_map
+
+    def pick_seats(self, bus_id, count, window=False, lower=False):
+        """Choose seats for `count` travellers locally from the seat map"""
+        seat_map = self.get_seat_map(bus_id)
+        if seat_map is None:
+            return None
+        return seat_map.pick_seats(count, window=window, lower=lower)
             
     def initiate_booking(self, bus_id, seat_numbers, passenger_details):
         """
@@ -159,11 +194,13 @@ class TransportService:
                 'passengers': passenger_details
             }
             
-            response = requests.post(
+            response = provider_http.post(
                 f"{self.base_url}/booking/initiate",
                 headers=headers,
                 json=booking_data
             )
+            # Whatever the outcome, the cached availability for this bus is suspect
+            seat_map_cache.invalidate(bus_id)
             
             if response.status_code == 200:
                 booking_response = response.json()
@@ -172,6 +209,8 @@ class TransportService:
                     user_id=passenger_details['user_id'],
                     booking_type='bus',
                     status='initiated',
+                    booking_reference=booking_response.get('bookingReference'),
+                    provider='redbus',
                     booking_details={
                         'bus_id': bus_id,
                         'seats': seat_numbers,
@@ -198,35 +237,50 @@ class TransportService:
     def check_booking_status(self, booking_reference):
         """Check status of a booking"""
         try:
-            headers = {
-                'apiKey': self.redbus_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(
-                f"{self.base_url}/booking/status/{booking_reference}",
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                status_data = response.json()
-                # Update booking status in database
-                booking = Booking.query.filter_by(
-                    booking_details__booking_reference=booking_reference
-                ).first()
-                
-                if booking:
-                    booking.status = status_data.get('status')
-                    booking.booking_details.update({
-                        'ticket_number': status_data.get('ticketNumber'),
-                        'pnr': status_data.get('pnr')
-                    })
-                    db.session.commit()
-                
-                return status_data
-                
-            return None
-            
+            status_data = self.fetch_booking_status(booking_reference)
+            if status_data is None:
+                return None
+
+            # Update booking status in database
+            booking = Booking.query.filter_by(
+                provider='redbus',
+                booking_reference=booking_reference
+            ).first()
+
+            if booking:
+                booking.status = status_data.get('status')
+                # Reassign rather than mutate; plain JSON columns don't track in-place changes
+                booking.booking_details = booking_details_with_status(booking.booking_details, status_data)
+                db.session.commit()
+
+            return status_data
+
         except Exception as e:
             print(f"Error checking booking status: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    def fetch_booking_status(self, booking_reference):
+        """Booking status from RedBus, without touching the database"""
+        headers = {
+            'apiKey': self.redbus_api_key,
+            'Content-Type': 'application/json'
+        }
+
+        response = provider_http.get(
+            f"{self.base_url}/booking/status/{booking_reference}",
+            headers=headers,
+            idempotent=True
+        )
+
+        if response.status_code == 200:
+            return response.json()
+        return None
+
+def booking_details_with_status(booking_details, status_data):
+    """booking_details with the ticket fields from a RedBus status response"""
+    details = dict(booking_details or {})
+    details.update({
+        'ticket_number': status_data.get('ticketNumber'),
+        'pnr': status_data.get('pnr')
+    })
+    return details
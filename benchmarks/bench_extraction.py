@@ -0,0 +1,106 @@
+"""Extraction benchmarks: prompt parsing and scraped result pages"""
+import random
+import re
+
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+
+# Frozen copies of the SmartSearch extractors the engine replaced, kept as
+# the baseline for 'smart_search.extract_all'
+
+def legacy_extract_dates(prompt):
+    import dateparser
+    dates = []
+    date_patterns = [
+        r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
+        r'tomorrow',
+        r'next week',
+        r'next month',
+        r'\d{1,2}(?:st|nd|rd|th)? [A-Za-z]+'
+    ]
+    for pattern in date_patterns:
+        for match in re.finditer(pattern, prompt, re.IGNORECASE):
+            parsed_date = dateparser.parse(match.group())
+            if parsed_date:
+                dates.append(parsed_date)
+    return dates
+
+def legacy_extract_preferences(prompt):
+    preferences = []
+    preference_patterns = {
+        'AC': r'AC|air.?condition(?:ed|ing)?',
+        'Non-AC': r'non.?AC|non.?air.?condition(?:ed|ing)?',
+        'Sleeper': r'sleep(?:er)?|berth',
+        'Window Seat': r'window.?seat',
+        'Direct': r'direct|non.?stop',
+        'Rating': r'(\d+)\s*star|rating\s*(\d+)\+?'
+    }
+    for pref, pattern in preference_patterns.items():
+        if re.search(pattern, prompt, re.IGNORECASE):
+            preferences.append(pref)
+    return preferences
+
+def legacy_extract_budget(prompt):
+    currency_patterns = [
+        r'(?:Rs\.?|INR|₹)\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
+        r'budget\s*(?:of|:)?\s*(?:Rs\.?|INR|₹)?\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
+        r'under\s*(?:Rs\.?|INR|₹)?\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
+        r'less\s*than\s*(?:Rs\.?|INR|₹)?\s*(\d+(?:,\d+)*(?:\.\d{2})?)'
+    ]
+    for pattern in currency_patterns:
+        match = re.search(pattern, prompt, re.IGNORECASE)
+        if match:
+            return float(match.group(1).replace(',', ''))
+    return None
+
+def legacy_extract_transport_type(prompt):
+    transport_patterns = {
+        'bus': r'\b(?:bus|volvo|ordinary|luxury)\b',
+        'train': r'\b(?:train|rail|railway)\b'
+    }
+    for transport_type, pattern in transport_patterns.items():
+        if re.search(pattern, prompt, re.IGNORECASE):
+            return transport_type
+    return None
+
+def legacy_extract_all(prompt):
+    return {
+        'dates': legacy_extract_dates(prompt),
+        'preferences': legacy_extract_preferences(prompt),
+        'budget': legacy_extract_budget(prompt),
+        'transport_type': legacy_extract_transport_type(prompt)
+    }
+
+@benchmark('smart_search.extract_all')
+def extract_all(ctx):
+    from app.services.prompt_extraction import prompt_extractor
+    prompts = list(fixtures.prompts(random.Random(1), 200))
+
+    def over_prompts(extract):
+        def run():
+            for prompt in prompts:
+                extract(prompt)
+        return run
+
+    # dateparser is optional for the engine but required by the old code path
+    import dateparser  # noqa: F401
+    yield 'legacy', over_prompts(legacy_extract_all)
+    yield 'engine', over_prompts(prompt_extractor.extract)
+
+@benchmark('scraper.extract_cards')
+def extract_cards(ctx):
+    """Parsing one page_source snapshot; the per-element path it replaced made ~8 WebDriver calls per card"""
+    from app.services.page_extraction import extract_cards
+    for count in (10, 200, 1000):
+        buses = fixtures.bus_results_html(random.Random(count), 'Pune', 'Goa', count)
+        hotels = fixtures.hotel_results_html(random.Random(count), 'Goa', count)
+        yield f"redbus n={count}", lambda html=buses: extract_cards(html, 'redbus')
+        yield f"booking.com n={count}", lambda html=hotels: extract_cards(html, 'booking.com')
+
+@benchmark('scraper.http_search')
+def http_search(ctx):
+    """The 'http' strategy end to end against the stub: one GET plus the parse"""
+    from app.services.http_scrape import scrape
+    yield 'redbus embedded json', lambda: scrape('redbus', source='Pune', destination='Goa', date='18-Oct-2026')
+    yield 'booking.com cards', lambda: scrape('booking.com', location='Goa', check_in='2026-10-18',
+                                               check_out='2026-10-20')
@@ -0,0 +1,212 @@
+"""Search, parse, dedup, rank and booking pipeline benchmarks"""
+import random
+
+from benchmarks import fixtures
+from benchmarks.harness import Skip, benchmark
+
+def _hotel_service():
+    from app.services.hotel_service import HotelService
+    return HotelService()
+
+def _smart_search():
+    from app.services.smart_services import SmartSearch
+    return SmartSearch()
+
+@benchmark('smart_search.parse_requirements')
+def parse_requirements(ctx):
+    try:
+        import spacy  # noqa: F401
+    except ImportError:
+        raise Skip("spacy is not installed")
+    from app.services.requirements_cache import requirements_cache
+    search = _smart_search()
+    prompts = list(fixtures.prompts(random.Random(1), 200))
+    state = {'i': 0}
+
+    def parse_one():
+        state['i'] = (state['i'] + 1) % len(prompts)
+        search.parse_requirements(prompts[state['i']])
+
+    def parse_one_uncached():
+        requirements_cache.clear()
+        parse_one()
+
+    # 'single_prompt' keeps its pre-memoization meaning: every call misses
+    yield 'single_prompt', parse_one_uncached
+    yield 'memo_hit', parse_one
+
+@benchmark('smart_search.parse_requirements_batch')
+def parse_requirements_batch(ctx):
+    try:
+        import spacy  # noqa: F401
+    except ImportError:
+        raise Skip("spacy is not installed")
+    from app.services.requirements_cache import requirements_cache
+    search = _smart_search()
+    prompts = list(fixtures.prompts(random.Random(2), 1000))
+
+    def one_by_one():
+        requirements_cache.clear()
+        for prompt in prompts:
+            search.parse_requirements(prompt)
+
+    def batched():
+        for _ in search.parse_requirements_batch(prompts):
+            pass
+
+    yield 'n=1000 loop', one_by_one
+    yield 'n=1000 pipe', batched
+
+@benchmark('hotel.process_booking_response')
+def process_booking_response(ctx):
+    service = _hotel_service()
+    for size in ctx.sizes:
+        payload = fixtures.booking_hotels(random.Random(size), 'Goa', size)
+        yield f"n={size}", lambda payload=payload: service._process_booking_response(payload)
+
+@benchmark('hotel.process_mmt_response')
+def process_mmt_response(ctx):
+    service = _hotel_service()
+    for size in ctx.sizes:
+        payload = fixtures.mmt_hotels(random.Random(size), 'Goa', size)
+        yield f"n={size}", lambda payload=payload: service._process_mmt_response(payload)
+
+@benchmark('hotel.process_and_sort_results')
+def process_and_sort_results(ctx):
+    service = _hotel_service()
+    for size in ctx.sizes:
+        rnd = random.Random(size)
+        # Both providers list the same city, so roughly a third of rows are duplicates
+        hotels = (
+            service._process_booking_response(fixtures.booking_hotels(rnd, 'Goa', size))
+            + service._process_mmt_response(fixtures.mmt_hotels(rnd, 'Goa', size))
+        )
+        yield f"n={size}", lambda hotels=hotels: service._process_and_sort_results(hotels)
+
+@benchmark('transport.resolve_city')
+def resolve_city(ctx):
+    from app.services.city_catalog import CityCatalog
+    from app.services.transport_service import TransportService
+    service = TransportService()
+    names = [name for name, _, _ in fixtures.CITIES]
+    state = {'i': 0}
+
+    def next_name():
+        state['i'] = (state['i'] + 1) % len(names)
+        return names[state['i']]
+
+    yield 'network', lambda: _network_city_id(service, next_name())
+    for size in ctx.sizes:
+        catalog = CityCatalog(loader=lambda size=size: fixtures.redbus_cities(max(size, len(names))))
+        catalog.resolve(names[0])
+        yield f"catalog n={size}", lambda catalog=catalog: catalog.resolve(next_name())
+        yield f"catalog n={size} typo", lambda catalog=catalog: catalog.resolve(next_name()[:-1] + 'x')
+
+def _network_city_id(service, name):
+    """The pre-catalog lookup: one GET /cities?search= per name"""
+    from app.services.http_client import provider_http
+    response = provider_http.get(f"{service.base_url}/cities", params={'search': name})
+    cities = response.json()
+    return cities[0]['id'] if cities else None
+
+@benchmark('transport.pick_seats')
+def pick_seats(ctx):
+    from app.services.seat_layout import SeatMap
+    layout = fixtures.seat_layout(random.Random(3), 'bench', rows=12, occupancy=0.6)
+    seat_map = SeatMap(layout)
+    yield 'decode', lambda: SeatMap(layout)
+    for count in (1, 2, 4, 6):
+        yield f"group={count}", lambda count=count: seat_map.pick_seats(count, window=True, lower=True)
+
+@benchmark('fare_comparison.analyze_fares')
+def analyze_fares(ctx):
+    from app.services.fare_analysis import FareColumns, analyze
+    from app.services.smart_services import FareComparison
+    comparison = FareComparison()
+    for size in ctx.sizes:
+        fares = fixtures.fares(random.Random(size), per_provider=max(size // 3, 1))
+        yield f"n={size}", lambda fares=fares: comparison.analyze_fares(fares)
+
+        # The analytics alone, on fares already loaded into columns
+        columns = FareColumns(fares)
+
+        def on_columns(columns=columns):
+            columns._per_hour = None
+            analyze(columns)
+
+        yield f"n={size} columns", on_columns
+
+@benchmark('smart_search.rank_results')
+def rank_results(ctx):
+    search = _smart_search()
+    requirements = {'budget': 3000.0, 'preferences': ['AC', 'Sleeper'], 'transport_type': 'bus'}
+    for size in ctx.sizes:
+        rnd = random.Random(size)
+        items = [{
+            'price': rnd.randint(400, 5000),
+            'rating': round(rnd.uniform(2.5, 5.0), 1),
+            'type': rnd.choice(fixtures.BUS_TYPES)
+        } for _ in range(size)]
+
+        def rank(items=items):
+            # rank_results sorts in place; hand it fresh lists each call
+            search.rank_results({'transport': list(items), 'hotels': list(items)}, requirements)
+
+        yield f"n={size}", rank
+
+@benchmark('flask.search_hotels_request')
+def flask_search_hotels(ctx):
+    """End-to-end request through the Flask stack against the provider stub"""
+    from flask import Blueprint, jsonify, request
+    from app import create_app
+    from app.services.search_cache import search_cache
+
+    bench = Blueprint('bench', __name__)
+
+    @bench.route('/__bench__/search_hotels', methods=['POST'])
+    def search_hotels():
+        return jsonify(_hotel_service().search_hotels_by_params(request.json))
+
+    app = create_app()
+    app.register_blueprint(bench)
+    client = app.test_client()
+    params = {
+        'location': 'Goa', 'check_in': '2025-03-01', 'check_out': '2025-03-03',
+        'guests': 2, 'rooms': 1, 'min_rating': 0
+    }
+
+    def cold():
+        search_cache._memory.clear()
+        response = client.post('/__bench__/search_hotels', json=params)
+        assert response.status_code == 200
+
+    def warm():
+        response = client.post('/__bench__/search_hotels', json=params)
+        assert response.status_code == 200
+
+    yield 'uncached', cold
+    yield 'cached', warm
+
+@benchmark('price_history.query')
+def price_history_query(ctx):
+    """30-day lowest/percentiles/trend for one route among 1000, after ingest and downsampling"""
+    import time
+    import numpy as np
+    from app.services.price_history import PriceHistory
+    now = int(time.time())
+    keys = [f"price_watch:route{i}" for i in range(1000)]
+    for size in ctx.sizes:
+        rng = np.random.default_rng(size)
+        key_index = rng.integers(0, len(keys), size)
+        low = 500 + rng.normal(0, 40, size)
+        history = PriceHistory(path='')
+        history.record_many({
+            'ts': now - rng.integers(0, 90 * 86400, size),
+            'key': [keys[i] for i in key_index],
+            'provider': ['redbus'] * size,
+            'min': low, 'median': low + 50, 'max': low + 200
+        })
+        key = keys[int(key_index[0])]
+        yield f"lowest n={size}", lambda history=history, key=key: history.lowest(key, 30, now=now)
+        yield f"percentiles n={size}", lambda history=history, key=key: history.percentiles(key, days=30, now=now)
+        yield f"trend n={size}", lambda history=history, key=key: history.trend(key, 30, now=now)
@@ -0,0 +1,229 @@
+"""
+Deterministic synthetic provider payloads.
+
+Shared by the provider stub server and the benchmark suite so that both see
+the same shapes the services parse. Every generator takes a random.Random so
+callers control reproducibility.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+CITIES = [
+    ('Mumbai', 19.0760, 72.8777), ('Delhi', 28.7041, 77.1025),
+    ('Bengaluru', 12.9716, 77.5946), ('Hyderabad', 17.3850, 78.4867),
+    ('Chennai', 13.0827, 80.2707), ('Kolkata', 22.5726, 88.3639),
+    ('Pune', 18.5204, 73.8567), ('Ahmedabad', 23.0225, 72.5714),
+    ('Jaipur', 26.9124, 75.7873), ('Goa', 15.2993, 74.1240),
+    ('Kochi', 9.9312, 76.2673), ('Mysuru', 12.2958, 76.6394),
+    ('Udaipur', 24.5854, 73.7125), ('Manali', 32.2432, 77.1892),
+    ('Rishikesh', 30.0869, 78.2676), ('Varanasi', 25.3176, 82.9739)
+]
+
+NAME_WORDS = [
+    'Grand', 'Royal', 'Palace', 'Residency', 'Comfort', 'Heritage', 'Lotus',
+    'Orchid', 'Crown', 'Regency', 'Sea View', 'Lake View', 'Park', 'Plaza',
+    'Garden', 'Sunrise', 'Emerald', 'Sapphire', 'Meadows', 'Imperial'
+]
+
+CITY_ALIASES = {
+    'Bengaluru': ['Bangalore'], 'Mumbai': ['Bombay'], 'Chennai': ['Madras'],
+    'Kolkata': ['Calcutta'], 'Kochi': ['Cochin'], 'Mysuru': ['Mysore']
+}
+
+AMENITIES = ['wifi', 'pool', 'parking', 'breakfast', 'gym', 'spa', 'bar', 'airport_shuttle']
+OPERATORS = ['VRL Travels', 'SRS Travels', 'Orange Tours', 'Kallada', 'KPN', 'Neeta', 'Paulo', 'Zingbus']
+BUS_TYPES = ['AC Sleeper (2+1)', 'Non AC Seater (2+2)', 'Volvo Multi-Axle AC Semi Sleeper', 'AC Seater (2+2)']
+
+def city_coordinates(city):
+    for name, lat, lon in CITIES:
+        if name.lower() == (city or '').lower():
+            return lat, lon
+    return CITIES[0][1], CITIES[0][2]
+
+def properties(rnd, city, count):
+    """Ground-truth hotels in a city; providers list overlapping subsets"""
+    lat, lon = city_coordinates(city)
+    hotels = []
+    for i in range(count):
+        hotels.append({
+            'key': i,
+            'name': f"{rnd.choice(NAME_WORDS)} {rnd.choice(NAME_WORDS)} {i}",
+            'latitude': lat + rnd.uniform(-0.08, 0.08),
+            'longitude': lon + rnd.uniform(-0.08, 0.08),
+            'rating': round(rnd.uniform(2.5, 5.0), 1),
+            'price': rnd.randint(800, 15000)
+        })
+    return hotels
+
+def booking_hotels(rnd, city, count):
+    """Booking.com search response body"""
+    result = []
+    for hotel in properties(random.Random(f"props:{city}"), city, count):
+        result.append({
+            'hotel_id': 100000 + hotel['key'],
+            'hotel_name': f"The {hotel['name']} Hotel",
+            'review_score': hotel['rating'] * 2,
+            'min_total_price': round(hotel['price'] * rnd.uniform(0.9, 1.1), 2),
+            'currency': 'INR',
+            'address': f"{hotel['key']} Main Road, {city}",
+            'latitude': round(hotel['latitude'], 5),
+            'longitude': round(hotel['longitude'], 5),
+            'facilities': rnd.sample(AMENITIES, 3),
+            'photos': [f"https://cf.bstatic.com/images/{hotel['key']}_{n}.jpg" for n in range(3)],
+            'cancellation_policy': rnd.choice(['free_cancellation', 'non_refundable'])
+        })
+    return {'result': result}
+
+def mmt_hotels(rnd, city, count):
+    """MakeMyTrip search response body; roughly 60% overlap with Booking.com"""
+    hotels = []
+    for hotel in properties(random.Random(f"props:{city}"), city, count):
+        if rnd.random() > 0.6:
+            continue
+        hotels.append({
+            'id': f"MMT{hotel['key']:06d}",
+            'name': hotel['name'],
+            'rating': hotel['rating'],
+            'price': {'amount': round(hotel['price'] * rnd.uniform(0.85, 1.15), 2), 'currency': 'INR'},
+            'address': f"{hotel['key']}, Main Rd, {city}",
+            'latitude': round(hotel['latitude'], 3),
+            'longitude': round(hotel['longitude'], 3),
+            'amenities': rnd.sample(AMENITIES, 4),
+            'images': [f"https://imgak.mmtcdn.com/hotels/{hotel['key']}_{n}.jpg" for n in range(2)],
+            'cancellationPolicy': rnd.choice(['Free cancellation till 24 hrs', 'Non refundable'])
+        })
+    return {'hotels': hotels}
+
+def redbus_cities(count=None):
+    """RedBus city list: [{'id', 'name', 'aliases'}]"""
+    cities = [
+        {'id': i + 1, 'name': name, 'aliases': CITY_ALIASES.get(name, [])}
+        for i, (name, _, _) in enumerate(CITIES)
+    ]
+    if count:
+        rnd = random.Random('cities')
+        for i in range(len(cities), count):
+            name = ''.join(rnd.choice('abcdefghiklmnoprstuvy') for _ in range(rnd.randint(4, 10))).title()
+            cities.append({'id': i + 1, 'name': f"{name}pur" if i % 3 == 0 else name, 'aliases': []})
+    return cities
+
+def redbus_inventories(rnd, source, destination, count):
+    """RedBus search response body"""
+    inventories = []
+    departure = datetime(2025, 1, 1, 17, 0)
+    for i in range(count):
+        leaves = departure + timedelta(minutes=rnd.randint(0, 360))
+        duration = timedelta(minutes=rnd.randint(300, 900))
+        inventories.append({
+            'id': f"{source[:3].upper()}{destination[:3].upper()}{i:04d}",
+            'travelsName': rnd.choice(OPERATORS),
+            'busType': rnd.choice(BUS_TYPES),
+            'departureTime': leaves.strftime('%H:%M'),
+            'arrivalTime': (leaves + duration).strftime('%H:%M'),
+            'availableSeats': rnd.randint(0, 36),
+            'fare': rnd.randint(450, 2500),
+            'boardingPoints': [f"{source} Point {n}" for n in range(3)],
+            'droppingPoints': [f"{destination} Point {n}" for n in range(3)],
+            'amenities': rnd.sample(['water', 'blanket', 'charging', 'wifi', 'snacks'], 2),
+            'rating': round(rnd.uniform(3.0, 4.9), 1),
+            'cancellationPolicy': '10% till 24 hrs before departure'
+        })
+    return {'inventories': inventories}
+
+def seat_layout(rnd, bus_id, rows=10, occupancy=0.5):
+    """
+    RedBus-style seat layout: a 2+1 sleeper with lower (zIndex 0) and upper
+    (zIndex 1) decks. Columns 0 and 3 are windows, column 2 is the aisle.
+    """
+    seats = []
+    for deck, prefix in ((0, 'L'), (1, 'U')):
+        for row in range(rows):
+            for index, column in enumerate((0, 1, 3)):
+                seats.append({
+                    'name': f"{prefix}{row * 3 + index + 1}",
+                    'row': row,
+                    'column': column,
+                    'zIndex': deck,
+                    'length': 2,
+                    'width': 1,
+                    'available': rnd.random() > occupancy,
+                    'ladiesSeat': rnd.random() < 0.05,
+                    'fare': 900 if deck == 0 else 850
+                })
+    return {'busId': bus_id, 'maxRows': rows, 'maxColumns': 4, 'seats': seats}
+
+def fares(rnd, providers=('redbus', 'abhibus', 'others'), per_provider=20):
+    """FareComparison.analyze_fares input: provider -> list of fares"""
+    result = {}
+    for provider in providers:
+        result[provider] = [{
+            'amount': float(rnd.randint(450, 2500)),
+            'departure': f"{rnd.randint(0, 23):02d}:{rnd.choice(['00', '15', '30', '45'])}",
+            'duration': f"{rnd.randint(5, 15)}h {rnd.choice([0, 15, 30, 45])}m",
+            'rating': round(rnd.uniform(3.0, 4.9), 1) if rnd.random() > 0.1 else 'N/A'
+        } for _ in range(per_provider)]
+    return result
+
+def bus_results_html(rnd, source, destination, count, embedded=False):
+    """
+    RedBus search results page, with the card markup the scraper's selectors
+    expect, or with embedded=True the client-rendered variant: no cards,
+    just the results as a __NEXT_DATA__ JSON blob
+    """
+    inventories = redbus_inventories(rnd, source, destination, count)['inventories']
+    if embedded:
+        state = {'props': {'pageProps': {'searchResult': {'inventories': inventories}}}}
+        blob = json.dumps(state).replace('</', '<\\/')
+        return (
+            '<html><head><title>Buses</title></head><body><div id="root"></div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{blob}</script>'
+            '</body></html>'
+        )
+    cards = []
+    for bus in inventories:
+        cards.append(
+            f'<li class="bus-item row-sec" data-url="https://www.redbus.in/bus/{bus["id"]}">'
+            f'<div class="column-one"><div class="travels lh-24 f-bold">{bus["travelsName"]}</div>'
+            f'<div class="bus-type">{bus["busType"]}</div></div>'
+            f'<div class="column-two"><div class="dep-time">{bus["departureTime"]}</div>'
+            f'<div class="dur">{rnd.randint(5, 15)}h {rnd.choice([0, 15, 30, 45])}m</div>'
+            f'<div class="arr-time">{bus["arrivalTime"]}</div></div>'
+            f'<div class="rating"><span>{bus["rating"]}</span></div>'
+            f'<div class="fare d-block">INR <span>{bus["fare"]}</span></div>'
+            f'<div class="seat-available">{bus["availableSeats"]} Seats available</div></li>'
+        )
+    return f'<html><head><title>Buses</title></head><body><ul class="bus-items">{"".join(cards)}</ul></body></html>'
+
+def hotel_results_html(rnd, city, count):
+    """Booking.com search results page, with the card markup the scraper's selectors expect"""
+    cards = []
+    for hotel in properties(rnd, city, count):
+        cards.append(
+            f'<div class="hotel-item" data-url="https://www.booking.com/hotel/in/{hotel["key"]}.html">'
+            f'<h3 class="hotel-name">{hotel["name"]}</h3>'
+            f'<div class="rating">{hotel["rating"]}</div>'
+            f'<div class="price"><span>₹ {hotel["price"]:,}</span></div>'
+            f'<span class="location">{hotel["key"]} Main Road, {city}</span></div>'
+        )
+    return f'<html><head><title>Hotels</title></head><body><div id="results">{"".join(cards)}</div></body></html>'
+
+PROMPT_TEMPLATES = [
+    "Find me a hotel in {city} from {day}th March to {day2}th March under Rs {budget}",
+    "Book a bus from {city} to {city2} tomorrow, AC sleeper, window seat",
+    "I need a 4 star hotel in {city} for 2 adults next week with budget of INR {budget}",
+    "Cheapest volvo bus {city} to {city2} on {day}/04/2025",
+    "Looking for a non-AC train to {city2} next month, less than {budget}"
+]
+
+def prompts(rnd, count):
+    """Search prompts in the shapes users type them"""
+    names = [name for name, _, _ in CITIES]
+    for _ in range(count):
+        yield rnd.choice(PROMPT_TEMPLATES).format(
+            city=rnd.choice(names),
+            city2=rnd.choice(names),
+            day=rnd.randint(10, 20),
+            day2=rnd.randint(21, 28),
+            budget=rnd.choice([1500, 2500, '3,000', 5000, 12000])
+        )
@@ -0,0 +1,98 @@
+"""
+Minimal benchmark harness.
+
+A benchmark is a generator registered with @benchmark that yields
+(case_name, callable) pairs; setup happens in the generator, only the
+callable is timed. Raising Skip (or ImportError for an optional
+dependency) records the benchmark as skipped instead of failing the run.
+"""
+import gc
+import statistics
+import time
+
+BENCHMARKS = {}
+
+class Skip(Exception):
+    """Raised by a benchmark that cannot run in this environment"""
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+class Context:
+    """Options shared by every benchmark in a run"""
+
+    def __init__(self, sizes=(10, 1000, 100000), repeat=5, min_time=0.2, **extra):
+        self.sizes = sizes
+        self.repeat = repeat
+        self.min_time = min_time
+        self.extra = extra
+
+def calibrate(func, min_time):
+    """Number of calls per sample so one sample takes at least min_time"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1 << 20:
+            return number
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+def measure(func, repeat, min_time):
+    """Per-call timings in seconds over `repeat` samples"""
+    number = calibrate(func, min_time)
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    samples.sort()
+    return {
+        'loops': number,
+        'repeat': repeat,
+        'min_s': samples[0],
+        'median_s': statistics.median(samples),
+        'mean_s': statistics.fmean(samples),
+        'p95_s': samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        'max_s': samples[-1]
+    }
+
+def run(names, context, log=print):
+    """Run the named benchmarks; returns {name: {case: stats} | {'skipped': reason}}"""
+    results = {}
+    for name in names:
+        cases = {}
+        try:
+            for case, func in BENCHMARKS[name](context):
+                cases[case] = measure(func, context.repeat, context.min_time)
+                log(f"{name} [{case}]: median {cases[case]['median_s'] * 1e3:.3f} ms")
+        except (Skip, ImportError) as e:
+            cases = {'skipped': str(e)}
+            log(f"{name}: skipped ({str(e)})")
+        results[name] = cases
+    return results
+
+def compare(baseline, current, threshold=0.10):
+    """Rows of (benchmark, case, baseline median, current median, ratio, flag)"""
+    rows = []
+    for name, cases in current.items():
+        for case, stats in cases.items():
+            before = baseline.get(name, {}).get(case)
+            if not isinstance(stats, dict) or not isinstance(before, dict):
+                continue
+            ratio = stats['median_s'] / before['median_s'] if before['median_s'] else float('inf')
+            flag = 'slower' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else ''
+            rows.append((name, case, before['median_s'], stats['median_s'], ratio, flag))
+    return rows
@@ -0,0 +1,86 @@
+"""
+Startup import report, built from `python -X importtime` in a fresh interpreter.
+
+Each scenario records the total import time, the slowest top-level
+packages, and which of lazy_imports.HEAVY_MODULES got imported. create_app
+must not import any of them; compare() reports a scenario that starts to.
+"""
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'create_app': 'from app import create_app; create_app()',
+    'services': (
+        'import app.services.hotel_service, app.services.transport_service, '
+        'app.services.payment_service, app.services.smart_services'
+    )
+}
+
+# "import time:       346 |     595893 | app"
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$')
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+def measure(statement, top=10):
+    from app.services.lazy_imports import HEAVY_MODULES
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=REPO_ROOT, env=dict(os.environ), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1:]}
+
+    rows = parse_importtime(result.stderr)
+    # Self time summed per top-level package, so nested imports are charged
+    # to the package that owns them rather than to whoever imported it first
+    packages = {}
+    for module, self_us, _, _ in rows:
+        package = module.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    loaded = sorted(set(packages) & set(HEAVY_MODULES))
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'total_s': sum(cumulative_us for _, _, cumulative_us, depth in rows if depth == 0) / 1e6,
+        'modules': len(rows),
+        'slowest_s': {package: us / 1e6 for package, us in slowest},
+        'heavy_loaded': loaded
+    }
+
+def collect():
+    return {name: measure(statement) for name, statement in SCENARIOS.items()}
+
+def compare(baseline, current, threshold=0.10):
+    """Human-readable lines for startup regressions between two reports"""
+    lines = []
+    for name, report in current.items():
+        if 'error' in report:
+            lines.append(f"imports [{name}]: failed: {report['error']}")
+            continue
+        if name == 'create_app' and report['heavy_loaded']:
+            lines.append(f"imports [{name}]: imports heavy modules {', '.join(report['heavy_loaded'])}")
+        before = baseline.get(name)
+        if not before or 'error' in before:
+            continue
+        added = sorted(set(report['heavy_loaded']) - set(before['heavy_loaded']))
+        if added:
+            lines.append(f"imports [{name}]: now imports {', '.join(added)}")
+        ratio = report['total_s'] / before['total_s'] if before['total_s'] else float('inf')
+        flag = 'slower' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else ''
+        lines.append(
+            f"imports [{name}]: {before['total_s'] * 1e3:.1f} ms -> {report['total_s'] * 1e3:.1f} ms "
+            f"({ratio:.2f}x) {flag}"
+        )
+    return lines
@@ -0,0 +1,401 @@
+"""
+Offline stand-in for the Booking.com, MakeMyTrip, RedBus and Razorpay APIs.
+
+Serves every endpoint the services call, with configurable latency
+distributions, error rates and payload sizes, so search and booking paths
+can be benchmarked and load-tested without live credentials:
+
+    python -m benchmarks.provider_stub --port 8099 \\
+        --latency lognormal:80:0.5 --latency redbus=uniform:150:400 \\
+        --error-rate 0.01 --hotels 200 --buses 60
+
+and point the app at it:
+
+    BOOKING_COM_BASE_URL=http://127.0.0.1:8099/booking
+    MAKEMYTRIP_BASE_URL=http://127.0.0.1:8099/mmt
+    REDBUS_BASE_URL=http://127.0.0.1:8099/redbus/v2
+    RAZORPAY_BASE_URL=http://127.0.0.1:8099/razorpay/v1
+    REDBUS_WEB_URL=http://127.0.0.1:8099/redbus-web
+    BOOKING_COM_WEB_URL=http://127.0.0.1:8099/booking-web
+
+Record/replay: `--mode record --upstream redbus=https://api.redbus.in/v2`
+proxies to the real provider and saves every exchange under --tape-dir;
+`--mode replay` serves those recordings back, with the recorded latency
+when --replay-latency=recorded.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+
+from flask import Flask, Response, jsonify, request
+
+from benchmarks import fixtures
+
+# Where each provider is mounted; the remainder of the path matches the real API
+PROVIDER_PREFIXES = {
+    'booking': '/booking',
+    'mmt': '/mmt',
+    'redbus': '/redbus/v2',
+    'razorpay': '/razorpay/v1',
+    # Public search pages the scraper fetches over HTTP
+    'redbus-web': '/redbus-web',
+    'booking-web': '/booking-web'
+}
+PROVIDERS = tuple(PROVIDER_PREFIXES)
+
+class LatencyModel:
+    """
+    Latency distribution parsed from a spec string:
+    fixed:MS, uniform:LOW_MS:HIGH_MS, normal:MEAN_MS:SD_MS or
+    lognormal:MEDIAN_MS:SIGMA
+    """
+
+    def __init__(self, spec='fixed:0'):
+        kind, *args = spec.split(':')
+        values = [float(arg) for arg in args]
+        if kind == 'fixed' and len(values) == 1:
+            self._sample = lambda rnd: values[0]
+        elif kind == 'uniform' and len(values) == 2:
+            self._sample = lambda rnd: rnd.uniform(values[0], values[1])
+        elif kind == 'normal' and len(values) == 2:
+            self._sample = lambda rnd: max(0.0, rnd.gauss(values[0], values[1]))
+        elif kind == 'lognormal' and len(values) == 2:
+            mu = math.log(values[0]) if values[0] > 0 else 0.0
+            self._sample = lambda rnd: rnd.lognormvariate(mu, values[1])
+        else:
+            raise ValueError(f"Bad latency spec: {spec}")
+        self.spec = spec
+
+    def sample_ms(self, rnd):
+        return self._sample(rnd)
+
+class StubSettings:
+    """Knobs for the stub; per-provider dicts fall back to the '*' entry"""
+
+    def __init__(self, latency=None, error_rate=None, hotels=50, buses=40, cities=500,
+                 seat_rows=10, seed=42, mode='synthetic', upstreams=None,
+                 tape_dir='benchmarks/tapes', replay_latency='model'):
+        self.latency = {'*': LatencyModel()}
+        self.latency.update(latency or {})
+        self.error_rate = {'*': 0.0}
+        self.error_rate.update(error_rate or {})
+        self.hotels = hotels
+        self.buses = buses
+        self.cities = cities
+        self.seat_rows = seat_rows
+        self.seed = seed
+        self.mode = mode
+        self.upstreams = upstreams or {}
+        self.tape_dir = tape_dir
+        self.replay_latency = replay_latency
+
+    def latency_for(self, provider):
+        return self.latency.get(provider, self.latency['*'])
+
+    def error_rate_for(self, provider):
+        return self.error_rate.get(provider, self.error_rate['*'])
+
+class Tape:
+    """Recorded request/response pairs, one JSON file per request fingerprint"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def fingerprint(provider, method, path, query, body):
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True) if body else ''
+        except ValueError:
+            body = body.decode('utf-8', 'replace') if isinstance(body, bytes) else body
+        query = '&'.join(sorted(query.split('&'))) if query else ''
+        raw = f"{provider}\n{method}\n{path}\n{query}\n{body}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, provider, key):
+        return os.path.join(self.directory, provider, f"{key}.json")
+
+    def load(self, provider, key):
+        try:
+            with open(self._path(provider, key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, provider, key, entry):
+        path = self._path(provider, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(entry, f, indent=1)
+
+def create_stub_app(settings=None):
+    """Flask app implementing the provider endpoints"""
+    settings = settings or StubSettings()
+    app = Flask(__name__)
+    tape = Tape(settings.tape_dir)
+    local = threading.local()
+    bookings = {}
+
+    def rnd_for(*parts):
+        # Same request -> same payload, so cached and uncached runs compare
+        return random.Random(':'.join(str(part) for part in (settings.seed,) + parts))
+
+    def jitter():
+        rng = getattr(local, 'rng', None)
+        if rng is None:
+            rng = local.rng = random.Random()
+        return rng
+
+    @app.before_request
+    def simulate_network():
+        provider = request.path.strip('/').split('/', 1)[0]
+        if provider not in PROVIDERS:
+            return None
+        request.environ['stub.provider'] = provider
+
+        if settings.mode == 'record':
+            return record(provider)
+        if settings.mode == 'replay':
+            return replay(provider)
+
+        time.sleep(settings.latency_for(provider).sample_ms(jitter()) / 1000.0)
+        if jitter().random() < settings.error_rate_for(provider):
+            return jsonify({'error': {'code': 'SERVER_ERROR', 'description': 'stub injected failure'}}), 503
+        return None
+
+    def record(provider):
+        import requests
+        upstream = settings.upstreams.get(provider)
+        if not upstream:
+            return jsonify({'error': f"no upstream configured for {provider}"}), 502
+        path = request.path[len(PROVIDER_PREFIXES[provider]):]
+        body = request.get_data()
+        started = time.monotonic()
+        response = requests.request(
+            request.method,
+            upstream.rstrip('/') + path,
+            params=request.args,
+            data=body,
+            headers={k: v for k, v in request.headers if k.lower() not in ('host', 'content-length')},
+            timeout=30
+        )
+        elapsed_ms = (time.monotonic() - started) * 1000
+        key = Tape.fingerprint(provider, request.method, path, request.query_string.decode(), body)
+        tape.save(provider, key, {
+            'request': {'method': request.method, 'path': path, 'query': request.query_string.decode()},
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type', 'application/json'),
+            'body': response.text,
+            'elapsed_ms': elapsed_ms
+        })
+        return Response(response.text, status=response.status_code,
+                        content_type=response.headers.get('Content-Type', 'application/json'))
+
+    def replay(provider):
+        path = request.path[len(PROVIDER_PREFIXES[provider]):]
+        key = Tape.fingerprint(provider, request.method, path, request.query_string.decode(), request.get_data())
+        entry = tape.load(provider, key)
+        if entry is None:
+            return jsonify({'error': f"no recording for {request.method} {request.full_path}"}), 404
+        if settings.replay_latency == 'recorded':
+            time.sleep(entry['elapsed_ms'] / 1000.0)
+        else:
+            time.sleep(settings.latency_for(provider).sample_ms(jitter()) / 1000.0)
+        return Response(entry['body'], status=entry['status'], content_type=entry['content_type'])
+
+    # Booking.com
+    @app.route('/booking/cities', methods=['GET'])
+    def booking_cities():
+        name = request.args.get('name', '')
+        cities = [city for city in fixtures.redbus_cities() if city['name'].lower() == name.lower()]
+        return jsonify({'result': [{'city_id': -city['id'], 'name': city['name']} for city in cities]})
+
+    @app.route('/booking/bookings', methods=['POST'])
+    def booking_bookings():
+        body = request.get_json(silent=True) or {}
+        if 'hotel_id' in body:
+            reference = f"BK{uuid.uuid4().hex[:10].upper()}"
+            bookings[reference] = 'CONFIRMED'
+            return jsonify({
+                'booking_reference': reference,
+                'payment_url': f"{request.host_url}pay/{reference}",
+                'total_amount': rnd_for('bk', body['hotel_id']).randint(2000, 20000)
+            })
+        city_id = body.get('city_id')
+        city = next((c['name'] for c in fixtures.redbus_cities() if -c['id'] == city_id), 'Mumbai')
+        rnd = rnd_for('booking', city, body.get('checkin'), body.get('checkout'))
+        return jsonify(fixtures.booking_hotels(rnd, city, settings.hotels))
+
+    # MakeMyTrip
+    @app.route('/mmt/hotels/search', methods=['POST'])
+    def mmt_search():
+        body = request.get_json(silent=True) or {}
+        city = body.get('city') or 'Mumbai'
+        rnd = rnd_for('mmt', city, body.get('checkin'), body.get('checkout'))
+        return jsonify(fixtures.mmt_hotels(rnd, city, settings.hotels))
+
+    # RedBus
+    @app.route('/redbus/v2/cities', methods=['GET'])
+    def redbus_cities():
+        cities = fixtures.redbus_cities(settings.cities)
+        search = request.args.get('search')
+        if search:
+            needle = search.lower()
+            cities = [
+                city for city in cities
+                if city['name'].lower().startswith(needle)
+                or any(alias.lower().startswith(needle) for alias in city['aliases'])
+            ]
+        return jsonify(cities)
+
+    @app.route('/redbus/v2/search', methods=['POST'])
+    def redbus_search():
+        body = request.get_json(silent=True) or {}
+        source = body.get('source') or 'Bengaluru'
+        destination = body.get('destination') or 'Chennai'
+        rnd = rnd_for('redbus', source, destination, body.get('doj'))
+        return jsonify(fixtures.redbus_inventories(rnd, source, destination, settings.buses))
+
+    @app.route('/redbus/v2/layout/<bus_id>', methods=['GET'])
+    def redbus_layout(bus_id):
+        return jsonify(fixtures.seat_layout(rnd_for('layout', bus_id), bus_id, rows=settings.seat_rows))
+
+    @app.route('/redbus/v2/booking/initiate', methods=['POST'])
+    def redbus_initiate():
+        body = request.get_json(silent=True) or {}
+        reference = f"RB{uuid.uuid4().hex[:10].upper()}"
+        bookings[reference] = 'PENDING'
+        seats = body.get('seatNumbers') or []
+        return jsonify({
+            'bookingReference': reference,
+            'paymentUrl': f"{request.host_url}pay/{reference}",
+            'totalAmount': 900 * max(len(seats), 1)
+        })
+
+    @app.route('/redbus/v2/booking/status/<reference>', methods=['GET'])
+    def redbus_status(reference):
+        rnd = rnd_for('status', reference)
+        status = bookings.get(reference) or rnd.choice(['CONFIRMED', 'PENDING', 'CANCELLED'])
+        return jsonify({
+            'bookingReference': reference,
+            'status': status,
+            'ticketNumber': f"TK{rnd.randint(10 ** 7, 10 ** 8 - 1)}",
+            'pnr': f"PNR{rnd.randint(10 ** 5, 10 ** 6 - 1)}"
+        })
+
+    # Search result pages. RedBus renders client-side, so its page carries
+    # the results as embedded JSON; Booking.com's has server-rendered cards.
+    @app.route('/redbus-web/search', methods=['GET'])
+    def redbus_web_search():
+        source = request.args.get('fromCityName') or 'Bengaluru'
+        destination = request.args.get('toCityName') or 'Chennai'
+        rnd = rnd_for('redbus', source, destination, request.args.get('onward'))
+        html = fixtures.bus_results_html(rnd, source, destination, settings.buses, embedded=True)
+        return Response(html, content_type='text/html; charset=utf-8')
+
+    @app.route('/booking-web/searchresults.html', methods=['GET'])
+    def booking_web_search():
+        city = request.args.get('ss') or 'Mumbai'
+        rnd = rnd_for('booking-web', city, request.args.get('checkin'), request.args.get('checkout'))
+        html = fixtures.hotel_results_html(rnd, city, settings.hotels)
+        return Response(html, content_type='text/html; charset=utf-8')
+
+    # Razorpay
+    @app.route('/razorpay/v1/payment_links', methods=['POST'])
+    @app.route('/razorpay/v1/payment_links/', methods=['POST'])
+    def razorpay_create_link():
+        link_id = f"plink_{uuid.uuid4().hex[:14]}"
+        body = request.get_json(silent=True) or {}
+        return jsonify({
+            'id': link_id,
+            'amount': body.get('amount'),
+            'currency': body.get('currency', 'INR'),
+            'status': 'created',
+            'short_url': f"{request.host_url}rzp/{link_id}"
+        })
+
+    @app.route('/razorpay/v1/payment_links/<link_id>', methods=['GET'])
+    def razorpay_fetch_link(link_id):
+        status = 'paid' if rnd_for('plink', link_id).random() < 0.8 else 'created'
+        return jsonify({'id': link_id, 'status': status})
+
+    return app
+
+def start_in_thread(settings=None, host='127.0.0.1', port=0, quiet=True):
+    """Serve the stub from a background thread; returns (server, base_url)"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class RequestHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            if not quiet:
+                super().log_request(*args, **kwargs)
+
+    server = make_server(host, port, create_stub_app(settings), threaded=True,
+                         request_handler=RequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+def provider_env(base_url):
+    """Config overrides that point every provider at a stub at `base_url`"""
+    return {
+        'BOOKING_COM_BASE_URL': base_url + PROVIDER_PREFIXES['booking'],
+        'MAKEMYTRIP_BASE_URL': base_url + PROVIDER_PREFIXES['mmt'],
+        'REDBUS_BASE_URL': base_url + PROVIDER_PREFIXES['redbus'],
+        'RAZORPAY_BASE_URL': base_url + PROVIDER_PREFIXES['razorpay'],
+        'REDBUS_WEB_URL': base_url + PROVIDER_PREFIXES['redbus-web'],
+        'BOOKING_COM_WEB_URL': base_url + PROVIDER_PREFIXES['booking-web']
+    }
+
+def _per_provider(values, convert):
+    """Parse repeated 'provider=value' / 'value' options into a dict"""
+    result = {}
+    for value in values or []:
+        provider, sep, spec = value.partition('=')
+        if not sep or provider not in PROVIDERS:
+            provider, spec = '*', value
+        result[provider] = convert(spec)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', action='append',
+                        help="[provider=]fixed:MS | uniform:LO:HI | normal:MEAN:SD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument('--error-rate', action='append', help="[provider=]FRACTION of requests answered 503")
+    parser.add_argument('--hotels', type=int, default=50, help="hotels per provider per search")
+    parser.add_argument('--buses', type=int, default=40, help="buses per route search")
+    parser.add_argument('--cities', type=int, default=500, help="size of the RedBus city list")
+    parser.add_argument('--seat-rows', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mode', choices=['synthetic', 'record', 'replay'], default='synthetic')
+    parser.add_argument('--upstream', action='append', help="provider=BASE_URL to proxy to in record mode")
+    parser.add_argument('--tape-dir', default='benchmarks/tapes')
+    parser.add_argument('--replay-latency', choices=['model', 'recorded'], default='model')
+    args = parser.parse_args(argv)
+
+    settings = StubSettings(
+        latency=_per_provider(args.latency, LatencyModel),
+        error_rate=_per_provider(args.error_rate, float),
+        hotels=args.hotels,
+        buses=args.buses,
+        cities=args.cities,
+        seat_rows=args.seat_rows,
+        seed=args.seed,
+        mode=args.mode,
+        upstreams=_per_provider(args.upstream, str),
+        tape_dir=args.tape_dir,
+        replay_latency=args.replay_latency
+    )
+    base_url = f"http://{args.host}:{args.port}"
+    for name, value in provider_env(base_url).items():
+        print(f"{name}={value}")
+    create_stub_app(settings).run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == '__main__':
+    main()
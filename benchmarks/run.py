@@ -0,0 +1,109 @@
+"""
+Run the benchmark suite and write the results as JSON.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --only hotel. --sizes 10,1000 --compare bench.json
+
+Provider calls go to an in-process provider stub, and the search cache's
+disk tier is disabled, so runs are repeatable on a disconnected machine.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Benchmark modules register themselves on import
+BENCHMARK_MODULES = ['benchmarks.bench_pipelines', 'benchmarks.bench_extraction']
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def configure_environment(stub_latency):
+    """Point Config at a local provider stub; must run before `config` is imported"""
+    from benchmarks.provider_stub import LatencyModel, StubSettings, provider_env, start_in_thread
+
+    server, base_url = start_in_thread(StubSettings(latency={'*': LatencyModel(stub_latency)}))
+    os.environ.update(provider_env(base_url))
+    os.environ['SEARCH_CACHE_PATH'] = ''
+    os.environ.setdefault('DATABASE_URL', 'sqlite://')
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the travel_agent benchmark suite')
+    parser.add_argument('--output', help='write JSON results to this file (default: stdout)')
+    parser.add_argument('--only', action='append', help='run benchmarks whose name starts with this prefix')
+    parser.add_argument('--sizes', default='10,1000,100000', help='input sizes for size-parametrised benchmarks')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per timing sample')
+    parser.add_argument('--stub-latency', default='fixed:0', help='provider stub latency spec')
+    parser.add_argument('--compare', help='earlier JSON results to compare against')
+    parser.add_argument('--list', action='store_true', help='list benchmarks and exit')
+    parser.add_argument('--no-imports', action='store_true', help='skip the startup import report')
+    args = parser.parse_args(argv)
+
+    server = configure_environment(args.stub_latency)
+
+    import importlib
+    from benchmarks import harness, import_report
+    for module in BENCHMARK_MODULES:
+        importlib.import_module(module)
+
+    names = sorted(harness.BENCHMARKS)
+    if args.only:
+        names = [name for name in names if any(name.startswith(prefix) for prefix in args.only)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    context = harness.Context(
+        sizes=[int(size) for size in args.sizes.split(',')],
+        repeat=args.repeat,
+        min_time=args.min_time
+    )
+    log = lambda message: print(message, file=sys.stderr)
+    results = harness.run(names, context, log=log)
+    imports = None if args.no_imports else import_report.collect()
+    server.shutdown()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': context.sizes,
+            'repeat': context.repeat,
+            'stub_latency': args.stub_latency
+        },
+        'results': results
+    }
+    if imports is not None:
+        report['imports'] = imports
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for name, case, before, after, ratio, flag in harness.compare(baseline['results'], results):
+            log(f"{name} [{case}]: {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms ({ratio:.2f}x) {flag}")
+        if imports is not None:
+            for line in import_report.compare(baseline.get('imports', {}), imports):
+                log(line)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,4 +12,143 @@ class Config:
     # API Keys
     RAPIDAPI_KEY = os.getenv('RAPIDAPI_KEY')
     RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID')
-    RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET')
\ No newline at end of file
+    RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET')
+    BOOKING_COM_API_KEY = os.getenv('BOOKING_COM_API_KEY')
+    BOOKING_COM_SECRET = os.getenv('BOOKING_COM_SECRET')
+    MAKEMYTRIP_API_KEY = os.getenv('MAKEMYTRIP_API_KEY')
+    MAKEMYTRIP_SECRET = os.getenv('MAKEMYTRIP_SECRET')
+    REDBUS_API_KEY = os.getenv('REDBUS_API_KEY')
+    REDBUS_API_SECRET = os.getenv('REDBUS_API_SECRET')
+
+    # Provider endpoints. Point these at benchmarks/provider_stub.py to run offline.
+    BOOKING_COM_BASE_URL = os.getenv('BOOKING_COM_BASE_URL', 'https://distribution-xml.booking.com/json')
+    MAKEMYTRIP_BASE_URL = os.getenv('MAKEMYTRIP_BASE_URL', 'https://api.makemytrip.com')
+    REDBUS_BASE_URL = os.getenv('REDBUS_BASE_URL', 'https://api.redbus.in/v2')
+    RAZORPAY_BASE_URL = os.getenv('RAZORPAY_BASE_URL', 'https://api.razorpay.com/v1')
+
+    # Hotel search fan-out: each provider gets its own deadline (seconds)
+    BOOKING_COM_TIMEOUT = float(os.getenv('BOOKING_COM_TIMEOUT', '5'))
+    MAKEMYTRIP_TIMEOUT = float(os.getenv('MAKEMYTRIP_TIMEOUT', '5'))
+    HOTEL_SEARCH_WORKERS = int(os.getenv('HOTEL_SEARCH_WORKERS', '16'))
+
+    # Bus fare comparison fan-out (seconds). QUORUM=0 waits for every provider.
+    FARE_PROVIDER_TIMEOUT = float(os.getenv('FARE_PROVIDER_TIMEOUT', '25'))
+    FARE_COMPARISON_DEADLINE = float(os.getenv('FARE_COMPARISON_DEADLINE', '30'))
+    FARE_COMPARISON_QUORUM = int(os.getenv('FARE_COMPARISON_QUORUM', '0'))
+    FARE_COMPARISON_WORKERS = int(os.getenv('FARE_COMPARISON_WORKERS', '8'))
+
+    # Search result cache: in-process LRU backed by a SQLite file shared by all workers
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '1024'))
+    SEARCH_CACHE_PATH = os.getenv(
+        'SEARCH_CACHE_PATH',
+        os.path.join(tempfile.gettempdir(), 'travel_agent_search_cache.sqlite3')
+    )
+    SEARCH_CACHE_STALE_SECONDS = int(os.getenv('SEARCH_CACHE_STALE_SECONDS', '600'))
+    SEARCH_CACHE_TTLS = {
+        'booking.com': int(os.getenv('BOOKING_COM_CACHE_TTL', '300')),
+        'makemytrip': int(os.getenv('MAKEMYTRIP_CACHE_TTL', '300')),
+        'redbus': int(os.getenv('REDBUS_CACHE_TTL', '120'))
+    }
+
+    # Pooled HTTP client shared by the provider integrations
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '20'))
+    HTTP_HOST_POOL_SIZES = os.getenv('HTTP_HOST_POOL_SIZES', '')  # e.g. "api.redbus.in=40"
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+    HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '0.2'))
+    HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', '2'))
+
+    # RedBus city list kept in memory for city id lookups and autocomplete
+    CITY_CATALOG_REFRESH_SECONDS = int(os.getenv('CITY_CATALOG_REFRESH_SECONDS', '21600'))
+    CITY_CATALOG_FUZZY_CUTOFF = float(os.getenv('CITY_CATALOG_FUZZY_CUTOFF', '0.8'))
+
+    # Decoded bus seat maps; short-lived because seats sell quickly
+    SEAT_LAYOUT_TTL = int(os.getenv('SEAT_LAYOUT_TTL', '30'))
+    SEAT_LAYOUT_CACHE_MAX_ENTRIES = int(os.getenv('SEAT_LAYOUT_CACHE_MAX_ENTRIES', '2048'))
+
+    # Booking status reconciliation (flask reconcile-bookings)
+    RECONCILE_BATCH_SIZE = int(os.getenv('RECONCILE_BATCH_SIZE', '500'))
+    RECONCILE_WORKERS = int(os.getenv('RECONCILE_WORKERS', '16'))
+
+    # Price watches share one scheduler; at most PRICE_WATCH_WORKERS scrape at once
+    PRICE_WATCH_WORKERS = int(os.getenv('PRICE_WATCH_WORKERS', '4'))
+    PRICE_WATCH_INTERVAL = float(os.getenv('PRICE_WATCH_INTERVAL', '3600'))
+    # Adaptive check intervals (seconds): volatile routes, prices near a
+    # threshold and close travel dates are checked sooner, flat routes later
+    PRICE_WATCH_MIN_INTERVAL = float(os.getenv('PRICE_WATCH_MIN_INTERVAL', '300'))
+    PRICE_WATCH_MAX_INTERVAL = float(os.getenv('PRICE_WATCH_MAX_INTERVAL', '21600'))
+    PRICE_WATCH_VOLATILITY_ALPHA = float(os.getenv('PRICE_WATCH_VOLATILITY_ALPHA', '0.3'))
+    PRICE_WATCH_URGENT_DAYS = float(os.getenv('PRICE_WATCH_URGENT_DAYS', '7'))
+    # Scrapes per hour across all watches; 0 for no limit
+    PRICE_WATCH_HOURLY_BUDGET = int(os.getenv('PRICE_WATCH_HOURLY_BUDGET', '0'))
+
+    # Price history: columnar segments under PRICE_HISTORY_PATH ('' keeps them
+    # in memory). Raw rows are rolled up hourly after RAW_HOURS, daily after HOURLY_DAYS.
+    PRICE_HISTORY_PATH = os.getenv(
+        'PRICE_HISTORY_PATH',
+        os.path.join(tempfile.gettempdir(), 'travel_agent_price_history')
+    )
+    PRICE_HISTORY_SEGMENT_ROWS = int(os.getenv('PRICE_HISTORY_SEGMENT_ROWS', '65536'))
+    # Buffered rows reach disk (and compaction runs) at least this often
+    PRICE_HISTORY_SEAL_SECONDS = int(os.getenv('PRICE_HISTORY_SEAL_SECONDS', '300'))
+    PRICE_HISTORY_RAW_HOURS = int(os.getenv('PRICE_HISTORY_RAW_HOURS', '48'))
+    PRICE_HISTORY_HOURLY_DAYS = int(os.getenv('PRICE_HISTORY_HOURLY_DAYS', '30'))
+    PRICE_HISTORY_MAX_SEGMENTS = int(os.getenv('PRICE_HISTORY_MAX_SEGMENTS', '16'))
+
+    # Pooled headless Chrome for BookingAutomation
+    WEBDRIVER_POOL_SIZE = int(os.getenv('WEBDRIVER_POOL_SIZE', '4'))
+    WEBDRIVER_CHECKOUT_TIMEOUT = float(os.getenv('WEBDRIVER_CHECKOUT_TIMEOUT', '30'))
+    WEBDRIVER_MAX_PAGES = int(os.getenv('WEBDRIVER_MAX_PAGES', '50'))
+    WEBDRIVER_MAX_HEAP_MB = int(os.getenv('WEBDRIVER_MAX_HEAP_MB', '512'))
+    # WEBDRIVER_PREWARM=1 starts the pool's drivers in the background from create_app
+    WEBDRIVER_PREWARM = os.getenv('WEBDRIVER_PREWARM', '0') == '1'
+    # Lean profile for headless scraping: eager page loads, no images, a fixed
+    # viewport, and requests matching WEBDRIVER_BLOCKED_URLS blocked via DevTools
+    WEBDRIVER_LEAN = os.getenv('WEBDRIVER_LEAN', '1') == '1'
+    WEBDRIVER_WINDOW_SIZE = os.getenv('WEBDRIVER_WINDOW_SIZE', '1280,800')
+    WEBDRIVER_BLOCKED_URLS = os.getenv(
+        'WEBDRIVER_BLOCKED_URLS',
+        '*.png,*.jpg,*.jpeg,*.gif,*.webp,*.avif,*.svg,*.ico,*.woff,*.woff2,*.ttf,*.otf,*.mp4,*.webm,'
+        '*doubleclick.net*,*googlesyndication.com*,*google-analytics.com*,*googletagmanager.com*,'
+        '*facebook.net*,*hotjar.com*,*clarity.ms*'
+    )
+
+    # Scraper page waits (seconds)
+    SCRAPE_WAIT_TIMEOUT = float(os.getenv('SCRAPE_WAIT_TIMEOUT', '20'))
+    SCRAPE_POLL_INTERVAL = float(os.getenv('SCRAPE_POLL_INTERVAL', '0.1'))
+    SCRAPE_SETTLE_SECONDS = float(os.getenv('SCRAPE_SETTLE_SECONDS', '0.5'))
+    SCRAPE_NETWORK_IDLE_SECONDS = float(os.getenv('SCRAPE_NETWORK_IDLE_SECONDS', '0.5'))
+    # Network idle is a short extra check after results settle ('0' skips it);
+    # requests to these URLs ('*' wildcards) never count as activity
+    SCRAPE_NETWORK_IDLE_TIMEOUT = float(os.getenv('SCRAPE_NETWORK_IDLE_TIMEOUT', '3'))
+    SCRAPE_IDLE_IGNORED_URLS = os.getenv(
+        'SCRAPE_IDLE_IGNORED_URLS',
+        '*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*facebook.net*,'
+        '*hotjar.com*,*clarity.ms*,*/collect?*,*/beacon*,*/socket.io/*'
+    )
+
+    # Sites the scraper visits; point these at benchmarks/provider_stub.py too
+    REDBUS_WEB_URL = os.getenv('REDBUS_WEB_URL', 'https://www.redbus.in')
+    BOOKING_COM_WEB_URL = os.getenv('BOOKING_COM_WEB_URL', 'https://www.booking.com')
+    # Per-site scrape strategy, e.g. 'redbus=http,booking.com=http'; sites not
+    # listed use the browser. 'http' fetches the search page with one GET and
+    # only starts a browser when that parses empty.
+    SCRAPE_STRATEGIES = os.getenv('SCRAPE_STRATEGIES', '')
+
+    # Hotel result pages: first page is ranked with a top-k heap, later pages
+    # come from the cached result set via an opaque cursor
+    HOTEL_PAGE_SIZE = int(os.getenv('HOTEL_PAGE_SIZE', '20'))
+    HOTEL_MAX_PAGE_SIZE = int(os.getenv('HOTEL_MAX_PAGE_SIZE', '100'))
+    HOTEL_RESULT_SET_TTL = int(os.getenv('HOTEL_RESULT_SET_TTL', '600'))
+
+    # spaCy model shared by every prompt extractor; NLP_PREWARM=1 loads it in create_app
+    SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
+    SPACY_EXCLUDED_PIPES = ['parser', 'lemmatizer']
+    NLP_PREWARM = os.getenv('NLP_PREWARM', '0') == '1'
+    # Bulk prompt parsing (SmartSearch.parse_requirements_batch)
+    NLP_BATCH_SIZE = int(os.getenv('NLP_BATCH_SIZE', '256'))
+    NLP_N_PROCESS = int(os.getenv('NLP_N_PROCESS', '1'))
+
+    # Parsed prompts memoized per process, keyed on the normalized prompt
+    REQUIREMENTS_CACHE_MAX_ENTRIES = int(os.getenv('REQUIREMENTS_CACHE_MAX_ENTRIES', '4096'))
@@ -0,0 +1,71 @@
+"""
+Add indexed booking.booking_reference and booking.provider columns and
+backfill them from booking_details. Safe to run more than once.
+
+    python -m migrations.add_booking_reference_columns
+"""
+import json
+from sqlalchemy import inspect, text
+from app import create_app, db
+
+BATCH_SIZE = 1000
+
+# booking_type -> provider, for rows whose details don't name a source
+PROVIDER_BY_TYPE = {
+    'bus': 'redbus',
+    'transport': 'redbus'
+}
+
+def add_columns(conn):
+    existing = {column['name'] for column in inspect(conn).get_columns('booking')}
+    if 'booking_reference' not in existing:
+        conn.execute(text('ALTER TABLE booking ADD COLUMN booking_reference VARCHAR(64)'))
+    if 'provider' not in existing:
+        conn.execute(text('ALTER TABLE booking ADD COLUMN provider VARCHAR(32)'))
+    # Same names SQLAlchemy gives index=True columns, so create_all() agrees
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_booking_booking_reference ON booking (booking_reference)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_booking_provider ON booking (provider)'))
+
+def backfill_values(booking_type, details):
+    if isinstance(details, str):
+        details = json.loads(details or '{}')
+    details = details or {}
+    reference = details.get('booking_reference')
+    provider = details.get('source') or PROVIDER_BY_TYPE.get(booking_type)
+    return reference, provider
+
+def backfill(engine):
+    """Fill the new columns in id order, one transaction per batch"""
+    last_id, updated = 0, 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                'SELECT id, booking_type, booking_details FROM booking '
+                'WHERE id > :last_id AND booking_reference IS NULL '
+                'ORDER BY id LIMIT :limit'
+            ), {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+            if not rows:
+                return updated
+            last_id = rows[-1][0]
+
+            params = []
+            for booking_id, booking_type, details in rows:
+                reference, provider = backfill_values(booking_type, details)
+                if reference:
+                    params.append({'id': booking_id, 'reference': str(reference), 'provider': provider})
+            if params:
+                conn.execute(text(
+                    'UPDATE booking SET booking_reference = :reference, provider = :provider WHERE id = :id'
+                ), params)
+                updated += len(params)
+
+def main():
+    app = create_app()
+    with app.app_context():
+        with db.engine.begin() as conn:
+            add_columns(conn)
+        updated = backfill(db.engine)
+    print(f"Backfilled booking_reference/provider on {updated} bookings")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import pytest
+
+from app import create_app
+from app.db import db
+from app.models import Booking, User
+from app.services import booking_reconciliation
+from app.services.booking_reconciliation import BookingReconciler, reconcile_bookings
+
+PROVIDER_STATUSES = {
+    'RB1': {'status': 'CONFIRMED', 'ticketNumber': 'T1', 'pnr': 'P1'},
+    'RB2': {'status': 'PENDING'},
+    'RB4': {'status': 'CANCELLED'},
+    'RB5': {'status': 'CONFIRMED', 'ticketNumber': 'T5', 'pnr': 'P5'}
+}
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI='sqlite://')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def fetched(monkeypatch):
+    fetched = []
+
+    def fetch_status(reference):
+        fetched.append(reference)
+        if reference not in PROVIDER_STATUSES:
+            raise RuntimeError('HTTP 503')
+        return PROVIDER_STATUSES[reference]
+
+    def merge_details(details, status_data):
+        return dict(details or {}, pnr=status_data.get('pnr'))
+
+    monkeypatch.setattr(booking_reconciliation, 'STATUS_FETCHERS', {'redbus': lambda: (fetch_status, merge_details)})
+    return fetched
+
+def _booking(user, reference, status='PENDING', provider='redbus'):
+    booking = Booking(user_id=user.id, booking_type='transport', status=status, provider=provider,
+                      booking_reference=reference, booking_details={'pnr': None} if reference else {})
+    db.session.add(booking)
+    return booking
+
+def test_reconciles_open_bookings_in_batches(app, fetched, monkeypatch):
+    user = User(username='asha', email='asha@example.com')
+    db.session.add(user)
+    db.session.flush()
+    for reference in ('RB1', 'RB2', 'RB3', 'RB4', 'RB5'):
+        _booking(user, reference)
+    _booking(user, 'RB6', status='CONFIRMED')
+    _booking(user, 'MMT1', provider='makemytrip')
+    _booking(user, None)
+    db.session.commit()
+
+    batches = []
+    commits = []
+    next_batch = BookingReconciler._next_batch
+    monkeypatch.setattr(BookingReconciler, '_next_batch',
+                        lambda self, last_id: batches.append(next_batch(self, last_id)) or batches[-1])
+    commit = db.session.commit
+    monkeypatch.setattr(db.session, 'commit', lambda: commits.append(1) or commit())
+
+    summary = reconcile_bookings(batch_size=2, workers=2)
+
+    assert summary == {'checked': 5, 'updated': 3, 'errors': 1}
+    assert [[row.booking_reference for row in batch] for batch in batches] == [
+        ['RB1', 'RB2'], ['RB3', 'RB4'], ['RB5'], []
+    ]
+    # One commit per batch with changes; RB2 is unchanged and RB3's lookup failed
+    assert len(commits) == 3
+    assert sorted(fetched) == ['RB1', 'RB2', 'RB3', 'RB4', 'RB5']
+
+    statuses = {booking.booking_reference: (booking.status, booking.booking_details)
+                for booking in Booking.query.all()}
+    assert statuses['RB1'] == ('CONFIRMED', {'pnr': 'P1'})
+    assert statuses['RB2'] == ('PENDING', {'pnr': None})
+    assert statuses['RB3'] == ('PENDING', {'pnr': None})
+    assert statuses['RB4'] == ('CANCELLED', {'pnr': None})
+    assert statuses['RB5'] == ('CONFIRMED', {'pnr': 'P5'})
@@ -0,0 +1,52 @@
+from app.services.city_catalog import CityCatalog
+
+CITIES = [
+    {'id': 122, 'name': 'Bengaluru'},
+    {'id': 130, 'name': 'Pune', 'aliases': ['Poona']},
+    {'id': 462, 'name': 'Mumbai'},
+    {'id': 624, 'name': 'Goa'},
+    {'id': 71, 'name': 'Panaji', 'aliases': ['Panjim']},
+    {'id': 1300, 'name': 'Puducherry'}
+]
+
+def _catalog(cities=CITIES):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return cities
+
+    catalog = CityCatalog(loader=loader, refresh_seconds=3600, fuzzy_cutoff=0.8)
+    return catalog, calls
+
+def test_exact_alias_and_accent_insensitive_lookups():
+    catalog, calls = _catalog()
+    assert catalog.resolve('Pune') == 130
+    assert catalog.resolve('  POONA ') == 130
+    assert catalog.resolve('Bangalore') == 122
+    assert catalog.resolve('Bombay') == 462
+    assert catalog.resolve('Pondicherry') == 1300
+    assert catalog.resolve('Pañaji') == 71
+    assert calls == [1]
+
+def test_typos_resolve_fuzzily_and_unknown_cities_miss():
+    catalog, _ = _catalog()
+    assert catalog.resolve('Bengalruu') == 122
+    assert catalog.resolve('Atlantis') is None
+    assert catalog.counters['fuzzy_hits'] == 1
+    assert catalog.counters['misses'] == 1
+
+def test_autocomplete_lists_each_city_once():
+    catalog, _ = _catalog()
+    assert catalog.autocomplete('pu') == [{'id': 1300, 'name': 'Puducherry'}, {'id': 130, 'name': 'Pune'}]
+    assert catalog.autocomplete('pan', limit=1) == [{'id': 71, 'name': 'Panaji'}]
+    assert catalog.autocomplete('') == []
+
+def test_failed_download_is_not_retried_on_every_lookup():
+    def failing():
+        raise RuntimeError('HTTP 503')
+
+    catalog = CityCatalog(loader=failing)
+    assert catalog.resolve('Pune') is None
+    assert catalog.resolve('Goa') is None
+    assert catalog.counters['refresh_errors'] == 1
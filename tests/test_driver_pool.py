@@ -0,0 +1,75 @@
+from app.services.driver_pool import DriverPool
+
+class RecordingDriver:
+    """Stands in for a Chrome WebDriver, recording DevTools commands"""
+
+    def __init__(self, devtools=True):
+        self.devtools = devtools
+        self.cdp = []
+        self.scripts = []
+        self.current_url = 'about:blank'
+
+    def execute_cdp_cmd(self, command, params):
+        if not self.devtools:
+            raise RuntimeError('DevTools unavailable')
+        self.cdp.append((command, params))
+        return {}
+
+    def execute_script(self, script):
+        self.scripts.append(script)
+        return 0
+
+    def get(self, url):
+        self.current_url = url
+
+    def get_log(self, kind):
+        return []
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        pass
+
+def _pool(driver):
+    return DriverPool(size=1, lean=False, options_factory=lambda: None, driver_factory=lambda options: driver)
+
+def _cleared(driver):
+    return {params['origin'] for command, params in driver.cdp if command == 'Storage.clearDataForOrigin'}
+
+def test_checkin_clears_storage_and_cache_for_every_origin_visited():
+    driver = RecordingDriver()
+    pool = _pool(driver)
+    pooled = pool.checkout()
+    pooled.get('https://www.redbus.in/search?fromCityName=Pune')
+    pooled.get('https://www.makemytrip.com/hotels/goa')
+    # Reached by clicking through, not by get()
+    driver.current_url = 'https://secure.payu.in/checkout/123'
+    pool.checkin(pooled)
+
+    assert _cleared(driver) == {
+        'https://www.redbus.in', 'https://www.booking.com',
+        'https://www.makemytrip.com', 'https://secure.payu.in'
+    }
+    assert ('Network.clearBrowserCookies', {}) in driver.cdp
+    assert ('Network.clearBrowserCache', {}) in driver.cdp
+    assert pool.stats()['idle'] == 1
+
+def test_origins_are_forgotten_once_cleared():
+    driver = RecordingDriver()
+    pool = _pool(driver)
+    pooled = pool.checkout()
+    pooled.get('https://www.makemytrip.com/hotels/goa')
+    pool.checkin(pooled)
+    driver.cdp.clear()
+
+    pool.checkin(pool.checkout())
+    assert _cleared(driver) == {'https://www.redbus.in', 'https://www.booking.com'}
+
+def test_checkin_without_devtools_falls_back_to_page_storage():
+    driver = RecordingDriver(devtools=False)
+    pool = _pool(driver)
+    pool.checkin(pool.checkout())
+
+    assert any('localStorage.clear()' in script for script in driver.scripts)
+    assert pool.stats()['idle'] == 1
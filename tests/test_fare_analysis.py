@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from app.services.fare_analysis import analyze, duration_hours
+
+def _analyze_fares_before(fares):
+    """FareComparison.analyze_fares and its helpers as they were before the columnar rewrite"""
+    all_fares = []
+    for provider, provider_fares in fares.items():
+        for fare in provider_fares:
+            all_fares.append({
+                'provider': provider,
+                'amount': fare['amount'],
+                'departure': fare['departure'],
+                'duration': fare['duration'],
+                'rating': fare.get('rating', 'N/A')
+            })
+    comparison = {}
+    for provider, provider_fares in fares.items():
+        comparison[provider] = {
+            'average_fare': sum(fare['amount'] for fare in provider_fares) / len(provider_fares),
+            'min_fare': min(fare['amount'] for fare in provider_fares),
+            'max_fare': max(fare['amount'] for fare in provider_fares),
+            'total_options': len(provider_fares)
+        }
+    return {
+        'lowest_fare': min(fare['amount'] for provider in fares.values() for fare in provider),
+        'highest_fare': max(fare['amount'] for provider in fares.values() for fare in provider),
+        'average_fare': sum(fare['amount'] for provider in fares.values() for fare in provider) /
+                        sum(len(provider) for provider in fares.values()),
+        'best_deals': sorted(all_fares, key=lambda x: x['amount'])[:3],
+        'provider_comparison': comparison
+    }
+
+def _fares(seed, providers=('redbus', 'redbus_api', 'abhibus'), per_provider=40):
+    rnd = random.Random(seed)
+    return {
+        provider: [{
+            # Coarse amounts so the cheapest fares tie across providers
+            'amount': float(rnd.randrange(500, 3000, 50)),
+            'departure': f"{rnd.randint(0, 23):02d}:{rnd.choice([0, 30]):02d}",
+            'duration': rnd.choice(['8h 30m', '10h', '45m', '07:15', 'N/A', None]),
+            'rating': rnd.choice([4.2, '3.9', 'N/A', None])
+        } for _ in range(rnd.randint(1, per_provider))]
+        for provider in providers
+    }
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_the_original_analysis(seed):
+    fares = _fares(seed)
+    before = _analyze_fares_before(fares)
+    after = analyze(fares)
+
+    assert after['lowest_fare'] == before['lowest_fare']
+    assert after['highest_fare'] == before['highest_fare']
+    assert after['average_fare'] == pytest.approx(before['average_fare'])
+    # Ties keep input order, as the stable sort did
+    assert after['best_deals'] == before['best_deals']
+    assert list(after['provider_comparison']) == list(before['provider_comparison'])
+    for provider, expected in before['provider_comparison'].items():
+        actual = after['provider_comparison'][provider]
+        assert actual['average_fare'] == pytest.approx(expected['average_fare'])
+        assert (actual['min_fare'], actual['max_fare'], actual['total_options']) == (
+            expected['min_fare'], expected['max_fare'], expected['total_options']
+        )
+
+def test_price_per_hour_skips_fares_without_a_duration():
+    fares = {'redbus': [
+        {'amount': 900.0, 'departure': '21:00', 'duration': '9h', 'rating': 4.0},
+        {'amount': 800.0, 'departure': '22:00', 'duration': None, 'rating': 'N/A'},
+        {'amount': 1000.0, 'departure': '23:00', 'duration': '08:00', 'rating': '3.0'}
+    ]}
+    analysis = analyze(fares)
+    assert analysis['price_per_hour']['min'] == pytest.approx(100.0)
+    assert analysis['price_per_hour']['average'] == pytest.approx(112.5)
+    assert analysis['average_rating'] == pytest.approx(3.5)
+    assert analysis['provider_comparison']['redbus']['median_fare'] == 900.0
+
+def test_duration_formats():
+    assert duration_hours('8h 30m') == 8.5
+    assert duration_hours('45m') == 0.75
+    assert duration_hours('07:15') == 7.25
+    assert duration_hours(6) == 6.0
+    assert duration_hours('soon') != duration_hours('soon')
+
+def test_no_fares_is_an_error():
+    with pytest.raises(ValueError):
+        analyze({'redbus': []})
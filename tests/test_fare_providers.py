@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from app.services import fare_providers
+from app.services.fare_providers import FARE_PROVIDERS, FareProvider, collect_fares
+
+class StaticProvider(FareProvider):
+    def __init__(self, name, fares=(), delay=0, error=None):
+        self.name = name
+        self.fares = list(fares)
+        self.delay = delay
+        self.error = error
+
+    def fetch(self, source, destination, date):
+        threading.Event().wait(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return self.fares
+
+def _fare(amount):
+    return {'amount': amount, 'departure': '21:00', 'duration': '8h', 'rating': 4.1}
+
+def test_every_run_compares_more_than_one_source():
+    assert {'redbus', 'redbus_api'} <= set(FARE_PROVIDERS)
+
+def test_providers_must_implement_fetch():
+    class Incomplete(FareProvider):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_quorum_returns_without_waiting_for_slow_providers():
+    providers = [
+        StaticProvider('fast', [_fare(900)]),
+        StaticProvider('failing', error='blocked'),
+        StaticProvider('slow', [_fare(800)], delay=5)
+    ]
+    fares, status = collect_fares('Pune', 'Goa', '2026-12-01', providers=providers, quorum=1, deadline=3)
+
+    assert list(fares) == ['fast']
+    assert status['slow'] == {'status': 'pending'}
+
+def test_deadline_times_out_providers_that_never_answer():
+    providers = [StaticProvider('fast', [_fare(900)]), StaticProvider('slow', [_fare(800)], delay=5)]
+    fares, status = collect_fares('Pune', 'Goa', '2026-12-01', providers=providers, deadline=0.2)
+
+    assert list(fares) == ['fast']
+    assert status['fast']['status'] == 'ok'
+    assert status['slow']['status'] == 'timeout'
+
+def test_api_provider_fails_fast_without_credentials(monkeypatch):
+    monkeypatch.setattr(fare_providers.Config, 'REDBUS_API_KEY', None)
+    fares, status = collect_fares('Pune', 'Goa', '2026-12-01', providers=[FARE_PROVIDERS['redbus_api']])
+
+    assert fares == {}
+    assert status['redbus_api']['status'] == 'error'
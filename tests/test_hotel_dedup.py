@@ -0,0 +1,41 @@
+from app.services.hotel_dedup import deduplicate_hotels
+
+def _hotel(source, hotel_id, name, lat=None, lon=None, amount=3000):
+    return {
+        'source': source,
+        'hotel_id': hotel_id,
+        'name': name,
+        'price': {'amount': amount, 'currency': 'INR'},
+        'location': {'latitude': lat, 'longitude': lon}
+    }
+
+def test_same_property_across_providers_merges():
+    merged = deduplicate_hotels([
+        _hotel('booking.com', 1, 'The Sea View Resort', 15.5010, 73.8120, amount=4200),
+        _hotel('makemytrip', 'a', 'Sea View Resort', 15.5012, 73.8118, amount=3900)
+    ])
+    assert len(merged) == 1
+    assert merged[0]['sources'] == ['makemytrip', 'booking.com']
+
+def test_listings_without_name_or_coordinates_never_merge():
+    hotels = [
+        _hotel('booking.com', 1, None),
+        _hotel('makemytrip', 'a', ''),
+        _hotel('booking.com', 2, 'Hotel', 15.5, 73.8),
+        _hotel('makemytrip', 'b', None, 15.5, 73.8),
+        _hotel('booking.com', 3, 'Sea View Resort'),
+        _hotel('makemytrip', 'c', 'Sea View Resort')
+    ]
+    merged = deduplicate_hotels(hotels)
+    assert len(merged) == len(hotels)
+    assert all(len(hotel['offers']) == 1 for hotel in merged)
+
+def test_cheapest_offer_wins_when_amounts_mix_strings_and_numbers():
+    merged = deduplicate_hotels([
+        _hotel('booking.com', 1, 'Sea View Resort', 15.5010, 73.8120, amount='10500'),
+        _hotel('makemytrip', 'a', 'Sea View Resort', 15.5012, 73.8118, amount=9800.0),
+        _hotel('agoda', 'x', 'Sea View Resort', 15.5011, 73.8119, amount='n/a')
+    ])
+    assert len(merged) == 1
+    assert merged[0]['source'] == 'makemytrip'
+    assert merged[0]['sources'] == ['makemytrip', 'booking.com', 'agoda']
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from app.services import hotel_service
+from app.services.hotel_service import HotelService
+from app.services.search_cache import SearchCache
+
+PARAMS = {'location': 'goa', 'check_in': '2026-12-01', 'check_out': '2026-12-04', 'guests': 2, 'rooms': 1}
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    cache = SearchCache(max_entries=64, db_path=str(tmp_path / 'search_cache.sqlite3'), ttls={})
+    monkeypatch.setattr(hotel_service, 'search_cache', cache)
+    return cache
+
+@pytest.fixture
+def release():
+    # Lets providers stuck past their deadline finish once the test is done
+    release = threading.Event()
+    yield release
+    release.set()
+
+def _service(providers, timeouts):
+    service = HotelService()
+    service.providers = providers
+    service.provider_timeouts = timeouts
+    return service
+
+def test_slow_and_failing_providers_do_not_hold_up_the_rest(release):
+    def failing(params):
+        raise RuntimeError('HTTP 503')
+
+    service = _service(
+        {
+            'booking.com': lambda params: [{'name': 'Sea View Resort'}],
+            'makemytrip': lambda params: release.wait(5) and [],
+            'agoda': failing
+        },
+        {'booking.com': 1, 'makemytrip': 0.2, 'agoda': 1}
+    )
+    started = time.monotonic()
+    hotels, status = service._fan_out(dict(PARAMS))
+
+    assert time.monotonic() - started < 1
+    assert hotels == [{'name': 'Sea View Resort'}]
+    assert status['booking.com']['status'] == 'ok'
+    assert status['makemytrip'] == {'status': 'timeout', 'timeout': 0.2}
+    assert status['agoda'] == {'status': 'error', 'error': 'HTTP 503'}
+
+def test_deadlines_run_from_the_start_of_the_fan_out(release):
+    service = _service(
+        {name: lambda params: release.wait(5) and [] for name in ('booking.com', 'makemytrip', 'agoda')},
+        {'booking.com': 0.3, 'makemytrip': 0.3, 'agoda': 0.3}
+    )
+    started = time.monotonic()
+    hotels, status = service._fan_out(dict(PARAMS))
+
+    # Waited on concurrently, not one deadline after another
+    assert time.monotonic() - started < 0.6
+    assert hotels == []
+    assert {entry['status'] for entry in status.values()} == {'timeout'}
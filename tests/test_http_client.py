@@ -0,0 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.http_client import ProviderHTTPClient, parse_pool_sizes
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers 503 to the first `failures` requests, then 200"""
+
+    def _respond(self):
+        server = self.server
+        server.requests.append((self.command, self.path))
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        status = 503 if len(server.requests) <= server.failures else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    server.requests = []
+    server.failures = 0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _client(**overrides):
+    settings = dict(max_retries=2, backoff_base=0.001, backoff_max=0.01)
+    settings.update(overrides)
+    return ProviderHTTPClient(**settings)
+
+def _url(server, path='/search'):
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+def test_idempotent_calls_retry_through_transient_errors(server):
+    server.failures = 2
+    response = _client().get(_url(server))
+    assert response.status_code == 200
+    assert len(server.requests) == 3
+
+def test_retries_stop_after_max_retries(server):
+    server.failures = 10
+    assert _client(max_retries=1).get(_url(server)).status_code == 503
+    assert len(server.requests) == 2
+
+def test_posts_are_only_retried_when_marked_idempotent(server):
+    server.failures = 1
+    client = _client()
+    assert client.post(_url(server, '/booking'), json={}).status_code == 503
+    assert len(server.requests) == 1
+
+    server.requests.clear()
+    assert client.post(_url(server), json={}, idempotent=True).status_code == 200
+    assert len(server.requests) == 2
+
+def test_one_session_per_origin():
+    client = _client(pool_sizes=parse_pool_sizes('api.redbus.in=40, razorpay.com=4'))
+    assert client.session_for('https://api.redbus.in/v2/search') is client.session_for('https://api.redbus.in/v2/cities')
+    assert client.session_for('https://api.redbus.in/v2') is not client.session_for('https://api.razorpay.com/v1')
+    assert client.session_for('https://api.redbus.in/').get_adapter('https://api.redbus.in/')._pool_maxsize == 40
@@ -0,0 +1,39 @@
+import threading
+
+from app.services import nlp_runtime
+
+class BlockingPipeline:
+    """Stands in for a spaCy Language whose pipe() stalls mid-batch until released"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, text):
+        return text.upper()
+
+    def pipe(self, texts, batch_size, n_process):
+        for text in texts:
+            self.started.set()
+            self.release.wait(5)
+            yield text.upper()
+
+def test_parse_does_not_wait_behind_a_running_batch(monkeypatch):
+    interactive, bulk = BlockingPipeline(), BlockingPipeline()
+    monkeypatch.setattr(nlp_runtime, '_nlp', interactive)
+    monkeypatch.setattr(nlp_runtime, '_bulk_nlp', bulk)
+
+    docs = []
+    batch = threading.Thread(target=lambda: docs.extend(nlp_runtime.pipe(['bus to goa', 'hotel in pune'])))
+    batch.start()
+    assert bulk.started.wait(5)
+
+    parsed = []
+    single = threading.Thread(target=lambda: parsed.append(nlp_runtime.parse('train to delhi')))
+    single.start()
+    single.join(1)
+    assert parsed == ['TRAIN TO DELHI']
+
+    bulk.release.set()
+    batch.join(5)
+    assert docs == ['BUS TO GOA', 'HOTEL IN PUNE']
@@ -0,0 +1,52 @@
+import json
+
+from app.services import page_extraction
+from app.services.page_extraction import extract_cards, extract_embedded
+
+def _next_data(inventories):
+    blob = {'props': {'pageProps': {'searchResult': {'inventories': inventories}}}}
+    return f'<html><script id="__NEXT_DATA__" type="application/json">{json.dumps(blob)}</script></html>'
+
+def test_embedded_booking_urls_follow_the_configured_site(monkeypatch):
+    monkeypatch.setattr(page_extraction.Config, 'REDBUS_WEB_URL', 'http://127.0.0.1:8099/redbus-web/')
+    html = _next_data([{'id': 42, 'travelsName': 'VRL', 'fare': 900}, {'travelsName': 'SRS', 'fare': 750}])
+
+    buses = extract_embedded(html, 'redbus')
+    assert [bus['booking_url'] for bus in buses] == ['http://127.0.0.1:8099/redbus-web/bus/42', None]
+    assert buses[0]['fare'] == '900'
+
+BUS_CARDS = """
+<ul class="bus-items">
+  <li class="bus-item row-sec" data-url="https://www.redbus.in/bus/42">
+    <div class="travels lh-24 f-bold">VRL Travels</div>
+    <div class="dep-time">21:30</div><div class="dur">9h 15m</div><div class="arr-time">06:45</div>
+    <div class="rating"><span>4.3</span></div>
+    <div class="fare d-block">INR <span>1,250</span></div>
+    <div class="seat-available">12 Seats available</div>
+  </li>
+  <li class="bus-item" data-url="https://www.redbus.in/bus/43">
+    <div class="travels">SRS</div><div class="fare">INR 900</div>
+  </li>
+</ul>
+"""
+
+def test_cards_are_read_field_by_field_with_missing_fields_as_none():
+    buses = extract_cards(BUS_CARDS, 'redbus')
+    assert buses[0] == {
+        'operator': 'VRL Travels',
+        'departure': '21:30',
+        'arrival': '06:45',
+        'duration': '9h 15m',
+        'fare': 'INR 1,250',
+        'available_seats': '12 Seats available',
+        'rating': '4.3',
+        'booking_url': 'https://www.redbus.in/bus/42'
+    }
+    assert buses[1]['operator'] == 'SRS'
+    assert buses[1]['fare'] == 'INR 900'
+    assert buses[1]['departure'] is None and buses[1]['rating'] is None
+
+def test_card_limit_and_pages_without_cards():
+    assert [bus['operator'] for bus in extract_cards(BUS_CARDS, 'redbus', limit=1)] == ['VRL Travels']
+    assert extract_cards('<html><body><p>No buses found</p></body></html>', 'redbus') == []
+    assert extract_embedded('<html><body></body></html>', 'redbus') == []
@@ -0,0 +1,69 @@
+import itertools
+import json
+
+import pytest
+
+from app.services.page_waits import PageWaiter, WaitTimings
+
+def _event(method, request_id, url='https://www.redbus.in/api/search', kind='XHR'):
+    params = {'requestId': request_id}
+    if method == 'Network.requestWillBeSent':
+        params.update({'type': kind, 'request': {'url': url}})
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+class LoggingDriver:
+    """Serves one batch of DevTools performance log entries per poll"""
+
+    def __init__(self, batches):
+        self.batches = iter(batches)
+
+    def get_log(self, kind):
+        return next(self.batches, [])
+
+def _waiter(driver):
+    return PageWaiter(driver, 'redbus', poll=0.01, timings=WaitTimings())
+
+def test_open_long_poll_and_analytics_do_not_hold_off_idle():
+    beacons = (
+        [_event('Network.requestWillBeSent', f"ga-{i}", url='https://www.google-analytics.com/g/collect?v=2')]
+        for i in itertools.count()
+    )
+    first = [
+        _event('Network.requestWillBeSent', 'poll', url='https://www.redbus.in/api/updates'),
+        _event('Network.requestWillBeSent', 'ws', url='wss://www.redbus.in/live', kind='WebSocket')
+    ]
+    waiter = _waiter(LoggingDriver(itertools.chain([first], beacons)))
+
+    assert waiter.network_idle(idle=0.05, timeout=2)
+    assert waiter.timings.stats()['redbus']['network_idle']['max_s'] < 1
+
+def test_steady_requests_keep_the_page_busy_until_timeout():
+    requests = ([_event('Network.requestWillBeSent', f"xhr-{i}")] for i in itertools.count())
+    waiter = _waiter(LoggingDriver(requests))
+
+    assert not waiter.network_idle(idle=0.05, timeout=0.2)
+
+def test_zero_timeout_skips_the_check():
+    assert _waiter(LoggingDriver([])).network_idle(timeout=0)
+
+class ReadyStateDriver:
+    def __init__(self, states):
+        self.states = iter(states)
+        self.checks = 0
+
+    def execute_script(self, script):
+        self.checks += 1
+        return next(self.states, 'complete')
+
+def test_explicit_zero_timeout_checks_once():
+    driver = ReadyStateDriver(['loading'])
+    waiter = PageWaiter(driver, 'redbus', timeout=20, poll=0.01, timings=WaitTimings())
+
+    assert not waiter.dom_ready(timeout=0)
+    assert driver.checks == 1
+    assert waiter.timings.stats()['redbus']['dom_ready']['timeouts'] == 1
+
+def test_until_reports_the_timeout_it_was_given():
+    waiter = PageWaiter(ReadyStateDriver([]), 'redbus', timeout=20, poll=0.01, timings=WaitTimings())
+    with pytest.raises(TimeoutError, match='within 0s'):
+        waiter.until('never', lambda driver: False, timeout=0)
@@ -0,0 +1,79 @@
+import time
+
+from app.services.price_history import PriceHistory
+
+KEY = 'price_watch:route'
+
+def _record_every_half_hour(history, start, hours):
+    prices = []
+    for i in range(hours * 2):
+        price = 1000 + (i * 37) % 200
+        history.record(KEY, 'redbus', [price, price + 50], ts=start + i * 1800)
+        prices.append(price)
+    return prices
+
+def _total_count(history, now):
+    return int(history._select(KEY, 30, None, now, ('count',))['count'].sum())
+
+def test_rows_are_downsampled_hourly_then_daily_as_they_age(tmp_path):
+    history = PriceHistory(path=str(tmp_path), raw_hours=6, hourly_days=2, seal_seconds=3600)
+    now = int(time.time())
+    prices = _record_every_half_hour(history, now - 5 * 86400, 5 * 24)
+
+    stats = history.stats()
+    assert stats['daily']['rows'] > 0
+    assert stats['hourly']['rows'] > 0
+    # No raw row older than raw_hours survives, however few rows were recorded
+    for segment in history._segments['raw']:
+        assert segment.min_ts >= now - 7 * 3600
+    for segment in history._segments['hourly']:
+        assert segment.min_ts >= now - 3 * 86400
+    assert _total_count(history, now) == len(prices)
+    assert history.lowest(KEY, days=30, now=now) == min(prices)
+
+def test_sealed_rows_survive_without_flush(tmp_path):
+    history = PriceHistory(path=str(tmp_path), seal_seconds=600)
+    now = int(time.time())
+    prices = _record_every_half_hour(history, now - 3 * 3600, 3)
+
+    # A new store on the same path stands in for a restart after a crash
+    reopened = PriceHistory(path=str(tmp_path), seal_seconds=600)
+    sealed = history.stats()['raw']['rows']
+    assert sealed >= len(prices) - 1
+    assert _total_count(reopened, now) == sealed
+
+def test_stores_sharing_a_path_keep_each_others_rows(tmp_path):
+    # Two stores on one path stand in for two worker processes
+    first = PriceHistory(path=str(tmp_path), seal_seconds=600)
+    second = PriceHistory(path=str(tmp_path), seal_seconds=600)
+    now = int(time.time())
+    first.record('price_watch:a', 'redbus', [900], ts=now - 60)
+    second.record('price_watch:b', 'booking.com', [4000], ts=now - 60)
+    second.record('price_watch:a', 'redbus', [850], ts=now - 30)
+    first.flush()
+    second.flush()
+
+    for history in (first, second):
+        assert history.lowest('price_watch:a', now=now) == 850
+        assert history.lowest('price_watch:b', now=now) == 4000
+        assert history.lowest('price_watch:b', provider='redbus', now=now) is None
+        assert history.stats()['raw']['rows'] == 3
+
+def test_seal_timer_restarts_with_the_next_buffer():
+    history = PriceHistory(path='', segment_rows=2, seal_seconds=0.5)
+    now = int(time.time())
+    started = time.monotonic()
+    history.record(KEY, 'redbus', [900], ts=now)
+    history.record(KEY, 'redbus', [950], ts=now)  # full: sealed right away
+    time.sleep(0.3)
+    history.record(KEY, 'redbus', [875], ts=now)
+
+    # The first buffer's timer would have fired by now
+    time.sleep(max(0.0, started + 0.65 - time.monotonic()))
+    assert history.stats()['raw']['buffered'] == 1
+
+    deadline = time.monotonic() + 5
+    while history.stats()['raw']['buffered'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert history.stats()['raw']['buffered'] == 0
+    assert history.lowest(KEY, now=now) == 875
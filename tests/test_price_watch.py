@@ -0,0 +1,48 @@
+import time
+from datetime import date, timedelta
+
+from app.services.price_history import PriceHistory
+from app.services.price_watch import PriceWatchScheduler
+
+class ThresholdPolicy:
+    """Checks hourly until someone watches for a price within 10% of the last one"""
+
+    def observe(self, group, price, now):
+        group.last_price, group.checked_at = price, now
+
+    def interval(self, group, today=None):
+        return 0.05 if group.nearest_threshold() >= 0.9 * group.last_price else 3600
+
+def _scheduler(fetch, policy=None):
+    return PriceWatchScheduler(workers=1, policy=policy, fetch_prices=fetch, hourly_budget=0,
+                               history=PriceHistory(path=''))
+
+def _wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_group_past_its_travel_date_is_dropped_without_a_scrape():
+    scraped = []
+    scheduler = _scheduler(lambda params: scraped.append(params) or [1000])
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    scheduler.watch('user-1', {'source': 'Pune', 'destination': 'Goa', 'date': yesterday}, 500)
+    scheduler.watch('user-2', {'source': 'pune', 'destination': 'goa', 'date': yesterday}, 700)
+
+    assert _wait_for(lambda: scheduler.stats()['expired'] == 1)
+    assert scraped == []
+    assert not scheduler.is_watching('user-1') and not scheduler.is_watching('user-2')
+    assert scheduler.stats()['groups'] == 0
+
+def test_new_subscriber_brings_the_next_check_forward():
+    params = {'source': 'Pune', 'destination': 'Goa', 'date': (date.today() + timedelta(days=30)).isoformat()}
+    scheduler = _scheduler(lambda params: [1000], policy=ThresholdPolicy())
+    scheduler.watch('user-1', params, 500)
+    assert _wait_for(lambda: scheduler.stats()['checks'] == 1)
+
+    # The group's next check is an hour out; a threshold near the price pulls it in
+    scheduler.watch('user-2', params, 950)
+    assert _wait_for(lambda: scheduler.stats()['checks'] >= 2)
+    scheduler.cancel('user-1')
+    scheduler.cancel('user-2')
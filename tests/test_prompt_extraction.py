@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+
+from app.services import prompt_extraction
+from app.services.prompt_extraction import prompt_extractor, resolve_dates
+from app.services.requirements_cache import RequirementsCache
+
+def test_cached_fallback_dates_resolve_against_each_lookup():
+    cache = RequirementsCache(max_entries=8)
+    before_midnight = datetime(2026, 3, 10, 23, 59)
+    after_midnight = datetime(2026, 3, 11, 0, 1)
+    prompt = 'Bus to Goa 2 months from now, AC sleeper'
+
+    first = cache.get_or_parse(prompt, prompt_extractor.scan)
+    second = cache.get_or_parse(prompt, prompt_extractor.scan)
+    assert second is first
+    assert cache.counters['hits'] == 1
+
+    dates_before = resolve_dates(first['date_specs'], before_midnight)
+    dates_after = resolve_dates(second['date_specs'], after_midnight)
+    assert len(dates_before) == len(dates_after) == 1
+    assert (dates_after[0].date() - dates_before[0].date()).days == 1
+
+def test_fallback_drops_phrases_that_are_not_dates():
+    assert prompt_extractor.scan('Hotel with 3 balconies')['date_specs'] == []
+
+# (preferences, budget, transport_type) as the original per-field
+# SmartSearch.extract_* regexes returned them for each prompt
+BASELINE = [
+    ('2 AC sleeper bus to Pune', (['AC', 'Sleeper'], None, 'bus')),
+    ('hotel for 2 under 3000', ([], 3000.0, None)),
+    ('need 4 sleeper seats on bus', (['Sleeper'], None, 'bus')),
+    ('Rs 500 for 2 AC tickets', (['AC'], 500.0, None)),
+    ('2 bus tickets', ([], None, 'bus')),
+    ('4 star hotel in Goa for 2 nights budget 5000', (['Rating'], 5000.0, None))
+]
+
+@pytest.mark.parametrize('prompt, expected', BASELINE)
+def test_numbers_before_words_keep_the_baseline_fields(prompt, expected, monkeypatch):
+    parsed = []
+    monkeypatch.setattr(prompt_extraction, '_fallback_parse', lambda text, now=None: parsed.append(text))
+    result = prompt_extractor.extract(prompt)
+    assert (result['preferences'], result['budget'], result['transport_type']) == expected
+    assert result['dates'] == []
+    # None of these words can start a date, so dateparser is never asked
+    assert parsed == []
+
+def test_day_month_dates_still_read_on_the_fast_path():
+    result = prompt_extractor.extract('train to Delhi 15 Aug window seat', now=datetime(2026, 3, 1))
+    assert result['dates'] == [datetime(2026, 8, 15)]
+    assert result['preferences'] == ['Window Seat']
+    assert result['transport_type'] == 'train'
@@ -0,0 +1,15 @@
+from app.services.requirements_cache import RequirementsCache
+
+def test_only_whitespace_is_folded_into_one_entry():
+    cache = RequirementsCache(max_entries=8)
+    parsed = []
+
+    def parse(prompt):
+        parsed.append(prompt)
+        return {'prompt': prompt}
+
+    for prompt in ['bus to Pune', '  bus   to Pune ', 'bus to pune', '4.5 star hotel', '4 5 star hotel']:
+        cache.get_or_parse(prompt, parse)
+
+    assert parsed == ['bus to Pune', 'bus to pune', '4.5 star hotel', '4 5 star hotel']
+    assert cache.counters['hits'] == 1
@@ -0,0 +1,68 @@
+import pytest
+
+from app.services.hotel_service import HOTEL_SEARCH_FIELDS, HotelService
+from app.services.result_pages import decode_cursor, encode_cursor
+
+PARAMS = {'location': 'goa', 'check_in': '2026-12-01', 'check_out': '2026-12-04', 'guests': 2, 'rooms': 1}
+
+def _cursor(**overrides):
+    state = {'params': dict(PARAMS), 'sort_by': 'price', 'offset': 20, 'page_size': 20}
+    state.update(overrides)
+    return encode_cursor(state)
+
+def test_round_trips_a_valid_cursor():
+    state = decode_cursor(_cursor(), HOTEL_SEARCH_FIELDS, 100)
+    assert state['offset'] == 20
+    assert state['params'] == PARAMS
+
+@pytest.mark.parametrize('overrides', [
+    {'offset': -1},
+    {'offset': '20'},
+    {'offset': True},
+    {'page_size': 0},
+    {'page_size': 101},
+    {'page_size': 2.5},
+    {'params': ['goa']},
+    {'params': dict(PARAMS, source='delhi')},
+    {'params': dict(PARAMS, location={'$ne': None})},
+    {'sort_by': 'name'}
+])
+def test_rejects_tampered_cursors(overrides):
+    with pytest.raises(ValueError):
+        decode_cursor(_cursor(**overrides), HOTEL_SEARCH_FIELDS, 100)
+
+@pytest.mark.parametrize('missing', ['offset', 'page_size', 'params'])
+def test_rejects_cursors_missing_a_field(missing):
+    state = {'params': dict(PARAMS), 'sort_by': 'price', 'offset': 20, 'page_size': 20}
+    del state[missing]
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(state), HOTEL_SEARCH_FIELDS, 100)
+
+def test_tampered_cursor_never_reaches_providers():
+    searched = []
+    service = HotelService()
+    service.providers = {name: searched.append for name in service.providers}
+    with pytest.raises(ValueError):
+        service.get_results_page(_cursor(params=dict(PARAMS, source='delhi', destination='goa')))
+    assert searched == []
+
+def _hotel(name, lat, lon):
+    return {'name': name, 'price': {'amount': 1000}, 'location': {'latitude': lat, 'longitude': lon}}
+
+def test_distance_sort_needs_an_origin():
+    service = HotelService()
+    service._fan_out = lambda params: pytest.fail('searched without an origin')
+    with pytest.raises(ValueError):
+        service.search_hotels_by_params(dict(PARAMS), sort_by='distance')
+    with pytest.raises(ValueError):
+        decode_cursor(_cursor(sort_by='distance'), HOTEL_SEARCH_FIELDS, 100)
+
+def test_rebuilt_result_set_pages_by_distance_from_origin():
+    hotels = [_hotel('far', 15.6, 73.9), _hotel('near', 15.5, 73.8), _hotel('mid', 15.55, 73.85)]
+    service = HotelService()
+    service._fan_out = lambda params: (list(hotels), {})
+    params = dict(PARAMS, location='rebuilt-by-distance', origin=[15.49, 73.79])
+
+    page = service.get_results_page(_cursor(params=params, sort_by='distance', offset=1, page_size=2))
+    assert [hotel['name'] for hotel in page['hotels']] == ['mid', 'far']
+    assert page['next_cursor'] is None
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from app import create_app
+from app.services import price_history as price_history_module
+from app.services.price_history import PriceHistory
+from app.services.price_watch import PriceWatchScheduler
+
+HOTEL_WATCH = {'location': 'Goa', 'check_in': '2026-12-01', 'check_out': '2026-12-04', 'guests': 2, 'rooms': 1}
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    history = PriceHistory(path=str(tmp_path))
+    monkeypatch.setattr(price_history_module, 'price_history', history)
+    return history
+
+@pytest.fixture
+def client(history):
+    app = create_app()
+    app.config.update(TESTING=True, LOGIN_DISABLED=True)
+    return app.test_client()
+
+@pytest.fixture
+def watched_key(history):
+    scheduler = PriceWatchScheduler(workers=1, fetch_prices=lambda params: [4200, 3900, 5100], history=history)
+    key = scheduler.watch('user-1', HOTEL_WATCH, threshold=1000)
+    deadline = time.monotonic() + 5
+    while history.lowest(key) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield key
+    scheduler.cancel('user-1')
+
+def test_price_history_by_query_params_matches_the_watch(client, watched_key):
+    response = client.get('/price_history?location=goa&check_in=2026-12-01&check_out=2026-12-04&guests=2&rooms=1')
+    assert response.status_code == 200
+    assert response.json['lowest'] == 3900
+
+def test_price_history_by_watch_key(client, watched_key):
+    response = client.get(f'/price_history?key={watched_key}&days=7')
+    assert response.status_code == 200
+    assert response.json['lowest'] == 3900
+    assert response.json['trend']['points']
+
+@pytest.mark.parametrize('days', ['abc', '0', '-3', '1000', 'nan'])
+def test_price_history_rejects_bad_days(client, days):
+    response = client.get(f'/price_history?location=goa&days={days}')
+    assert response.status_code == 400
+    assert response.json['status'] == 'error'
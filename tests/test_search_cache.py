@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from app.services.search_cache import SearchCache
+
+PARAMS = {'source': 'Pune', 'destination': 'Goa', 'date': '2026-12-01'}
+
+def _cache(tmp_path, ttl=60, stale_seconds=60):
+    return SearchCache(
+        max_entries=8, db_path=str(tmp_path / 'search_cache.sqlite3'),
+        ttls={'redbus': ttl}, stale_seconds=stale_seconds
+    )
+
+def test_stale_entry_is_served_while_one_refresh_runs(tmp_path):
+    cache = _cache(tmp_path, ttl=0)
+    cache.get_or_fetch('redbus', PARAMS, lambda: ['old'])
+
+    release = threading.Event()
+    fetches = []
+
+    def refresh():
+        fetches.append(1)
+        release.wait(5)
+        return ['new']
+
+    started = time.monotonic()
+    assert cache.get_or_fetch('redbus', PARAMS, refresh) == ['old']
+    assert cache.get_or_fetch('redbus', PARAMS, refresh) == ['old']
+    assert time.monotonic() - started < 1
+    release.set()
+
+    deadline = time.monotonic() + 5
+    while cache.stats()['refreshes'] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fetches == [1]
+    assert cache.get_or_fetch('redbus', PARAMS, refresh) == ['new']
+    assert cache.stats()['stale_hits'] == 3
+
+def test_failed_refresh_keeps_the_stale_entry(tmp_path):
+    cache = _cache(tmp_path, ttl=0)
+    cache.get_or_fetch('redbus', PARAMS, lambda: ['old'])
+
+    def failing():
+        raise RuntimeError('HTTP 503')
+
+    assert cache.get_or_fetch('redbus', PARAMS, failing) == ['old']
+    deadline = time.monotonic() + 5
+    while cache.stats()['refresh_errors'] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_fetch('redbus', PARAMS, lambda: ['new']) == ['old']
+
+def test_entries_past_the_stale_window_are_fetched_again(tmp_path):
+    cache = _cache(tmp_path, ttl=0, stale_seconds=0)
+    cache.get_or_fetch('redbus', PARAMS, lambda: ['old'])
+    assert cache.get_or_fetch('redbus', PARAMS, lambda: ['new']) == ['new']
+
+def test_workers_share_entries_through_the_disk_tier(tmp_path):
+    first, second = _cache(tmp_path), _cache(tmp_path)
+    first.get_or_fetch('redbus', PARAMS, lambda: [{'fare': 900}])
+
+    assert second.get_or_fetch('redbus', PARAMS, lambda: pytest.fail('fetched again')) == [{'fare': 900}]
+    assert second.stats()['disk_hits'] == 1
+
+def test_fetch_errors_are_not_cached(tmp_path):
+    cache = _cache(tmp_path)
+
+    def failing():
+        raise RuntimeError('HTTP 503')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch('redbus', PARAMS, failing)
+    assert cache.get_or_fetch('redbus', PARAMS, lambda: ['fresh']) == ['fresh']
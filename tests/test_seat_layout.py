@@ -0,0 +1,42 @@
+from app.services.seat_layout import SeatMap
+
+# Two seats either side of an aisle (column 2), three rows on the lower
+# deck and one on the upper; 'x' is booked, 'l' an available ladies seat
+LOWER_DECK = ['x.a.a.x', 'l.x.a.a', 'x.x.x.x']
+UPPER_DECK = ['a.a.x.x']
+
+def _layout():
+    seats = []
+    for deck, rows in enumerate((LOWER_DECK, UPPER_DECK)):
+        for row, states in enumerate(rows):
+            for state, column in zip(states.split('.'), (0, 1, 3, 4)):
+                seats.append({
+                    'name': f"{'LU'[deck]}{row}{column}",
+                    'zIndex': deck, 'row': row, 'column': column,
+                    'available': state != 'x', 'ladiesSeat': state == 'l', 'fare': 900 + 100 * deck
+                })
+    return {'busId': 'b-1', 'maxRows': 3, 'maxColumns': 5, 'seats': seats}
+
+def test_pairs_sit_side_by_side_never_across_the_aisle():
+    seat_map = SeatMap(_layout())
+    assert seat_map.pick_seats(2) == ['L13', 'L14']
+    assert seat_map.adjacent(3) is None
+
+def test_groups_that_cannot_sit_together_take_the_nearest_rows():
+    seat_map = SeatMap(_layout())
+    assert seat_map.pick_seats(3) == ['L01', 'L03', 'L13']
+
+def test_single_travellers_get_their_preferences_and_ladies_seats_are_opt_in():
+    seat_map = SeatMap(_layout())
+    assert seat_map.pick_seats(1, window=True, lower=True) == ['L14']
+    assert seat_map.pick_seats(1, window=True, lower=True, allow_ladies=True) == ['L10']
+    assert seat_map.pick_seats(1, window=True) == ['L14']
+    assert seat_map.fare('U00') == 1000
+
+def test_not_enough_seats():
+    seat_map = SeatMap(_layout())
+    assert seat_map.pick_seats(7) is None
+    assert len(seat_map.pick_seats(7, allow_ladies=True)) == 7
+    assert seat_map.pick_seats(0) == []
+    assert not seat_map.is_available('L00')
+    assert seat_map.is_available('U01')